@@ -1,4 +1,3 @@
-import mysql.connector
 import bcrypt
 from datetime import datetime, timedelta
 import uuid
@@ -23,7 +22,11 @@ SMTP_SERVER = "smtp.gmail.com"
 SMTP_PORT = 587
 
 # ===== MYSQL CONNECTION HELPERS =====
+# The driver is imported and the schema created on the first connection, not when this module is imported.
+_db_initialized = False
+
 def get_server_connection():
+    import mysql.connector
     return mysql.connector.connect(
         host=MYSQL_HOST,
         user=MYSQL_USER,
@@ -31,6 +34,15 @@ def get_server_connection():
     )
 
 def get_connection():
+    global _db_initialized
+    import mysql.connector
+    if not _db_initialized:
+        _db_initialized = True
+        try:
+            init_db()
+        except Exception:
+            _db_initialized = False
+            raise
     return mysql.connector.connect(
         host=MYSQL_HOST,
         user=MYSQL_USER,
@@ -64,8 +76,6 @@ def init_db():
     conn.commit()
     conn.close()
 
-init_db()
-
 # ===== DATABASE FUNCTIONS =====
 def get_user(email):
     conn = get_connection()
@@ -0,0 +1,190 @@
+"""
+benchmark_suite.py
+- End-to-end benchmark of the dashboard pipeline on synthetic bank transactions (Benchmarks/synthetic_data.py)
+- At every dataset size it times:
+  - pipeline stages: load_dataframe (CSV parse, and the Parquet ingest-cache hit), infer_field_roles, map_template_fields, shared aggregation plan, full run_pipeline
+  - every template component generator (generate_kpi / line / bar / pie / scatter / histogram / heatmap)
+  - every insight function (basic_kpi_insights, compute_correlations, detect_top_drivers, category_concentration,
+    seasonality_summary, detect_anomalies_zscore, generate_insights)
+- Writes a machine-readable JSON report; --baseline compares against an earlier report and flags regressions
+
+Usage:
+    python -m Benchmarks.benchmark_suite --sizes 10k 100k 1m --repeat 3 --out bench_report.json
+    python -m Benchmarks.benchmark_suite --sizes 10k 100k --baseline bench_report.json
+"""
+from typing import Dict, Any, List, Callable, Optional
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+from Benchmarks.synthetic_data import parse_size, generate_transactions, write_transactions
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TEMPLATE = os.path.join(_REPO_ROOT, "Dashboard", "sample_dashboard.json")
+
+
+def _time(fn: Callable, repeat: int) -> Dict[str, float]:
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - start) * 1000)
+    return {"min_ms": round(min(runs), 2), "median_ms": round(statistics.median(runs), 2), "runs": len(runs)}
+
+
+def _dataset_csv(n_rows: int, seed: int, data_dir: str) -> str:
+    path = os.path.join(data_dir, f"transactions_{n_rows}_{seed}.csv")
+    if not os.path.exists(path):
+        write_transactions(path, n_rows, seed=seed)
+    return path
+
+
+def benchmark_size(n_rows: int, template_path: str, repeat: int, seed: int, data_dir: str,
+                   include_load: bool = True) -> List[Dict[str, Any]]:
+    from Data_loader.source_loader import load_dataframe
+    from Cache import ingest_cache
+    from Schema_mapper.schema_mapper import infer_field_roles, map_template_fields
+    from Dashboard.template_registry import get_template
+    from Dashboard.aggregation_planner import plan_aggregations, execute_plan
+    from Pipeline.pipeline_executor import run_pipeline, CHART_GENERATORS
+    from Dashboard.dashboard_generator import generate_kpi
+    from Insight import insight_engine as ie
+
+    results = []
+
+    def record(kind: str, name: str, fn: Callable):
+        timing = _time(fn, repeat)
+        timing.update({
+            "size": n_rows, "kind": kind, "name": name,
+            "rows_per_second": round(n_rows / (timing["median_ms"] / 1000), 1) if timing["median_ms"] else None,
+        })
+        results.append(timing)
+        print(f"  {kind:<9} {name:<40} {timing['median_ms']:>10.1f} ms", flush=True)
+
+    template = get_template(template_path)
+
+    if include_load:
+        csv_path = _dataset_csv(n_rows, seed, data_dir)
+
+        def load():
+            with open(csv_path, "rb") as fh:
+                return load_dataframe({"type": "upload", "uploaded": fh})
+
+        def load_uncached():
+            ingest_cache.INGEST_CACHE_ENABLED = False
+            try:
+                return load()
+            finally:
+                ingest_cache.INGEST_CACHE_ENABLED = cache_enabled
+
+        cache_enabled = ingest_cache.INGEST_CACHE_ENABLED
+        record("stage", "load_dataframe(csv)", load_uncached)
+        df = load()
+        if ingest_cache.enabled():
+            record("stage", "load_dataframe(csv, ingest cache hit)", load)
+    else:
+        df = generate_transactions(n_rows, seed=seed)
+
+    roles = infer_field_roles(df)
+    mapping = map_template_fields(template, roles)
+    record("stage", "infer_field_roles", lambda: infer_field_roles(df))
+    record("stage", "map_template_fields", lambda: map_template_fields(template, roles))
+    plan = plan_aggregations(template, mapping)
+    record("stage", "execute_plan", lambda: execute_plan(df, plan))
+    record("stage", "run_pipeline(no load, no cache)",
+           lambda: run_pipeline({}, template, use_cache=False, incremental=False, chart_workers=1, df=df))
+
+    for comp in template["kpis"]:
+        record("kpi", comp.get("id", "kpi"), lambda comp=comp: generate_kpi(df, comp, mapping))
+    for comp in template["charts"]:
+        func = CHART_GENERATORS.get(comp.get("type"))
+        if func is not None:
+            record("chart", f"{comp.get('type')}:{comp.get('id')}", lambda comp=comp, func=func: func(df, comp, mapping))
+
+    value_col, date_col, cat_col = mapping.get("amount", "amount"), "transaction_date", "category"
+    insight_fns = {
+        "basic_kpi_insights": lambda: ie.basic_kpi_insights(df),
+        "compute_correlations": lambda: ie.compute_correlations(df),
+        "detect_top_drivers": lambda: ie.detect_top_drivers(df, value_col),
+        "category_concentration": lambda: ie.category_concentration(df, cat_col, value_col),
+        "seasonality_summary": lambda: ie.seasonality_summary(df, date_col, value_col),
+        "detect_anomalies_zscore": lambda: ie.detect_anomalies_zscore(df, value_col),
+        "generate_insights": lambda: ie.generate_insights(df, value_col, date_col, cat_col),
+    }
+    for name, fn in insight_fns.items():
+        record("insight", name, fn)
+    return results
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Entries whose median got slower than the baseline by more than threshold (e.g. 0.2 = 20%)."""
+    base = {(r["size"], r["kind"], r["name"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in report["results"]:
+        b = base.get((r["size"], r["kind"], r["name"]))
+        if b and b["median_ms"] > 0 and r["median_ms"] > b["median_ms"] * (1 + threshold):
+            regressions.append({"size": r["size"], "kind": r["kind"], "name": r["name"],
+                                "baseline_ms": b["median_ms"], "current_ms": r["median_ms"],
+                                "slowdown": round(r["median_ms"] / b["median_ms"], 2)})
+    return regressions
+
+
+def run_suite(sizes: List[int], template_path: str = DEFAULT_TEMPLATE, repeat: int = 3, seed: int = 42,
+              data_dir: Optional[str] = None, include_load: bool = True) -> Dict[str, Any]:
+    from Cache.disk_lru import cache_dir
+    data_dir = data_dir or cache_dir("benchmarks")
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "template": os.path.basename(template_path),
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": [],
+    }
+    for n in sizes:
+        print(f"== {n:,} rows", flush=True)
+        report["results"].extend(benchmark_size(n, template_path, repeat, seed, data_dir, include_load))
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage, chart and insight function.")
+    parser.add_argument("--sizes", nargs="+", default=["10k", "100k", "1m"], help="Row counts, e.g. 10k 1m 100m")
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default=None, help="Where generated CSVs are kept (default: cache dir)")
+    parser.add_argument("--no-load", action="store_true", help="Skip CSV generation and load timing")
+    parser.add_argument("--out", default="bench_report.json")
+    parser.add_argument("--baseline", default=None, help="Earlier report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown vs baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    report = run_suite([parse_size(s) for s in args.sizes], args.template, args.repeat, args.seed,
+                       args.data_dir, include_load=not args.no_load)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            report["regressions"] = compare(report, json.load(f), args.threshold)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.out}")
+
+    for r in report.get("regressions", []):
+        print(f"REGRESSION {r['size']:,} rows {r['kind']} {r['name']}: "
+              f"{r['baseline_ms']:.1f} -> {r['current_ms']:.1f} ms (x{r['slowdown']})")
+    return 1 if report.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
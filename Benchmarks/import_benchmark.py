@@ -0,0 +1,106 @@
+"""
+import_benchmark.py
+- Measures cold-start cost of the app up to the first paint of the login screen
+- Every repeat runs in a fresh Python process (nothing cached in sys.modules) and renders main.py with
+  streamlit's AppTest until the login page stops the script
+- Reports per repeat: streamlit import time, login-screen script run time, total, and which heavy modules
+  (plotly.express, the analytics modules, SQL drivers, pandas, numpy) were imported when the login form was drawn
+  (pandas itself is pulled in by streamlit's custom-component layer for the cookie manager, not by the app)
+- Measures the shipped configuration: the warm-up thread (Pipeline/warmup.py) is on, and main.py starts it once the
+  login form is drawn, so the heavy modules are taken at that call; pass --without-warmup to disable it
+
+Usage:
+    python -m Benchmarks.import_benchmark --repeat 5 --out import_report.json
+"""
+from typing import Dict, Any, List
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["plotly.express", "Dashboard.dashboard_generator", "Insight.insight_engine",
+                 "Pipeline.pipeline_executor", "sqlalchemy", "mysql", "pandas", "numpy"]
+
+_PROBE = r"""
+import json, os, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+heavy = json.loads(sys.argv[2])
+sys.path.insert(0, os.path.dirname(os.path.abspath(sys.argv[1])))
+from Pipeline import warmup
+at_login_form = []
+_start_warmup = warmup.start_warmup
+def start_warmup(current_dir):
+    # main.py calls this right after drawing the login form; later imports belong to the warm-up thread
+    at_login_form[:] = [[m for m in heavy if m in sys.modules]]
+    return _start_warmup(current_dir)
+warmup.start_warmup = start_warmup
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.run()
+painted = time.perf_counter()
+print(json.dumps({
+    "streamlit_import_ms": round((imported - start) * 1000, 1),
+    "login_paint_ms": round((painted - imported) * 1000, 1),
+    "total_ms": round((painted - start) * 1000, 1),
+    "exception": [str(e.message) for e in at.exception],
+    "heavy_modules_loaded": at_login_form[0] if at_login_form else [m for m in heavy if m in sys.modules],
+}))
+"""
+
+
+def measure_once(main_path: str, with_warmup: bool = True) -> Dict[str, Any]:
+    env = dict(os.environ)
+    env["DASHBOARD_WARMUP"] = "1" if with_warmup else "0"
+    # Run from a scratch directory so the auth backend's users.json is not created in the repo
+    with tempfile.TemporaryDirectory() as cwd:
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE, main_path, json.dumps(HEAVY_MODULES)],
+            cwd=cwd, env=env, capture_output=True, text=True, check=True,
+        )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def run(repeat: int = 5, main_path: str = os.path.join(_REPO_ROOT, "main.py"),
+        with_warmup: bool = True) -> Dict[str, Any]:
+    runs: List[Dict[str, Any]] = []
+    for i in range(repeat):
+        r = measure_once(main_path, with_warmup)
+        runs.append(r)
+        print(f"  run {i + 1}: login paint {r['login_paint_ms']:.0f} ms "
+              f"(+{r['streamlit_import_ms']:.0f} ms streamlit import); "
+              f"heavy modules loaded: {', '.join(r['heavy_modules_loaded']) or 'none'}", flush=True)
+        for message in r["exception"]:
+            print(f"    script raised: {message}", flush=True)
+    return {
+        "repeat": repeat,
+        "with_warmup": with_warmup,
+        "median_login_paint_ms": statistics.median(r["login_paint_ms"] for r in runs),
+        "median_total_ms": statistics.median(r["total_ms"] for r in runs),
+        "runs": runs,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Time to first paint of the login screen from a cold process.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--main", default=os.path.join(_REPO_ROOT, "main.py"))
+    parser.add_argument("--without-warmup", action="store_true", help="Disable the sample-dashboard warm-up")
+    parser.add_argument("--out", default=None, help="Optional JSON report path")
+    args = parser.parse_args(argv)
+
+    report = run(args.repeat, args.main, not args.without_warmup)
+    print(f"Median login paint: {report['median_login_paint_ms']:.0f} ms "
+          f"(total incl. streamlit import {report['median_total_ms']:.0f} ms)")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
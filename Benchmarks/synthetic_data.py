@@ -0,0 +1,129 @@
+"""
+synthetic_data.py
+- Deterministic generator of bank transactions matching the schema sample_dashboard.json expects:
+  amount, transaction_date, merchant, category, account_type, country, transaction_status,
+  customer_age, fraud_flag (plus transaction_id, customer_id, transaction_type, currency)
+- Fully vectorised (numpy); large outputs (up to 100M rows) are written chunk by chunk to CSV or Parquet
+- The same (rows, seed, chunk_rows) always produces byte-identical data
+
+Usage:
+    python -m Benchmarks.synthetic_data --rows 10m --out Data/bank_transactions_10m.parquet
+"""
+from typing import Iterator, Optional
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+ACCOUNT_TYPES = ["checking", "savings", "credit"]
+CATEGORIES = ["retail", "travel", "deposit", "insurance", "transfer", "payment", "food", "utilities"]
+MERCHANTS = ["Amazon", "Supermarket", "Cafe", "Electronics", "Bookstore", "Travel", "Utilities",
+             "Insurance", "Car Loan", "Transfer", "Salary", "Freelance"]
+COUNTRIES = ["AU", "NZ", "UK", "US", "CA"]
+CURRENCY_BY_COUNTRY = {"AU": "AUD", "NZ": "AUD", "UK": "GBP", "US": "USD", "CA": "CAD"}
+STATUSES = ["completed", "pending", "failed"]
+STATUS_WEIGHTS = [0.85, 0.10, 0.05]
+
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+
+def parse_size(text: str) -> int:
+    """'10k' -> 10_000, '2.5m' -> 2_500_000, '100M' -> 100_000_000, '5000' -> 5000."""
+    text = str(text).strip().lower().replace("_", "")
+    scale = {"k": 1_000, "m": 1_000_000, "b": 1_000_000_000}.get(text[-1:], 1)
+    number = text[:-1] if scale != 1 else text
+    return int(float(number) * scale)
+
+
+def generate_transactions(n_rows: int, seed: int = 42, start_id: int = 1, fraud_rate: float = 0.01,
+                          start_date: str = "2024-01-01", days: int = 366,
+                          total_rows: Optional[int] = None) -> pd.DataFrame:
+    """
+    Generate n_rows transactions; ids start at start_id so chunks can be concatenated. total_rows is the size of
+    the whole dataset a chunk belongs to (default n_rows): it sizes the customer population (~50 rows each).
+    """
+    rng = np.random.default_rng([seed, start_id])
+    n = int(n_rows)
+    customers = max(100, int(total_rows or n) // 50)
+
+    country_idx = rng.integers(0, len(COUNTRIES), n)
+    countries = np.array(COUNTRIES)[country_idx]
+    currencies = np.array([CURRENCY_BY_COUNTRY[c] for c in COUNTRIES])[country_idx]
+    merchant_idx = rng.integers(0, len(MERCHANTS), n)
+
+    # Heavy right-tailed amounts; ~20% credits, ~5% negative (refunds / reversals)
+    magnitude = np.round(rng.lognormal(mean=4.5, sigma=1.2, size=n), 2)
+    is_credit = rng.random(n) < 0.2
+    is_reversal = rng.random(n) < 0.05
+    amount = np.where(is_reversal, -magnitude, magnitude)
+
+    start = np.datetime64(start_date, "s")
+    offsets = rng.integers(0, days * 86_400, n).astype("timedelta64[s]")
+
+    return pd.DataFrame({
+        "transaction_id": np.arange(start_id, start_id + n, dtype=np.int64),
+        "customer_id": rng.integers(1_000, 1_000 + customers, n),
+        "account_type": np.array(ACCOUNT_TYPES)[rng.integers(0, len(ACCOUNT_TYPES), n)],
+        "transaction_date": start + offsets,
+        "amount": amount,
+        "merchant": np.array(MERCHANTS)[merchant_idx],
+        "category": np.array(CATEGORIES)[rng.integers(0, len(CATEGORIES), n)],
+        "country": countries,
+        "currency": currencies,
+        "transaction_type": np.where(is_credit, "credit", "debit"),
+        "transaction_status": np.array(STATUSES)[rng.choice(len(STATUSES), n, p=STATUS_WEIGHTS)],
+        "customer_age": rng.integers(18, 81, n),
+        "fraud_flag": (rng.random(n) < fraud_rate).astype(np.int64),
+    })
+
+
+def iter_chunks(n_rows: int, seed: int = 42, chunk_rows: int = DEFAULT_CHUNK_ROWS, **kwargs) -> Iterator[pd.DataFrame]:
+    """Yield the dataset in chunks of at most chunk_rows rows (bounded memory for very large sizes)."""
+    for start in range(0, n_rows, chunk_rows):
+        yield generate_transactions(min(chunk_rows, n_rows - start), seed=seed, start_id=start + 1,
+                                    total_rows=n_rows, **kwargs)
+
+
+def write_transactions(path: str, n_rows: int, seed: int = 42, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                       fmt: Optional[str] = None, **kwargs) -> str:
+    """Write n_rows to path as CSV or Parquet (inferred from the extension unless fmt is given)."""
+    fmt = fmt or ("parquet" if path.endswith(".parquet") else "csv")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if fmt == "csv":
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            for i, chunk in enumerate(iter_chunks(n_rows, seed, chunk_rows, **kwargs)):
+                chunk.to_csv(f, index=False, header=(i == 0), date_format="%Y-%m-%d %H:%M:%S")
+    elif fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        writer = None
+        try:
+            for chunk in iter_chunks(n_rows, seed, chunk_rows, **kwargs):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate deterministic synthetic bank transactions.")
+    parser.add_argument("--rows", default="100k", help="Row count, e.g. 10k, 1m, 100m")
+    parser.add_argument("--out", required=True, help="Output .csv or .parquet path")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--fraud-rate", type=float, default=0.01)
+    args = parser.parse_args(argv)
+    n = parse_size(args.rows)
+    write_transactions(args.out, n, seed=args.seed, chunk_rows=args.chunk_rows, fraud_rate=args.fraud_rate)
+    print(f"Wrote {n:,} rows to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+dataset_store.py
+- Process-wide store of loaded DataFrames shared by every Streamlit session
+- Keyed by source fingerprint (source_loader.source_fingerprint), so 50 sessions on the sample data hold one frame
+- Sessions keep a DatasetHandle, not a copy; a handle is released explicitly or when it is garbage collected
+  (e.g. the session ends), which decrements the entry's reference count
+- Entries nobody references stay cached until the memory budget (DATASET_STORE_MAX_BYTES) is exceeded,
+  then the least recently used unreferenced ones are evicted
+- Stored frames are read-only by convention: the pipeline never writes into its input frame, and callers that
+  need to mutate must copy first
+"""
+from typing import Dict, Any, Callable, Optional
+import os
+import threading
+import time
+import weakref
+
+import pandas as pd
+
+from Data_loader.dtype_compaction import estimate_frame_bytes
+
+DATASET_STORE_MAX_BYTES = int(os.environ.get("DATASET_STORE_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+
+
+class DatasetHandle:
+    """One session's reference to a shared DataFrame."""
+
+    def __init__(self, store: "DatasetStore", key: str, df: pd.DataFrame):
+        self.key = key
+        self._df = df
+        self._finalizer = weakref.finalize(self, store._release, key)
+
+    @property
+    def df(self) -> Optional[pd.DataFrame]:
+        return self._df
+
+    @property
+    def released(self) -> bool:
+        return not self._finalizer.alive
+
+    def release(self):
+        """Drop this reference (idempotent)."""
+        self._df = None
+        self._finalizer()
+
+
+class DatasetStore:
+    def __init__(self, max_bytes: int = DATASET_STORE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._loading: Dict[str, threading.Lock] = {}
+
+    # ---------- Public API ----------
+    def acquire(self, key: str) -> Optional[DatasetHandle]:
+        """New handle to a stored frame, or None if the key is not stored."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry["refs"] += 1
+            entry["last_used"] = time.time()
+            return DatasetHandle(self, key, entry["df"])
+
+    def put(self, key: str, df: pd.DataFrame) -> DatasetHandle:
+        """Store df under key and return a handle; if the key is already stored, the stored frame wins."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = {"df": df, "bytes": estimate_frame_bytes(df), "refs": 0, "last_used": time.time()}
+                self._entries[key] = entry
+            entry["refs"] += 1
+            entry["last_used"] = time.time()
+            handle = DatasetHandle(self, key, entry["df"])
+            self._evict()
+            return handle
+
+    def get_or_load(self, key: str, loader: Callable[[], Optional[pd.DataFrame]]) -> Optional[DatasetHandle]:
+        """Handle to the stored frame, loading it with loader() first if needed (one load per key at a time)."""
+        handle = self.acquire(key)
+        if handle is not None:
+            return handle
+        with self._lock:
+            key_lock = self._loading.setdefault(key, threading.Lock())
+        with key_lock:
+            handle = self.acquire(key)
+            if handle is None:
+                df = loader()
+                handle = self.put(key, df) if df is not None else None
+        with self._lock:
+            self._loading.pop(key, None)
+        return handle
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(e["bytes"] for e in self._entries.values()),
+                "max_bytes": self.max_bytes,
+                "references": {k: e["refs"] for k, e in self._entries.items()},
+            }
+
+    # ---------- Internals ----------
+    def _release(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["refs"] = max(0, entry["refs"] - 1)
+                entry["last_used"] = time.time()
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used unreferenced entries until the store fits the budget (lock held)."""
+        total = sum(e["bytes"] for e in self._entries.values())
+        if total <= self.max_bytes:
+            return
+        idle = sorted((e["last_used"], k) for k, e in self._entries.items() if e["refs"] == 0)
+        for _, key in idle:
+            if total <= self.max_bytes:
+                break
+            total -= self._entries.pop(key)["bytes"]
+
+
+_dataset_store = None
+_dataset_store_lock = threading.Lock()
+
+
+def get_dataset_store() -> DatasetStore:
+    """Process-wide store shared by every Streamlit session."""
+    global _dataset_store
+    with _dataset_store_lock:
+        if _dataset_store is None:
+            _dataset_store = DatasetStore()
+    return _dataset_store
@@ -0,0 +1,73 @@
+"""
+disk_lru.py
+- Size-bounded LRU housekeeping for the on-disk caches under DASHBOARD_CACHE_DIR
+- Recency is the file mtime: readers touch() entries on hit, evict_lru() drops the oldest first
+"""
+from typing import Optional, Tuple
+import os
+import tempfile
+
+CACHE_ROOT = os.environ.get(
+    "DASHBOARD_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")
+)
+
+
+def cache_dir(name: str) -> str:
+    """Return (and create) a named sub-directory of the cache root."""
+    path = os.path.join(CACHE_ROOT, name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def touch(path: str):
+    """Mark an entry as recently used."""
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+
+
+def atomic_write_bytes(path: str, data: bytes):
+    """Write via a temp file + os.replace so readers never see a partial entry."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def evict_lru(directory: str, max_bytes: int, suffix: Optional[str] = None) -> Tuple[int, int]:
+    """
+    Delete least-recently-used entries until the directory holds at most max_bytes.
+    Returns (files removed, bytes freed).
+    """
+    entries = []
+    total = 0
+    for name in os.listdir(directory):
+        if suffix and not name.endswith(suffix):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+        total += st.st_size
+
+    removed, freed = 0, 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+        freed += size
+    return removed, freed
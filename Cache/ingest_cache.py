@@ -0,0 +1,118 @@
+"""
+ingest_cache.py
+- Columnar copy of parsed CSV / XLSX sources, so re-uploading the same file or reopening the sample skips the
+  text parse entirely
+- Key = source fingerprint (content hash of uploaded bytes; path + size + mtime for the sample) + ingest version,
+  so a pandas / pyarrow upgrade or a change to how files are parsed is a miss
+- Entries are Parquet files under DASHBOARD_CACHE_DIR/ingest, read back with column projection (only the columns
+  asked for are decoded), with size-bounded LRU eviction (INGEST_CACHE_MAX_BYTES)
+- A CSV loaded with only some columns (template projection) is cached under a key that includes those columns;
+  the full copy serves any projection
+- Needs pyarrow; without it (or with DASHBOARD_INGEST_CACHE=0) every call is a miss and nothing is written
+- Frames Parquet cannot represent (e.g. mixed-type object columns) are simply not cached
+"""
+from typing import List, Optional
+import hashlib
+import os
+import tempfile
+
+import pandas as pd
+
+from Cache.disk_lru import cache_dir, touch, evict_lru
+
+INGEST_CACHE_ENABLED = os.environ.get("DASHBOARD_INGEST_CACHE", "1") != "0"
+INGEST_CACHE_MAX_BYTES = int(os.environ.get("INGEST_CACHE_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+# Bump when load_dataframe parses files differently, so stale columnar copies are not served.
+INGEST_VERSION = "2"
+
+
+def _pyarrow_version() -> Optional[str]:
+    try:
+        import pyarrow
+    except ImportError:
+        return None
+    return pyarrow.__version__
+
+
+_PYARROW_VERSION = _pyarrow_version()
+
+
+def enabled() -> bool:
+    return INGEST_CACHE_ENABLED and _PYARROW_VERSION is not None
+
+
+def ingest_key(fingerprint: str, columns: Optional[List[str]] = None) -> str:
+    """Key of the full copy of a source, or of a copy parsed with only `columns` (projected CSV loads)."""
+    projection = "" if columns is None else repr(sorted(columns))
+    return hashlib.blake2b(
+        f"{fingerprint}:{projection}:{INGEST_VERSION}:{pd.__version__}:{_PYARROW_VERSION}".encode(), digest_size=16
+    ).hexdigest()
+
+
+def _path(key: str) -> str:
+    return os.path.join(cache_dir("ingest"), f"{key}.parquet")
+
+
+# ---------- Public API ----------
+def get_frame(key: str, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+    """Cached frame for key (only `columns` if given), or None on a miss or unreadable entry."""
+    if not enabled():
+        return None
+    path = _path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        df = pd.read_parquet(path, engine="pyarrow", columns=columns)
+    except Exception:
+        return None
+    touch(path)
+    return df
+
+
+def get_head(key: str, rows: int) -> Optional[pd.DataFrame]:
+    """First `rows` rows of a cached frame (only the leading record batches are decoded), or None on a miss."""
+    if not enabled():
+        return None
+    path = _path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        pf = pq.ParquetFile(path)
+        batch = next(pf.iter_batches(batch_size=rows), None)
+        table = pa.Table.from_batches([batch] if batch is not None else [], schema=pf.schema_arrow)
+        df = table.to_pandas()
+    except Exception:
+        return None
+    touch(path)
+    return df
+
+
+def get_path(key: str) -> Optional[str]:
+    """Path of a cached entry, for readers that scan the Parquet file themselves (e.g. DuckDB); None on a miss."""
+    if not enabled():
+        return None
+    path = _path(key)
+    if not os.path.exists(path):
+        return None
+    touch(path)
+    return path
+
+
+def put_frame(key: str, df: pd.DataFrame) -> bool:
+    """Store df under key and evict least-recently-used entries beyond INGEST_CACHE_MAX_BYTES; False if not cached."""
+    if not enabled():
+        return False
+    path = _path(key)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    try:
+        df.to_parquet(tmp, engine="pyarrow", index=False)
+        os.replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return False
+    evict_lru(os.path.dirname(path), INGEST_CACHE_MAX_BYTES, suffix=".parquet")
+    return True
@@ -0,0 +1,111 @@
+"""
+result_cache.py
+- Persistent, content-addressed cache of pipeline results (KPI dicts, Plotly figure JSON, insight lists)
+- Key = dataset fingerprint + template hash + code version, so a change to any of them is a miss
+- Entries are JSON files under DASHBOARD_CACHE_DIR/results with size-bounded LRU eviction
+"""
+from typing import Dict, Any, Optional
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from Dashboard.template_registry import template_hash
+from Cache.disk_lru import cache_dir, touch, atomic_write_bytes, evict_lru
+
+RESULT_CACHE_MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Source files whose behaviour shapes cached results; editing any of them invalidates the cache.
+_VERSIONED_SOURCES = [
+    os.path.join("Schema_mapper", "schema_mapper.py"),
+    os.path.join("Dashboard", "dashboard_generator.py"),
+    os.path.join("Dashboard", "aggregation_planner.py"),
+    os.path.join("Dashboard", "template_registry.py"),
+    os.path.join("Dashboard", "sql_pushdown.py"),
+    os.path.join("Insight", "insight_engine.py"),
+    os.path.join("Data_loader", "dtype_compaction.py"),
+    os.path.join("Pipeline", "pipeline_executor.py"),
+    os.path.join("Pipeline", "dependency_graph.py"),
+    os.path.join("Pipeline", "approximate.py"),
+    os.path.join("Dashboard", "execution_backend.py"),
+    os.path.join("Data_loader", "projection.py"),
+]
+
+
+def _code_version() -> str:
+    h = hashlib.blake2b(digest_size=8)
+    for rel in _VERSIONED_SOURCES:
+        path = os.path.join(_REPO_ROOT, rel)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                h.update(f.read())
+    h.update(pd.__version__.encode())
+    return h.hexdigest()
+
+
+CODE_VERSION = _code_version()
+
+
+# ---------- Keys ----------
+def dataframe_fingerprint(df: pd.DataFrame) -> str:
+    """Fast content hash of a frame: schema plus a vectorised per-row hash of every value."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr(df.shape).encode())
+    h.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return h.hexdigest()
+
+
+def result_key(df_fingerprint: str, template: Dict) -> str:
+    return hashlib.blake2b(
+        f"{df_fingerprint}:{template_hash(template)}:{CODE_VERSION}".encode(), digest_size=16
+    ).hexdigest()
+
+
+# ---------- Serialisation ----------
+def _to_entry(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "roles": result.get("roles"),
+        "mapping": result.get("mapping"),
+        "kpi_results": result.get("kpi_results", []),
+        "chart_results": [[chart_type, fig.to_json()] for chart_type, fig in result.get("chart_results", [])],
+        "chart_errors": result.get("chart_errors", {}),
+        "insight_results": result.get("insight_results", []),
+    }
+
+
+def _from_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    import plotly.io as pio
+    entry = dict(entry)
+    entry["chart_results"] = [(chart_type, pio.from_json(fig_json)) for chart_type, fig_json in entry["chart_results"]]
+    return entry
+
+
+# ---------- Public API ----------
+def _path(key: str) -> str:
+    return os.path.join(cache_dir("results"), f"{key}.json")
+
+
+def get_results(key: str) -> Optional[Dict[str, Any]]:
+    """Return cached results for key, or None on a miss or unreadable entry."""
+    path = _path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        touch(path)
+        return _from_entry(entry)
+    except Exception:
+        return None
+
+
+def put_results(key: str, result: Dict[str, Any]):
+    """Store results for key and evict least-recently-used entries beyond RESULT_CACHE_MAX_BYTES."""
+    path = _path(key)
+    data = json.dumps(_to_entry(result), default=str).encode("utf-8")
+    atomic_write_bytes(path, data)
+    evict_lru(os.path.dirname(path), RESULT_CACHE_MAX_BYTES, suffix=".json")
@@ -0,0 +1,174 @@
+"""
+aggregation_planner.py
+- Reads a whole template layout and collects the aggregations its components need
+- Dedupes identical (group fields, value field, agg) requests across components
+- Evaluates each distinct aggregation once, sharing one groupby per grouping
+- Generators consume the shared results through aggregate_for(); they compute on demand when no plan was run
+
+Aggregation keys are tuples: (agg, value_field, group_fields, freq)
+  - agg: "sum", "abs_sum", "mean" or "mean_abs"
+  - group_fields: tuple of column names, () for a scalar (KPI)
+  - freq: resample frequency for time buckets (line charts, see resample_freq), otherwise None
+Histograms are not planned (pandas bins the raw rows); an out-of-core backend supplies their binned counts under
+histogram_key: ("histogram", value_field, (color_field,) or (), bins as a string)
+"""
+from typing import Dict, Any, List, Optional, Tuple
+import re
+import pandas as pd
+
+AggKey = Tuple[str, str, Tuple[str, ...], Optional[str]]
+
+KPI_AGGS = ("sum", "mean", "mean_abs")
+
+
+# Templates use the short period-end aliases ("M", "Q", "Y" / "A"); pandas >= 2.2 deprecates them for "ME" / "QE" / "YE"
+DEFAULT_TIME_GRANULARITY = "M"
+_PERIOD_END_ALIAS = re.compile(r"(\d*)(M|Q|Y|A)")
+_PERIOD_END_FREQS = {"M": "ME", "Q": "QE", "Y": "YE", "A": "YE"}
+
+
+def resample_freq(granularity: Optional[str]) -> str:
+    """pandas resample frequency for a template time_granularity (monthly when unset)."""
+    granularity = granularity or DEFAULT_TIME_GRANULARITY
+    m = _PERIOD_END_ALIAS.fullmatch(granularity)
+    return m.group(1) + _PERIOD_END_FREQS[m.group(2)] if m else granularity
+
+
+# ---------- Field resolution (mirrors the generators) ----------
+def _mapped(comp: Dict, mapping: Dict, fld: str) -> Optional[str]:
+    """Template field -> column, as generate_kpi/line/bar/pie resolve it."""
+    return mapping.get(comp.get(fld)) or mapping.get(f"{comp.get('id')}.{fld}")
+
+
+def _mapped_or_raw(comp: Dict, mapping: Dict, fld: str) -> Optional[str]:
+    """Template field -> column, as generate_scatter/histogram/heatmap resolve it."""
+    return mapping.get(comp.get(fld, ""), comp.get(fld))
+
+
+def aggregation_key(comp: Dict, mapping: Dict) -> Optional[AggKey]:
+    """Return the aggregation a component needs, or None if it works on raw rows (scatter, histogram)."""
+    ctype = comp.get("type")
+    if ctype == "kpi":
+        val = _mapped(comp, mapping, "value_field")
+        if val is None:
+            return None
+        agg = comp.get("agg", "sum")
+        return (agg if agg in KPI_AGGS else "sum", val, (), None)
+    if ctype == "line":
+        date, val = _mapped(comp, mapping, "date_field"), _mapped(comp, mapping, "value_field")
+        if date is None or val is None:
+            return None
+        return ("sum", val, (date,), resample_freq(comp.get("time_granularity")))
+    if ctype in ("bar", "pie"):
+        grp, val = _mapped(comp, mapping, "group_field"), _mapped(comp, mapping, "value_field")
+        if grp is None or val is None:
+            return None
+        return ("abs_sum", val, (grp,), None)
+    if ctype == "heatmap":
+        x, y = _mapped_or_raw(comp, mapping, "x_field"), _mapped_or_raw(comp, mapping, "y_field")
+        val = _mapped_or_raw(comp, mapping, "value_field")
+        if x is None or y is None or val is None:
+            return None
+        return ("sum", val, (y, x), None)
+    return None
+
+
+def histogram_key(comp: Dict, mapping: Dict) -> Optional[AggKey]:
+    """Key of a histogram component's binned counts in `aggregates`, or None for other components."""
+    if comp.get("type") != "histogram":
+        return None
+    val = _mapped_or_raw(comp, mapping, "value_field")
+    if val is None:
+        return None
+    color = _mapped_or_raw(comp, mapping, "color_field")
+    return ("histogram", val, (color,) if color else (), str(comp.get("bins", 20)))
+
+
+def component_columns(comp: Dict, mapping: Dict) -> List[str]:
+    """Dataset columns a component reads, resolved the same way its generator resolves them."""
+    key = aggregation_key(comp, mapping)
+    if key is not None:
+        return [key[1]] + [g for g in key[2] if g != key[1]]
+    if comp.get("type") == "scatter":
+        fields = ("x_field", "y_field", "color_field", "size_field")
+    elif comp.get("type") == "histogram":
+        fields = ("value_field", "color_field")
+    else:
+        return []
+    cols = [_mapped_or_raw(comp, mapping, f) for f in fields]
+    return list(dict.fromkeys(c for c in cols if c))
+
+
+# ---------- Planning ----------
+def plan_aggregations(template: Dict, mapping: Dict) -> Dict[AggKey, List[str]]:
+    """Map each distinct aggregation in the template to the ids of the components that share it."""
+    plan: Dict[AggKey, List[str]] = {}
+    for comp in template.get("layout", []):
+        key = aggregation_key(comp, mapping)
+        if key is not None:
+            plan.setdefault(key, []).append(comp.get("id", comp.get("title", "")))
+    return plan
+
+
+# ---------- Evaluation ----------
+def _scalar(values: pd.Series, agg: str) -> float:
+    if agg == "mean":
+        return values.mean()
+    if agg == "mean_abs":
+        return values.abs().mean()
+    return values.sum()
+
+
+def execute_plan(df: pd.DataFrame, plan) -> Dict[AggKey, Any]:
+    """
+    Evaluate every key in the plan. Keys sharing the same grouping are answered by a single groupby
+    over a frame holding all the value columns they need (raw and absolute), so N charts over the
+    same dimension cost one scan. Keys over columns the frame lacks are left out, so the component
+    asking for them fails on its own (on demand) instead of aborting the whole plan.
+    """
+    results: Dict[AggKey, Any] = {}
+    by_grouping: Dict[Tuple[Tuple[str, ...], Optional[str]], List[AggKey]] = {}
+    for key in plan:
+        agg, val, groups, freq = key
+        if any(c not in df.columns for c in (val,) + tuple(groups)):
+            continue
+        if not groups:
+            results[key] = _scalar(df[val], agg)
+        else:
+            by_grouping.setdefault((groups, freq), []).append(key)
+
+    for (groups, freq), keys in by_grouping.items():
+        frame = pd.DataFrame(index=df.index)
+        for agg, val, _, _ in keys:
+            col = f"{agg}:{val}"
+            if col not in frame:
+                frame[col] = df[val].abs() if agg == "abs_sum" else df[val]
+        if freq is None:
+            for g in groups:
+                frame[g] = df[g]
+            summed = frame.groupby(list(groups), observed=True).sum()
+        else:
+            date = df[groups[0]]
+            frame[groups[0]] = date if pd.api.types.is_datetime64_any_dtype(date) else pd.to_datetime(date)
+            summed = frame.set_index(groups[0]).resample(freq).sum()
+        for key in keys:
+            results[key] = summed[f"{key[0]}:{key[1]}"].rename(key[1])
+    return results
+
+
+def compute_aggregate(df: pd.DataFrame, key: AggKey):
+    """Evaluate a single aggregation (used when no shared plan was supplied)."""
+    for col in (key[1],) + tuple(key[2]):
+        if col not in df.columns:
+            raise KeyError(col)
+    return execute_plan(df, [key])[key]
+
+
+def aggregate_for(df: pd.DataFrame, comp: Dict, mapping: Dict, aggregates: Optional[Dict[AggKey, Any]] = None):
+    """Shared result for a component if the plan computed it, otherwise compute it now."""
+    key = aggregation_key(comp, mapping)
+    if key is None:
+        return None
+    if aggregates is not None and key in aggregates:
+        return aggregates[key]
+    return compute_aggregate(df, key)
@@ -1,12 +1,16 @@
 """
 dashboard_generator.py
 - Generates Plotly figures and a simple Streamlit layout based on template
+- KPI, line, bar, pie and heatmap generators accept the shared results of
+  aggregation_planner.execute_plan via `aggregates`; without it they aggregate on demand
+- The histogram generator draws binned counts from `aggregates` when a backend supplied them (histogram_key)
 """
-from typing import Dict, Any
+from typing import Dict, Optional
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import numpy as np
+
+from Dashboard.aggregation_planner import aggregate_for, histogram_key
 
 
 # ---------- Helper ----------
@@ -29,61 +33,49 @@ def _empty_figure(title: str = "No data available") -> go.Figure:
 
 
 # ---------- KPI ----------
-def generate_kpi(df: pd.DataFrame, comp: Dict, mapping: Dict) -> Dict:
+def generate_kpi(df: pd.DataFrame, comp: Dict, mapping: Dict, aggregates: Optional[Dict] = None) -> Dict:
     val_field = mapping.get(comp.get("value_field")) or mapping.get(f"{comp.get('id')}.value_field")
-    agg = comp.get("agg", "sum")
     if val_field is None:
         return {"title": comp.get("title"), "value": "N/A"}
-    if agg == "sum":
-        v = df[val_field].sum()
-    elif agg == "mean":
-        v = df[val_field].mean()
-    elif agg == "mean_abs":
-        v = df[val_field].abs().mean()
-    else:
-        v = df[val_field].sum()
+    # agg: sum | mean | mean_abs (anything else falls back to sum)
+    v = aggregate_for(df, comp, mapping, aggregates)
     return {"title": comp.get("title"), "value": round(float(v), 2)}
 
 
 # ---------- Charts ----------
-def generate_line(df: pd.DataFrame, comp: Dict, mapping: Dict):
+def generate_line(df: pd.DataFrame, comp: Dict, mapping: Dict, aggregates: Optional[Dict] = None):
     date_field = mapping.get(comp.get("date_field")) or mapping.get(f"{comp.get('id')}.date_field")
     val_field = mapping.get(comp.get("value_field")) or mapping.get(f"{comp.get('id')}.value_field")
     if date_field is None or val_field is None:
         return _empty_figure(comp.get("title", "Line Chart - No data"))
-    df2 = df.copy()
-    df2[date_field] = pd.to_datetime(df2[date_field])
-    freq = comp.get("time_granularity", "M")
-    df2 = df2.set_index(date_field).resample(freq)[val_field].sum().reset_index()
+    # Sum of value per time_granularity bucket (monthly by default, see aggregation_planner.resample_freq)
+    df2 = aggregate_for(df, comp, mapping, aggregates).reset_index()
     fig = px.line(df2, x=date_field, y=val_field, title=comp.get("title"))
     return fig
 
 
-def generate_bar(df: pd.DataFrame, comp: Dict, mapping: Dict):
+def generate_bar(df: pd.DataFrame, comp: Dict, mapping: Dict, aggregates: Optional[Dict] = None):
     grp = mapping.get(comp.get("group_field")) or mapping.get(f"{comp.get('id')}.group_field")
     val = mapping.get(comp.get("value_field")) or mapping.get(f"{comp.get('id')}.value_field")
     if grp is None or val is None:
         return _empty_figure(comp.get("title", "Bar Chart - No data"))
-    df2 = df.copy()
-    df2["abs_val"] = df2[val].abs()
     top_n = comp.get("top_n", 10)
-    df2 = df2.groupby(grp)["abs_val"].sum().reset_index().sort_values("abs_val", ascending=False).head(top_n)
+    df2 = aggregate_for(df, comp, mapping, aggregates).rename("abs_val").reset_index()
+    df2 = df2.sort_values("abs_val", ascending=False).head(top_n)
     fig = px.bar(df2, x=grp, y="abs_val", title=comp.get("title"))
     return fig
 
 
-def generate_pie(df: pd.DataFrame, comp: Dict, mapping: Dict):
+def generate_pie(df: pd.DataFrame, comp: Dict, mapping: Dict, aggregates: Optional[Dict] = None):
     grp = mapping.get(comp.get("group_field")) or mapping.get(f"{comp.get('id')}.group_field")
     val = mapping.get(comp.get("value_field")) or mapping.get(f"{comp.get('id')}.value_field")
     if grp is None or val is None:
         return _empty_figure(comp.get("title", "Pie Chart - No data"))
-    df2 = df.copy()
-    df2["abs_val"] = df2[val].abs()
-    df2 = df2.groupby(grp)["abs_val"].sum().reset_index()
+    df2 = aggregate_for(df, comp, mapping, aggregates).rename("abs_val").reset_index()
     fig = px.pie(df2, names=grp, values="abs_val", title=comp.get("title"))
     return fig
 
-def generate_scatter(df, comp, mapping):
+def generate_scatter(df, comp, mapping, aggregates=None):
     x_field = mapping.get(comp.get("x_field", ""), comp.get("x_field"))
     y_field = mapping.get(comp.get("y_field", ""), comp.get("y_field"))
     color_field = mapping.get(comp.get("color_field", ""), comp.get("color_field"))
@@ -100,10 +92,26 @@ def generate_scatter(df, comp, mapping):
     return fig
 
 
-def generate_histogram(df, comp, mapping):
+def generate_histogram(df, comp, mapping, aggregates=None):
     value_field = mapping.get(comp.get("value_field", ""), comp.get("value_field"))
     color_field = mapping.get(comp.get("color_field", ""), comp.get("color_field"))
 
+    binned = aggregates.get(histogram_key(comp, mapping)) if aggregates else None
+    if binned is not None:
+        # Counts per bin computed over every row (execution_backend.DuckDBBackend.histogram)
+        fig = px.bar(
+            binned.assign(bin_mid=(binned["bin_start"] + binned["bin_end"]) / 2),
+            x="bin_mid",
+            y="count",
+            color=color_field if color_field else None,
+            hover_data=["bin_start", "bin_end"],
+            labels={"bin_mid": value_field},
+            title=comp.get("title", "Histogram"),
+        )
+        fig.update_traces(width=float((binned["bin_end"] - binned["bin_start"]).max() or 1))
+        fig.update_layout(bargap=0)
+        return fig
+
     fig = px.histogram(
         df,
         x=value_field,
@@ -114,18 +122,15 @@ def generate_histogram(df, comp, mapping):
     return fig
 
 
-def generate_heatmap(df, comp, mapping):
+def generate_heatmap(df, comp, mapping, aggregates=None):
     x_field = mapping.get(comp.get("x_field", ""), comp.get("x_field"))
     y_field = mapping.get(comp.get("y_field", ""), comp.get("y_field"))
     value_field = mapping.get(comp.get("value_field", ""), comp.get("value_field"))
 
-    pivot = df.pivot_table(
-        index=y_field,
-        columns=x_field,
-        values=value_field,
-        aggfunc="sum",
-        fill_value=0
-    ).reset_index()
+    # Sum of value per (y, x) cell, pivoted to y rows x columns
+    pivot = aggregate_for(df, comp, mapping, aggregates).unstack(x_field, fill_value=0)
+    pivot.columns.name = x_field
+    pivot = pivot.reset_index()
 
     fig = px.imshow(
         pivot.set_index(y_field).values,
@@ -138,7 +143,7 @@ def generate_heatmap(df, comp, mapping):
     return fig
 
 # ---------- Extensible Chart Loader ----------
-def generate_chart(df: pd.DataFrame, comp: Dict, mapping: Dict):
+def generate_chart(df: pd.DataFrame, comp: Dict, mapping: Dict, aggregates: Optional[Dict] = None):
     """
     Generic chart generator so you can support more than 6 chart types without editing the dashboard code.
     'type' in comp dict decides which generator is used.
@@ -150,13 +155,13 @@ def generate_chart(df: pd.DataFrame, comp: Dict, mapping: Dict):
         "bar": generate_bar,
         "pie": generate_pie,
         "scatter": generate_scatter,
-        "histogram": generate_histgram,
+        "histogram": generate_histogram,
         "heatmap": generate_heatmap
     }
 
     func = chart_map.get(chart_type)
     if func:
-        return func(df, comp, mapping)
+        return func(df, comp, mapping, aggregates)
 
     # Fallback if unknown chart type
     return _empty_figure(f"Unsupported chart type: {chart_type}")
@@ -0,0 +1,332 @@
+"""
+execution_backend.py
+- Out-of-core execution for CSV sources too large to hold in memory: an embedded DuckDB database scans the file
+  (or its Parquet copy in the ingest cache) and answers the dashboard's aggregations and statistics without
+  materialising the table in pandas
+  - aggregation_planner keys -> one GROUP BY each, shaped like execute_plan (sql_pushdown.shape_rows), so the KPI and
+    line / bar / pie / heatmap generators are unchanged
+  - histograms are binned in SQL over every row (histogram_key); scatters draw from a reservoir sample of the file
+  - basic_kpi_insights, compute_correlations and detect_anomalies_zscore equivalents (the insights stage) in SQL
+- The backend is picked per run from the estimated in-memory size (estimate_rows x compact bytes per sampled row):
+  above BACKEND_MEMORY_BYTES (default: the ingest budget) the run goes to DuckDB, otherwise it stays in pandas
+  (DASHBOARD_EXECUTION_BACKEND=pandas / duckdb forces one). XLSX workbooks and databases (already pushed down)
+  always stay on their current path
+- CSVs are converted once to Parquet in DASHBOARD_CACHE_DIR/spool (keyed by the source fingerprint, LRU-bounded by
+  DASHBOARD_SPOOL_MAX_BYTES), so each query reads only its columns; the ingest cache's copy is used when present
+- Date columns DuckDB reads as text but pandas would parse (per the compaction roles) are parsed with the format
+  pandas infers; DuckDB spills to DASHBOARD_CACHE_DIR/duckdb beyond DASHBOARD_DUCKDB_MEMORY_LIMIT
+- Needs the duckdb package; without it every run stays in pandas
+"""
+from typing import Dict, Any, List, Optional, Tuple
+from contextlib import contextmanager
+import math
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+
+from Cache.disk_lru import cache_dir, touch, evict_lru
+from Dashboard.aggregation_planner import AggKey
+from Dashboard.sql_pushdown import PushdownUnsupported, shape_rows, truncation_unit
+
+EXECUTION_BACKEND = os.environ.get("DASHBOARD_EXECUTION_BACKEND", "auto")
+BACKEND_MEMORY_BYTES = int(os.environ.get("DASHBOARD_BACKEND_MEMORY_BYTES", "0")) or None
+# Rows sampled (uniformly, over the whole file) for role inference, the Data Preview and scatter charts.
+BACKEND_SAMPLE_ROWS = int(os.environ.get("DASHBOARD_BACKEND_SAMPLE_ROWS", "50000"))
+BACKEND_SAMPLE_SEED = 42
+DUCKDB_MEMORY_LIMIT = os.environ.get("DASHBOARD_DUCKDB_MEMORY_LIMIT")
+SPOOL_MAX_BYTES = int(os.environ.get("DASHBOARD_SPOOL_MAX_BYTES", str(8 * 1024 * 1024 * 1024)))
+
+
+def duckdb_available() -> bool:
+    try:
+        import duckdb  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+# ---------- Source files ----------
+def _spool_upload(uploaded, fingerprint: str) -> str:
+    """On-disk copy of an uploaded CSV, for DuckDB to convert (removed once the Parquet copy exists)."""
+    path = os.path.join(cache_dir("spool"), f"{fingerprint}.csv")
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    pos = uploaded.tell()
+    try:
+        uploaded.seek(0)
+        with os.fdopen(fd, "wb") as f:
+            shutil.copyfileobj(uploaded, f, 4 * 1024 * 1024)
+        os.replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    finally:
+        uploaded.seek(pos)
+    return path
+
+
+def source_scan(file_info: Dict, fingerprint: Optional[str]) -> Optional[str]:
+    """
+    DuckDB table function reading the source, or None: the ingest cache's Parquet copy if there is one, else a
+    Parquet copy of the CSV made in the spool directory (uploads are spooled to disk first).
+    """
+    from Cache import ingest_cache
+    if fingerprint is None:
+        return None
+    parquet = ingest_cache.get_path(ingest_cache.ingest_key(fingerprint))
+    if parquet is not None:
+        return f"read_parquet({_literal(parquet)})"
+    path = os.path.join(cache_dir("spool"), f"{fingerprint}.parquet")
+    uploaded = file_info.get("uploaded")
+    if os.path.exists(path):
+        touch(path)
+    elif file_info["type"] == "sample" and os.path.exists(file_info["path_csv"] or ""):
+        _columnar_copy(f"read_csv_auto({_literal(file_info['path_csv'])})", path)
+    elif file_info["type"] == "upload" and uploaded and uploaded.name.lower().endswith(".csv"):
+        csv_path = _spool_upload(uploaded, fingerprint)
+        try:
+            _columnar_copy(f"read_csv_auto({_literal(csv_path)})", path)
+        finally:
+            os.remove(csv_path)
+    else:
+        return None
+    return f"read_parquet({_literal(path)})"
+
+
+def _select_list(scan: str, columns: Optional[List[str]] = None) -> str:
+    """Columns of scan (only `columns` if given); text columns pandas would read as dates are parsed as it would."""
+    import duckdb
+    from pandas.tseries.api import guess_datetime_format
+    from Schema_mapper.schema_mapper import infer_field_roles
+    from Data_loader.dtype_compaction import compact_dataframe
+
+    con = duckdb.connect()
+    try:
+        rel = con.sql(f"SELECT * FROM {scan}")
+        types = dict(zip(rel.columns, (str(t) for t in rel.types)))
+        head = rel.limit(1000).df()
+    finally:
+        con.close()
+    names = [c for c in types if columns is None or c in columns]
+    compact, _ = compact_dataframe(head[names], infer_field_roles(head[names]))
+    exprs = []
+    for c in names:
+        if types[c] == "VARCHAR" and pd.api.types.is_datetime64_any_dtype(compact[c]):
+            first = head[c].dropna()
+            fmt = guess_datetime_format(first.iloc[0]) if len(first) else None
+            parsed = f"try_strptime({_quote(c)}, {_literal(fmt)})" if fmt else f"TRY_CAST({_quote(c)} AS TIMESTAMP)"
+            exprs.append(f"{parsed} AS {_quote(c)}")
+        else:
+            exprs.append(_quote(c))
+    return ", ".join(exprs)
+
+
+def _columnar_copy(scan: str, path: str):
+    """
+    Write scan to a Parquet file at path in one streaming DuckDB pass, so later queries read only the columns
+    they need instead of re-parsing the text.
+    """
+    import duckdb
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    con = duckdb.connect(config={"temp_directory": cache_dir("duckdb")})
+    try:
+        con.execute(f"COPY (SELECT {_select_list(scan)} FROM {scan}) TO {_literal(tmp)} (FORMAT parquet)")
+        os.replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    finally:
+        con.close()
+    evict_lru(os.path.dirname(path), SPOOL_MAX_BYTES, suffix=".parquet")
+
+
+def choose_backend(sample: Optional[pd.DataFrame], rows: Optional[int], budget: Optional[int] = None) -> str:
+    """Backend for a source whose first rows are `sample` and that has about `rows` rows: "duckdb" or "pandas"."""
+    if EXECUTION_BACKEND != "auto":
+        return EXECUTION_BACKEND if EXECUTION_BACKEND == "pandas" or duckdb_available() else "pandas"
+    if sample is None or sample.empty or not rows or not duckdb_available():
+        return "pandas"
+    from Schema_mapper.schema_mapper import infer_field_roles
+    from Data_loader.chunked_ingest import INGEST_BUDGET_BYTES
+    from Data_loader.dtype_compaction import compact_dataframe, estimate_frame_bytes
+    compact, _ = compact_dataframe(sample, infer_field_roles(sample))
+    estimated = estimate_frame_bytes(compact) / len(compact) * rows
+    return "duckdb" if estimated > (budget or BACKEND_MEMORY_BYTES or INGEST_BUDGET_BYTES) else "pandas"
+
+
+# ---------- Backend ----------
+class DuckDBBackend:
+    """Aggregations and statistics over one source file, evaluated by DuckDB; every call uses its own connection."""
+
+    name = "duckdb"
+
+    def __init__(self, scan: str, columns: Optional[List[str]] = None):
+        self.scan = scan
+        self.columns = columns
+        self.select = _select_list(scan, columns)
+
+    @contextmanager
+    def connect(self):
+        import duckdb
+        config = {"temp_directory": cache_dir("duckdb")}
+        if DUCKDB_MEMORY_LIMIT:
+            config["memory_limit"] = DUCKDB_MEMORY_LIMIT
+        con = duckdb.connect(config=config)
+        try:
+            con.execute(f"CREATE TEMP VIEW src AS SELECT {self.select} FROM {self.scan}")
+            yield con
+        finally:
+            con.close()
+
+    # ----- rows -----
+    def sample(self, rows: int = BACKEND_SAMPLE_ROWS) -> pd.DataFrame:
+        """
+        Reservoir sample of `rows` rows from the whole file (role inference, Data Preview, scatter), repeatable so
+        reruns draw the same points; a head sample would misrepresent files sorted by date or key.
+        """
+        with self.connect() as con:
+            return con.sql(
+                f"SELECT * FROM src USING SAMPLE reservoir({int(rows)} ROWS) REPEATABLE ({BACKEND_SAMPLE_SEED})"
+            ).df()
+
+    def row_count(self) -> int:
+        """Rows of the whole source."""
+        with self.connect() as con:
+            return con.execute("SELECT count(*) FROM src").fetchone()[0]
+
+    # ----- aggregations -----
+    @staticmethod
+    def _measure(agg: str, val: str) -> str:
+        v = f"CAST({_quote(val)} AS DOUBLE)"
+        return {"sum": f"sum({v})", "abs_sum": f"sum(abs({v}))", "mean": f"avg({v})",
+                "mean_abs": f"avg(abs({v}))"}[agg]
+
+    def _query(self, key: AggKey) -> str:
+        agg, val, groups, freq = key
+        measure = self._measure(agg, val)
+        if not groups:
+            return f"SELECT {measure} FROM src"
+        if freq is not None:
+            d = _quote(groups[0])
+            bucket = f"date_trunc('{truncation_unit(freq)}', CAST({d} AS TIMESTAMP))"
+            return f"SELECT {bucket} AS bucket, {measure}, count({d}) FROM src GROUP BY 1"
+        cols = ", ".join(_quote(g) for g in groups)
+        return f"SELECT {cols}, {measure} FROM src GROUP BY {cols}"
+
+    def execute_plan(self, keys: List[AggKey]) -> Tuple[Dict[AggKey, Any], List[AggKey]]:
+        """(results in execute_plan shapes, keys DuckDB cannot express, e.g. sub-day time buckets)."""
+        results: Dict[AggKey, Any] = {}
+        unsupported: List[AggKey] = []
+        with self.connect() as con:
+            for key in keys:
+                try:
+                    rows = con.execute(self._query(key)).fetchall()
+                    results[key] = shape_rows(key, [tuple(r) for r in rows])
+                except PushdownUnsupported:
+                    unsupported.append(key)
+        return results, unsupported
+
+    def execute_plan_columns(self, keys: List[AggKey]) -> Dict[AggKey, Any]:
+        """Pandas evaluation of keys over only the columns they read (for the few DuckDB cannot express)."""
+        from Dashboard.aggregation_planner import execute_plan
+        if not keys:
+            return {}
+        columns = list(dict.fromkeys(c for _, val, groups, _ in keys for c in (val,) + tuple(groups)))
+        with self.connect() as con:
+            df = con.sql(f"SELECT {', '.join(_quote(c) for c in columns)} FROM src").df()
+        return execute_plan(df, keys)
+
+    def histogram(self, value_col: str, bins: int, color_col: Optional[str] = None) -> pd.DataFrame:
+        """
+        Row counts of `bins` equal-width bins spanning min..max of value_col (per color_col value if given):
+        columns [color_col,] bin, bin_start, bin_end, count. The top edge falls in the last bin, as in numpy.
+        """
+        v = f"CAST({_quote(value_col)} AS DOUBLE)"
+        bins = max(int(bins), 1)
+        bucket = f"coalesce(least(CAST(floor(({v} - lo) / nullif(width, 0)) AS BIGINT), {bins - 1}), 0)"
+        groups = [_quote(color_col)] if color_col else []
+        query = (
+            f"WITH r AS (SELECT min({v}) AS lo, (max({v}) - min({v})) / {bins} AS width FROM src) "
+            f"SELECT {', '.join(groups + [bucket + ' AS bin'])}, count(*) AS count, "
+            f"any_value(lo) AS lo, any_value(width) AS width "
+            f"FROM src, r WHERE {v} IS NOT NULL GROUP BY ALL ORDER BY ALL"
+        )
+        with self.connect() as con:
+            df = con.sql(query).df()
+        df["bin_start"] = df["lo"] + df["bin"] * df["width"]
+        df["bin_end"] = df["bin_start"] + df["width"]
+        return df[([color_col] if color_col else []) + ["bin", "bin_start", "bin_end", "count"]]
+
+    # ----- statistics (Insight.insight_engine equivalents) -----
+    def numeric_summary(self, columns: List[str]) -> List[str]:
+        """basic_kpi_insights: sum / avg / min / max of each numeric column, in one scan."""
+        if not columns:
+            return []
+        measures = ", ".join(f"sum({q}), avg({q}), min({q}), max({q})" for q in map(_quote, columns))
+        with self.connect() as con:
+            row = con.execute(f"SELECT {measures} FROM src").fetchone()
+        insights = []
+        for i, c in enumerate(columns):
+            col_sum, col_avg, col_min, col_max = (float("nan") if v is None else float(v) for v in row[4 * i:4 * i + 4])
+            insights.append(f"{c}: sum={col_sum:.2f}, avg={col_avg:.2f}, min={col_min:.2f}, max={col_max:.2f}")
+        return insights
+
+    def correlations(self, columns: List[str], min_corr: float = 0.3) -> List[Tuple[str, str, float]]:
+        """compute_correlations: |Pearson r| of every pair of numeric columns at or above min_corr, strongest first."""
+        pairs = [(a, b) for i, a in enumerate(columns) for b in columns[i + 1:]]
+        if not pairs:
+            return []
+        measures = ", ".join(f"corr(CAST({_quote(a)} AS DOUBLE), CAST({_quote(b)} AS DOUBLE))" for a, b in pairs)
+        with self.connect() as con:
+            row = con.execute(f"SELECT {measures} FROM src").fetchone()
+        found = [(a, b, abs(float(r))) for (a, b), r in zip(pairs, row)
+                 if r is not None and not math.isnan(r) and abs(r) >= min_corr]
+        return sorted(found, key=lambda x: -x[2])
+
+    def anomalies_zscore(self, columns: List[str], z_thresh: float = 3.0) -> Dict[str, int]:
+        """detect_anomalies_zscore: rows of each column at least z_thresh sample standard deviations from its mean."""
+        if not columns:
+            return {}
+        values = [f"CAST({q} AS DOUBLE)" for q in map(_quote, columns)]
+        with self.connect() as con:
+            moments = con.execute(f"SELECT {', '.join(f'avg({v}), stddev_samp({v})' for v in values)} FROM src").fetchone()
+            scored = [(c, v, moments[2 * i], moments[2 * i + 1]) for i, (c, v) in enumerate(zip(columns, values))
+                      if moments[2 * i + 1] and not math.isnan(moments[2 * i + 1])]
+            if not scored:
+                return {}
+            counts = con.execute(
+                f"SELECT {', '.join(f'count_if(abs({v} - ?) / ? >= ?)' for _, v, _, _ in scored)} FROM src",
+                [p for _, _, mu, sigma in scored for p in (mu, sigma, float(z_thresh))],
+            ).fetchone()
+        return {c: int(n) for (c, _, _, _), n in zip(scored, counts)}
+
+    def insights(self, columns: List[str]) -> List[str]:
+        """
+        The insights stage over the whole file: numeric_summary, then the correlation and z-score anomaly lines
+        generate_insights writes (top five pairs with |r| >= 0.35; columns with any value 3 deviations out).
+        """
+        insights = self.numeric_summary(columns)
+        for a, b, r in self.correlations(columns, min_corr=0.35)[:5]:
+            insights.append(f"Strong correlation ({r:.2f}) between {a} and {b}.")
+        for c, n in self.anomalies_zscore(columns, z_thresh=3.0).items():
+            if n:
+                insights.append(f"Detected {n} anomalies in {c} (z-score >= 3).")
+        return insights
+
+
+def open_backend(file_info: Dict, fingerprint: Optional[str], columns: Optional[List[str]] = None) -> Optional[DuckDBBackend]:
+    """DuckDB backend over the source (only `columns` if given), or None if the source cannot be scanned."""
+    scan = source_scan(file_info, fingerprint)
+    return None if scan is None else DuckDBBackend(scan, columns)
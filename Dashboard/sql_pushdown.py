@@ -0,0 +1,190 @@
+"""
+sql_pushdown.py
+- Pushdown mode for database sources: every aggregation a template needs (aggregation_planner keys) is compiled
+  to one SQLAlchemy Core GROUP BY query and only the aggregated rows are fetched
+  - KPI sum / mean / mean_abs          -> SELECT SUM(v) / AVG(v) / AVG(ABS(v))
+  - bar / pie abs_sum over a group      -> SELECT g, SUM(ABS(v)) ... GROUP BY g
+  - heatmap sum over (y, x)             -> SELECT y, x, SUM(v) ... GROUP BY y, x
+  - line sum per time_granularity       -> SELECT date_trunc(unit, d), SUM(v) ... GROUP BY 1
+- Time buckets: SQL truncates to day or month (date_trunc / strftime / date_format by dialect); the few
+  resulting rows are re-bucketed with pandas resample, so week / quarter / year and the labels match the
+  in-memory path exactly
+- Results have the same shape as aggregation_planner.execute_plan, so the generators are unchanged
+- Pandas fallback: a key the dialect cannot express (unknown dialect, sub-day granularity, date text the
+  database cannot parse or, on strictly typed dialects, a text date column) or whose query the database rejects
+  is computed with execute_plan over only the columns it needs
+- basic_kpi_insights equivalent: one SELECT of sum / avg / min / max per numeric column
+- Queries run on the shared engine pool (Data_loader/engine_registry.py), the same one the SQL loader uses
+"""
+from typing import Dict, Any, List, Optional, Tuple
+import os
+
+import pandas as pd
+
+from Dashboard.aggregation_planner import AggKey, execute_plan, resample_freq
+
+# Rows fetched for role inference, the Data Preview and raw-row charts (scatter, histogram) in pushdown mode.
+PUSHDOWN_SAMPLE_ROWS = int(os.environ.get("DASHBOARD_PUSHDOWN_SAMPLE_ROWS", "50000"))
+
+_DAY_OFFSETS = (pd.offsets.Day, pd.offsets.Week)
+# Dialects whose date_trunc only accepts date / timestamp columns (text dates fall back to pandas).
+_TYPED_DATE_DIALECTS = ("postgresql", "duckdb", "redshift", "snowflake")
+_MONTH_OFFSETS = (pd.offsets.MonthEnd, pd.offsets.MonthBegin, pd.offsets.QuarterEnd, pd.offsets.QuarterBegin,
+                  pd.offsets.YearEnd, pd.offsets.YearBegin)
+
+
+class PushdownUnsupported(Exception):
+    """The dialect cannot express an aggregation; it is computed in pandas instead."""
+
+
+# ---------- Compilation ----------
+def truncation_unit(freq: str) -> str:
+    """"day" or "month": the SQL truncation unit a pandas frequency is re-bucketed from."""
+    offset = pd.tseries.frequencies.to_offset(resample_freq(freq))
+    if isinstance(offset, _DAY_OFFSETS):
+        return "day"
+    if isinstance(offset, _MONTH_OFFSETS):
+        return "month"
+    raise PushdownUnsupported(f"time granularity {freq!r}")
+
+
+def time_bucket(column, freq: str, dialect: str):
+    """SQL expression truncating column to the day or month that contains it."""
+    import sqlalchemy as sa
+    unit = truncation_unit(freq)
+    if dialect in _TYPED_DATE_DIALECTS:
+        if not isinstance(column.type, (sa.Date, sa.DateTime)):
+            raise PushdownUnsupported(f"{column.name} is {column.type}, not a date type {dialect} can truncate")
+        return sa.func.date_trunc(unit, column)
+    if dialect == "sqlite":
+        return sa.func.strftime("%Y-%m-01" if unit == "month" else "%Y-%m-%d", column)
+    if dialect in ("mysql", "mariadb"):
+        return sa.func.date_format(column, "%Y-%m-01") if unit == "month" else sa.func.date(column)
+    raise PushdownUnsupported(f"date truncation on {dialect}")
+
+
+def _measure(tbl, agg: str, val: str):
+    import sqlalchemy as sa
+    col = tbl.c[val]
+    if agg == "sum":
+        return sa.func.sum(col)
+    if agg == "abs_sum":
+        return sa.func.sum(sa.func.abs(col))
+    if agg == "mean":
+        return sa.func.avg(col)
+    if agg == "mean_abs":
+        return sa.func.avg(sa.func.abs(col))
+    raise PushdownUnsupported(f"aggregation {agg!r}")
+
+
+def compile_aggregate(tbl, key: AggKey, dialect: str):
+    """SELECT for one aggregation key; time buckets also count non-null dates to detect unparseable text."""
+    import sqlalchemy as sa
+    agg, val, groups, freq = key
+    measure = _measure(tbl, agg, val).label("value")
+    if not groups:
+        return sa.select(measure)
+    if freq is not None:
+        bucket = time_bucket(tbl.c[groups[0]], freq, dialect).label("bucket")
+        return sa.select(bucket, measure, sa.func.count(tbl.c[groups[0]]).label("dates")).group_by(bucket)
+    cols = [tbl.c[g] for g in groups]
+    return sa.select(*cols, measure).group_by(*cols)
+
+
+# ---------- Result shaping (same shapes as execute_plan) ----------
+def shape_rows(key: AggKey, rows: List[Tuple]):
+    """Fetched GROUP BY rows of key in the shape execute_plan returns for it."""
+    agg, val, groups, freq = key
+    if not groups:
+        value = rows[0][0] if rows else None
+        if value is None:
+            return 0.0 if agg in ("sum", "abs_sum") else float("nan")
+        return float(value)
+    if freq is not None:
+        if any(bucket is None and dates for bucket, _, dates in rows):
+            raise PushdownUnsupported(f"{groups[0]} is not a date type the database can truncate")
+        rows = [r for r in rows if r[0] is not None]
+        index = pd.DatetimeIndex(pd.to_datetime([r[0] for r in rows]), name=groups[0])
+        series = pd.Series(pd.to_numeric([r[1] for r in rows]), index=index, name=val).sort_index()
+        return series.resample(resample_freq(freq)).sum()
+    rows = [r for r in rows if all(v is not None for v in r[:-1])]
+    if len(groups) == 1:
+        index = pd.Index([r[0] for r in rows], name=groups[0])
+    else:
+        index = pd.MultiIndex.from_tuples([tuple(r[:-1]) for r in rows], names=list(groups))
+    values = pd.to_numeric([r[-1] for r in rows]) if rows else []
+    return pd.Series(values, index=index, name=val, dtype=None if rows else "float64").sort_index()
+
+
+# ---------- Execution ----------
+def execute_plan_sql(conn, tbl, keys: List[AggKey]) -> Tuple[Dict[AggKey, Any], List[AggKey]]:
+    """
+    Run every key as a GROUP BY query; returns (results, keys that need the pandas fallback).
+    A query the database rejects is rolled back and its key falls back too, so one key never aborts the run.
+    """
+    from sqlalchemy.exc import DBAPIError
+    dialect = conn.dialect.name
+    results: Dict[AggKey, Any] = {}
+    fallback: List[AggKey] = []
+    for key in keys:
+        try:
+            rows = conn.execute(compile_aggregate(tbl, key, dialect)).fetchall()
+            results[key] = shape_rows(key, [tuple(r) for r in rows])
+        except PushdownUnsupported:
+            fallback.append(key)
+        except DBAPIError:
+            conn.rollback()
+            fallback.append(key)
+    return results, fallback
+
+
+def execute_plan_fallback(conn_str: str, table: str, keys: List[AggKey]) -> Dict[AggKey, Any]:
+    """Pandas evaluation of keys over just the columns they read (streamed with read_sql_table)."""
+    from Data_loader.data_loader import read_sql_table
+    if not keys:
+        return {}
+    columns = list(dict.fromkeys(c for agg, val, groups, _ in keys for c in (val,) + tuple(groups)))
+    df = read_sql_table(conn_str, table, columns=columns, max_rows=0)
+    return execute_plan(df, keys)
+
+
+def numeric_summary_sql(conn, tbl, columns: List[str]) -> List[str]:
+    """basic_kpi_insights computed in the database: sum / avg / min / max of each numeric column."""
+    import sqlalchemy as sa
+    if not columns:
+        return []
+    measures = []
+    for c in columns:
+        col = tbl.c[c]
+        measures += [sa.func.sum(col), sa.func.avg(col), sa.func.min(col), sa.func.max(col)]
+    row = conn.execute(sa.select(*measures)).fetchone()
+    insights = []
+    for i, c in enumerate(columns):
+        col_sum, col_avg, col_min, col_max = (float("nan") if v is None else float(v) for v in row[4 * i:4 * i + 4])
+        insights.append(f"{c}: sum={col_sum:.2f}, avg={col_avg:.2f}, min={col_min:.2f}, max={col_max:.2f}")
+    return insights
+
+
+def run_pushdown(conn_str: str, table: str, keys: List[AggKey],
+                 numeric_columns: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Evaluate keys (and the numeric summary) in the database.
+    Returns {aggregates, insights, row_count, pushed_down, fallback}.
+    """
+    import sqlalchemy as sa
+    from Data_loader.data_loader import reflect_table
+    from Data_loader.engine_registry import get_engine_registry
+
+    with get_engine_registry().connect(conn_str) as conn:
+        tbl = reflect_table(conn, table)
+        row_count = conn.execute(sa.select(sa.func.count()).select_from(tbl)).scalar()
+        aggregates, fallback = execute_plan_sql(conn, tbl, keys)
+        insights = numeric_summary_sql(conn, tbl, numeric_columns or [])
+    aggregates.update(execute_plan_fallback(conn_str, table, fallback))
+    return {
+        "aggregates": aggregates,
+        "insights": insights,
+        "row_count": row_count,
+        "pushed_down": len(keys) - len(fallback),
+        "fallback": fallback,
+    }
@@ -0,0 +1,162 @@
+"""
+template_registry.py
+- Parses each dashboard template once and validates every component up front
+- Precomputes the per-type component lists (KPIs vs. charts) used by the pipeline
+- Reloads a template only when its file mtime changes
+- Can load a whole directory of templates for multi-dashboard deployments
+"""
+from typing import Dict, Any, List, Optional
+import hashlib
+import json
+import os
+import threading
+
+# Required template fields per component type (all must be non-empty strings).
+COMPONENT_FIELDS = {
+    "kpi": ["value_field"],
+    "line": ["date_field", "value_field"],
+    "bar": ["group_field", "value_field"],
+    "pie": ["group_field", "value_field"],
+    "scatter": ["x_field", "y_field"],
+    "histogram": ["value_field"],
+    "heatmap": ["x_field", "y_field", "value_field"],
+}
+CHART_TYPES = [t for t in COMPONENT_FIELDS if t != "kpi"]
+KPI_AGGS = ("sum", "mean", "mean_abs")
+
+EMPTY_TEMPLATE = {"title": "Generated Dashboard", "layout": []}
+
+
+class TemplateError(ValueError):
+    """Raised when a template file cannot be parsed or a component fails validation."""
+
+
+# ---------- Validation / compilation ----------
+def validate_template(template: Dict) -> List[str]:
+    """Return a list of human-readable problems; empty when the template is valid."""
+    problems = []
+    layout = template.get("layout")
+    if not isinstance(layout, list):
+        return ["'layout' must be a list of components"]
+
+    seen_ids = set()
+    for i, comp in enumerate(layout):
+        where = f"component {i}"
+        if not isinstance(comp, dict):
+            problems.append(f"{where}: must be an object")
+            continue
+        cid = comp.get("id")
+        if cid:
+            where = f"component '{cid}'"
+            if cid in seen_ids:
+                problems.append(f"{where}: duplicate id")
+            seen_ids.add(cid)
+
+        ctype = comp.get("type")
+        if ctype not in COMPONENT_FIELDS:
+            problems.append(f"{where}: unknown type {ctype!r} (expected one of {', '.join(COMPONENT_FIELDS)})")
+            continue
+        for fld in COMPONENT_FIELDS[ctype]:
+            if not isinstance(comp.get(fld), str) or not comp.get(fld):
+                problems.append(f"{where}: {ctype} requires '{fld}'")
+        if ctype == "kpi" and comp.get("agg", "sum") not in KPI_AGGS:
+            problems.append(f"{where}: agg must be one of {', '.join(KPI_AGGS)}")
+        for fld in ("top_n", "bins"):
+            if fld in comp and (not isinstance(comp[fld], int) or comp[fld] <= 0):
+                problems.append(f"{where}: '{fld}' must be a positive integer")
+    return problems
+
+
+def template_hash(template: Dict) -> str:
+    """Stable hash of a template's title and layout (ignores registry metadata)."""
+    body = {"title": template.get("title"), "layout": template.get("layout", [])}
+    return hashlib.blake2b(json.dumps(body, sort_keys=True).encode(), digest_size=16).hexdigest()
+
+
+def compile_template(template: Dict, path: Optional[str] = None, mtime: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Validate a parsed template and return it with precomputed component lists:
+    title, layout, kpis, charts, hash, path, mtime. Raises TemplateError on validation problems.
+    """
+    problems = validate_template(template)
+    if problems:
+        name = path or template.get("title", "template")
+        raise TemplateError(f"Invalid template {name}:\n- " + "\n- ".join(problems))
+    layout = template.get("layout", [])
+    compiled = dict(template)
+    compiled.update({
+        "title": template.get("title", EMPTY_TEMPLATE["title"]),
+        "layout": layout,
+        "kpis": [c for c in layout if c.get("type") == "kpi"],
+        "charts": [c for c in layout if c.get("type") in CHART_TYPES],
+        "hash": template_hash(template),
+        "path": path,
+        "mtime": mtime,
+    })
+    return compiled
+
+
+def is_compiled(template: Dict) -> bool:
+    return "kpis" in template and "charts" in template and "hash" in template
+
+
+# ---------- Registry ----------
+class TemplateRegistry:
+    """Thread-safe cache of compiled templates keyed by absolute path."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+
+    def get(self, path: str) -> Dict[str, Any]:
+        """
+        Compiled template for path, re-parsed only when the file's mtime changed.
+        A missing file yields the empty template (same behaviour as before the registry).
+        """
+        path = os.path.abspath(path)
+        if not os.path.exists(path):
+            return compile_template(dict(EMPTY_TEMPLATE))
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry["mtime"] == mtime:
+                return entry
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                parsed = json.load(f)
+        except json.JSONDecodeError as e:
+            raise TemplateError(f"Invalid template {path}: {e}") from e
+        compiled = compile_template(parsed, path=path, mtime=mtime)
+        with self._lock:
+            self._entries[path] = compiled
+        return compiled
+
+    def load_directory(self, directory: str) -> Dict[str, Dict[str, Any]]:
+        """Compile every *.json template in a directory; returns {file stem: compiled template}."""
+        templates = {}
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".json"):
+                templates[os.path.splitext(name)[0]] = self.get(os.path.join(directory, name))
+        return templates
+
+    def invalidate(self, path: Optional[str] = None):
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(path), None)
+
+
+_registry = None
+
+
+def get_registry() -> TemplateRegistry:
+    """Process-wide registry shared by every Streamlit session."""
+    global _registry
+    if _registry is None:
+        _registry = TemplateRegistry()
+    return _registry
+
+
+def get_template(path: str) -> Dict[str, Any]:
+    return get_registry().get(path)
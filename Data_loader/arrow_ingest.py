@@ -0,0 +1,100 @@
+"""
+arrow_ingest.py
+- Arrow-backed CSV parser used by load_dataframe: one pass over the file, split into blocks that are parsed and
+  type-inferred in parallel on every core (pyarrow.csv with use_threads), converted to a pandas frame at the end
+- Date columns (chosen by the caller, e.g. names containing "date" for uploads) are read as text and converted
+  natively with pyarrow.compute.strptime, using the format pandas would infer from the first value; if that format
+  does not fit every value, pandas.to_datetime is tried, and if that fails too the column stays text
+  (the same outcome as read_csv(parse_dates=...))
+- Arrow also infers ISO dates / timestamps in every other column; those found in the first block are read as text
+  so the frame matches the pandas parser column for column, and any inferred later are cast back to text
+- Returns None when pyarrow is missing, DASHBOARD_CSV_ENGINE=pandas, or Arrow cannot parse the file (e.g. a
+  column whose type changes after the first block); the caller then falls back to pandas.read_csv
+"""
+from typing import Callable, List, Optional, Union
+import os
+
+import pandas as pd
+
+CSV_ENGINE = os.environ.get("DASHBOARD_CSV_ENGINE", "arrow")
+# Bytes per parse block; every block is parsed on its own thread.
+ARROW_BLOCK_SIZE = int(os.environ.get("DASHBOARD_ARROW_BLOCK_SIZE", str(4 * 1024 * 1024)))
+
+CsvSource = Union[str, bytes]
+
+
+def arrow_available() -> bool:
+    if CSV_ENGINE != "arrow":
+        return False
+    try:
+        import pyarrow.csv  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _reader(source: CsvSource):
+    import pyarrow as pa
+    return pa.BufferReader(source) if isinstance(source, (bytes, bytearray, memoryview)) else source
+
+
+def _header(source: CsvSource):
+    """Column names and inferred types, from the first block only."""
+    import pyarrow.csv as pv
+    reader = pv.open_csv(_reader(source), read_options=pv.ReadOptions(block_size=64 * 1024, use_threads=False))
+    try:
+        return reader.schema
+    finally:
+        reader.close()
+
+
+def _parse_dates(values) -> pd.Series:
+    """Text column -> datetime64 (native strptime with the inferred format, else pandas), or unchanged text."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from pandas.tseries.api import guess_datetime_format
+
+    first = values.drop_null().slice(0, 1).to_pylist()
+    fmt = guess_datetime_format(first[0]) if first else None
+    if fmt:
+        try:
+            return pc.strptime(values, format=fmt, unit="ns").to_pandas()
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            pass
+    text = values.to_pandas()
+    try:
+        return pd.to_datetime(text)
+    except (ValueError, TypeError, OverflowError):
+        return text
+
+
+def read_csv_arrow(source: CsvSource, columns: Optional[List[str]] = None,
+                   is_date_column: Optional[Callable[[str], bool]] = None) -> Optional[pd.DataFrame]:
+    """
+    Parse a CSV (path or bytes) with Arrow; only `columns` (kept in file order) if given.
+    is_date_column(name) selects the columns parsed as dates. Returns None if Arrow cannot be used.
+    """
+    if not arrow_available():
+        return None
+    import pyarrow as pa
+    import pyarrow.csv as pv
+
+    try:
+        schema = _header(source)
+        wanted = [c for c in schema.names if columns is None or c in columns]
+        dates = [c for c in wanted if is_date_column is not None and is_date_column(c)]
+        text = dates + [f.name for f in schema if f.name in wanted and f.name not in dates
+                        and pa.types.is_temporal(f.type)]
+        read_options = pv.ReadOptions(use_threads=True, block_size=ARROW_BLOCK_SIZE)
+        table = pv.read_csv(_reader(source), read_options=read_options, convert_options=pv.ConvertOptions(
+            include_columns=wanted, column_types={c: pa.string() for c in text}, strings_can_be_null=True,
+        ))
+        for i, f in enumerate(table.schema):
+            if pa.types.is_temporal(f.type):
+                table = table.set_column(i, f.name, table[f.name].cast(pa.string()))
+        df = table.to_pandas()
+        for c in dates:
+            df[c] = _parse_dates(table[c])
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError, KeyError):
+        return None
+    return df
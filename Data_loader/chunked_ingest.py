@@ -0,0 +1,136 @@
+"""
+chunked_ingest.py
+- Bounded-memory CSV ingest for large uploads: the file is parsed DASHBOARD_CSV_CHUNK_ROWS rows at a time, each
+  chunk is compacted as soon as it is parsed (Data_loader/dtype_compaction.py: first chunk decides, later chunks
+  follow with compact_like) and kept as a compact columnar piece; concat_chunks joins them at the end
+  (categoricals unioned). Only one raw chunk and the compact pieces are alive at a time, never the whole
+  file as Python strings next to the final frame.
+- Memory budget (DASHBOARD_INGEST_BUDGET_BYTES, default: the dataset store budget): after every chunk the final
+  in-memory size is projected from compact bytes per row x estimated total rows (file size / bytes per row so far)
+  - "refuse" (default): stop reading and raise IngestBudgetExceeded as soon as the projection exceeds the budget
+  - "sample": keep a uniform random share of rows (budget / projection, seeded, so runs are reproducible); when
+    the projection grows, rows already kept are thinned to the same share
+  (DASHBOARD_INGEST_OVER_BUDGET picks the mode)
+- on_progress(rows_loaded, bytes_read, total_bytes) after every chunk, so callers can show MB/s
+- load_dataframe uses this reader for CSV files larger than DASHBOARD_CHUNKED_MIN_BYTES
+  (DASHBOARD_INGEST_MODE=chunked: always, whole: never, auto: by size)
+"""
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Union
+import os
+
+import numpy as np
+import pandas as pd
+
+from Cache.dataset_store import DATASET_STORE_MAX_BYTES
+from Data_loader.dtype_compaction import compact_dataframe, compact_like, concat_chunks, estimate_frame_bytes
+
+CSV_CHUNK_ROWS = int(os.environ.get("DASHBOARD_CSV_CHUNK_ROWS", "100000"))
+CHUNKED_MIN_BYTES = int(os.environ.get("DASHBOARD_CHUNKED_MIN_BYTES", str(64 * 1024 * 1024)))
+INGEST_BUDGET_BYTES = int(os.environ.get("DASHBOARD_INGEST_BUDGET_BYTES", str(DATASET_STORE_MAX_BYTES)))
+INGEST_OVER_BUDGET = os.environ.get("DASHBOARD_INGEST_OVER_BUDGET", "refuse")
+INGEST_MODE = os.environ.get("DASHBOARD_INGEST_MODE", "auto")
+_SAMPLE_SEED = 0
+
+
+class IngestBudgetExceeded(ValueError):
+    """The file would not fit the ingest memory budget (refuse mode)."""
+
+
+def source_bytes(source: Union[str, BinaryIO]) -> Optional[int]:
+    """Size of a CSV path or file object in bytes, or None if it cannot be told without reading it."""
+    if isinstance(source, str):
+        return os.path.getsize(source)
+    if getattr(source, "size", None) is not None:  # Streamlit UploadedFile
+        return source.size
+    try:
+        pos = source.tell()
+        end = source.seek(0, os.SEEK_END)
+        source.seek(pos)
+        return end
+    except (AttributeError, OSError):
+        return None
+
+
+def use_chunked(total_bytes: Optional[int]) -> bool:
+    """Whether a CSV of total_bytes should be read with read_csv_chunked rather than in one pass."""
+    if INGEST_MODE == "chunked":
+        return True
+    if INGEST_MODE == "whole":
+        return False
+    return total_bytes is not None and total_bytes >= CHUNKED_MIN_BYTES
+
+
+def read_csv_chunked(source: Union[str, BinaryIO], columns: Optional[List[str]] = None,
+                     date_columns: Optional[List[str]] = None, chunk_rows: Optional[int] = None,
+                     budget_bytes: Optional[int] = None, over_budget: Optional[str] = None,
+                     on_progress: Optional[Callable[[int, int, Optional[int]], None]] = None,
+                     report: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+    """
+    Parse a CSV (path or binary file object) chunk by chunk into one compacted frame within the memory budget.
+    report, if given, is filled with {rows_read, rows_kept, sample_fraction, projected_bytes, bytes_read}.
+    Raises IngestBudgetExceeded in refuse mode.
+    """
+    from Schema_mapper.schema_mapper import infer_field_roles
+
+    chunk_rows = chunk_rows or CSV_CHUNK_ROWS
+    budget_bytes = INGEST_BUDGET_BYTES if budget_bytes is None else budget_bytes
+    over_budget = over_budget or INGEST_OVER_BUDGET
+    total_bytes = source_bytes(source)
+    rng = np.random.default_rng(_SAMPLE_SEED)
+
+    pieces: List[pd.DataFrame] = []
+    reference = None
+    rows_read = 0
+    parsed_bytes = 0  # compact size of every row read, kept or not
+    fraction = 1.0
+    projected = 0
+    bytes_read = 0
+    handle = open(source, "rb") if isinstance(source, str) else source
+    try:
+        reader = pd.read_csv(handle, usecols=columns, parse_dates=date_columns or False, chunksize=chunk_rows)
+        with reader:
+            for chunk in reader:
+                if reference is None:
+                    chunk, _ = compact_dataframe(chunk, infer_field_roles(chunk))
+                    reference = chunk.dtypes
+                else:
+                    chunk = compact_like(chunk, reference)
+                rows_read += len(chunk)
+                bytes_read = handle.tell()
+                parsed_bytes += estimate_frame_bytes(chunk)
+
+                # Projected size of the whole file at full fidelity
+                est_rows = rows_read
+                if total_bytes and bytes_read:
+                    est_rows = max(rows_read, total_bytes * rows_read // bytes_read)
+                projected = int(parsed_bytes / rows_read * est_rows)
+                if projected > budget_bytes:
+                    if over_budget != "sample":
+                        raise IngestBudgetExceeded(
+                            f"File needs about {projected / 2**20:,.0f} MB in memory, over the "
+                            f"{budget_bytes / 2**20:,.0f} MB ingest budget (DASHBOARD_INGEST_BUDGET_BYTES)."
+                        )
+                    new_fraction = min(fraction, budget_bytes / projected)
+                    if new_fraction < fraction:
+                        keep = new_fraction / fraction
+                        pieces = [p[rng.random(len(p)) < keep] for p in pieces]
+                        fraction = new_fraction
+                if fraction < 1.0:
+                    chunk = chunk[rng.random(len(chunk)) < fraction]
+                pieces.append(chunk)
+                if on_progress is not None:
+                    on_progress(rows_read, bytes_read, total_bytes)
+    finally:
+        if handle is not source:
+            handle.close()
+
+    df = concat_chunks(pieces) if pieces else pd.DataFrame(columns=columns or [])
+    if report is not None:
+        report.update({
+            "rows_read": rows_read,
+            "rows_kept": len(df),
+            "sample_fraction": fraction,
+            "projected_bytes": projected,
+            "bytes_read": bytes_read,
+        })
+    return df
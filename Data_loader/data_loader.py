@@ -0,0 +1,72 @@
+"""
+data_loader.py
+- Database source for the dashboard: read_sql_table(connection string, table)
+- Streams the table with a server-side cursor (SQLAlchemy stream_results / yield_per) and fetches it in chunks,
+  so the driver never buffers the whole result set next to the DataFrame being built
+- Each chunk is compacted as it arrives (Data_loader/dtype_compaction.py): only the compact chunks and one raw
+  chunk are in memory at a time, and categoricals are unioned at the end
+- Configurable chunk size and row cap (DASHBOARD_SQL_CHUNK_ROWS, DASHBOARD_SQL_MAX_ROWS; 0 = no cap)
+- Optional on_progress(rows_loaded) callback after every chunk
+- Connections come from the shared engine pool (Data_loader/engine_registry.py)
+"""
+from typing import Callable, List, Optional
+import os
+
+import pandas as pd
+
+from Data_loader.dtype_compaction import compact_dataframe, compact_like, concat_chunks
+from Data_loader.engine_registry import get_engine_registry
+
+SQL_CHUNK_ROWS = int(os.environ.get("DASHBOARD_SQL_CHUNK_ROWS", "50000"))
+SQL_MAX_ROWS = int(os.environ.get("DASHBOARD_SQL_MAX_ROWS", "0"))
+
+
+def reflect_table(conn, table: str):
+    """Reflect "table" or "schema.table" so the name is quoted by the dialect, never interpolated."""
+    import sqlalchemy as sa
+    schema, _, name = table.rpartition(".")
+    return sa.Table(name, sa.MetaData(), schema=schema or None, autoload_with=conn)
+
+
+def read_sql_table(conn_str: str, table: str, chunk_rows: Optional[int] = None, max_rows: Optional[int] = None,
+                   on_progress: Optional[Callable[[int], None]] = None,
+                   columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Load a whole table (up to max_rows rows, only `columns` if given) as a compacted DataFrame.
+    chunk_rows / max_rows default to DASHBOARD_SQL_CHUNK_ROWS / DASHBOARD_SQL_MAX_ROWS.
+    """
+    import sqlalchemy as sa
+    from Schema_mapper.schema_mapper import infer_field_roles
+
+    chunk_rows = chunk_rows or SQL_CHUNK_ROWS
+    max_rows = SQL_MAX_ROWS if max_rows is None else max_rows
+
+    with get_engine_registry().connect(conn_str) as conn:
+        tbl = reflect_table(conn, table)
+        stmt = sa.select(*[tbl.c[c] for c in columns]) if columns else sa.select(tbl)
+        if max_rows:
+            stmt = stmt.limit(max_rows)
+        result = conn.execution_options(stream_results=True, yield_per=chunk_rows).execute(stmt)
+        names = list(result.keys())
+
+        chunks: List[pd.DataFrame] = []
+        reference = None
+        loaded = 0
+        for rows in result.partitions(chunk_rows):
+            chunk = pd.DataFrame.from_records(rows, columns=names)
+            if reference is None:
+                chunk, _ = compact_dataframe(chunk, infer_field_roles(chunk))
+                reference = chunk.dtypes
+            else:
+                chunk = compact_like(chunk, reference)
+            chunks.append(chunk)
+            loaded += len(chunk)
+            if on_progress is not None:
+                on_progress(loaded)
+            if max_rows and loaded >= max_rows:
+                break
+        result.close()
+
+    if not chunks:
+        return pd.DataFrame(columns=names)
+    return concat_chunks(chunks)
@@ -0,0 +1,139 @@
+"""
+dtype_compaction.py
+- Post-load dtype compaction driven by infer_field_roles:
+  - low-cardinality text ("categorical" role) -> category, so groupbys hash integer codes instead of Python strings
+  - integer columns -> smallest signed int that holds them (int8/int16/int32); sums still accumulate in int64
+  - date-like text columns (name contains "date"/"time") -> datetime64, parsed once instead of in every chart
+- Float columns are left as float64: float32 is not lossless for amounts and would change accumulated totals
+- Chunked loaders compact the first chunk, convert later chunks the same way (compact_like) and join them with
+  concat_chunks, which merges categoricals via union_categoricals instead of falling back to object
+- Reports memory before/after and which columns were converted; Python-object columns are sized from a sample,
+  because an exact deep memory_usage() walks every string and costs more than the compaction itself
+"""
+from typing import Dict, Any, List, Tuple
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# A text column whose name suggests a date is only converted if at least this share of its values parse.
+DATE_PARSE_MIN_RATIO = float(os.environ.get("DASHBOARD_DATE_PARSE_MIN_RATIO", "0.9"))
+
+_INT_TYPES = (np.int8, np.int16, np.int32)
+_SIZE_SAMPLE = 1000
+
+
+def _is_text(series: pd.Series) -> bool:
+    return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+
+
+def _looks_like_date(name) -> bool:
+    name = str(name).lower()
+    return "date" in name or "time" in name
+
+
+def _column_bytes(series: pd.Series) -> int:
+    if not pd.api.types.is_object_dtype(series) or series.empty:
+        return int(series.memory_usage(index=False, deep=True))
+    step = max(1, len(series) // _SIZE_SAMPLE)
+    sample = series.iloc[::step]
+    per_value = sum(sys.getsizeof(v) for v in sample) / len(sample)
+    return int(len(series) * (series.dtype.itemsize + per_value))
+
+
+def estimate_frame_bytes(df: pd.DataFrame) -> int:
+    """Approximate in-memory size of df (object columns sized from a sample)."""
+    return sum(_column_bytes(col) for _, col in df.items())
+
+
+def _smallest_int(series: pd.Series):
+    """Smallest signed int dtype holding every value; the type minimum is excluded so abs() cannot overflow."""
+    if series.empty:
+        return None
+    lo, hi = series.min(), series.max()
+    for t in _INT_TYPES:
+        info = np.iinfo(t)
+        if info.min < lo and hi <= info.max:
+            return t if np.dtype(t).itemsize < series.dtype.itemsize else None
+    return None
+
+
+def _parse_dates(series: pd.Series):
+    parsed = pd.to_datetime(series, errors="coerce")
+    present = series.notna().sum()
+    if present and parsed.notna().sum() >= present * DATE_PARSE_MIN_RATIO:
+        return parsed
+    return None
+
+
+def compact_dataframe(df: pd.DataFrame, roles: Dict[str, str]) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Return (compacted copy, report). roles is updated in place for text columns parsed as dates.
+    report: {before_bytes, after_bytes, saved_bytes, saved_pct, converted: {column: "old -> new"}}
+    """
+    before = estimate_frame_bytes(df)
+    converted: Dict[str, str] = {}
+    columns = {}
+    for c in df.columns:
+        series = df[c]
+        role = roles.get(c)
+        new = None
+        if _is_text(series) and _looks_like_date(c):
+            new = _parse_dates(series)
+            if new is not None:
+                roles[c] = "datetime"
+        if new is None and _is_text(series) and role == "categorical":
+            new = series.astype("category")
+        elif new is None and pd.api.types.is_integer_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            target = _smallest_int(series)
+            if target is not None:
+                new = series.astype(target)
+        if new is not None:
+            converted[c] = f"{series.dtype} -> {new.dtype}"
+            columns[c] = new
+
+    out = df.copy(deep=False)
+    for c, new in columns.items():
+        out[c] = new
+    after = estimate_frame_bytes(out)
+    return out, {
+        "before_bytes": before,
+        "after_bytes": after,
+        "saved_bytes": before - after,
+        "saved_pct": round((before - after) / before * 100, 1) if before else 0.0,
+        "converted": converted,
+    }
+
+
+def compact_like(df: pd.DataFrame, dtypes: pd.Series) -> pd.DataFrame:
+    """Apply to a later chunk the conversions compact_dataframe chose for the first one (dtypes = its dtypes)."""
+    out = df.copy(deep=False)
+    for c, series in df.items():
+        target = dtypes.get(c)
+        if target is None:
+            continue
+        if isinstance(target, pd.CategoricalDtype) and _is_text(series):
+            out[c] = series.astype("category")
+        elif pd.api.types.is_datetime64_any_dtype(target) and _is_text(series):
+            out[c] = pd.to_datetime(series, errors="coerce")
+        elif pd.api.types.is_integer_dtype(target) and pd.api.types.is_integer_dtype(series):
+            smaller = _smallest_int(series)
+            if smaller is not None:
+                out[c] = series.astype(smaller)
+    return out
+
+
+def concat_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate compacted chunks column by column; categoricals are unioned, ints upcast only as needed."""
+    if len(chunks) == 1:
+        return chunks[0].reset_index(drop=True)
+    columns = {}
+    for c in chunks[0].columns:
+        parts = [ch[c] for ch in chunks]
+        if all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+            columns[c] = pd.Series(union_categoricals(parts, sort_categories=True, ignore_order=True), name=c)
+        else:
+            columns[c] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns)
@@ -0,0 +1,156 @@
+"""
+engine_registry.py
+- Process-wide registry of SQLAlchemy engines shared by the SQL loader (Data_loader/data_loader.py) and pushdown
+  queries (Dashboard/sql_pushdown.py), so repeated refreshes against the same database reuse pooled connections
+  instead of building an engine and connecting from scratch every time
+- Keyed by the normalized connection string (parsed with make_url, so whitespace and query-parameter order do not
+  create duplicate engines); credentials are part of the key but never appear in stats()
+- Pooling: DASHBOARD_SQL_POOL_SIZE / DASHBOARD_SQL_MAX_OVERFLOW / DASHBOARD_SQL_POOL_TIMEOUT / DASHBOARD_SQL_POOL_RECYCLE
+  for dialects that use a queue pool; pre-ping is always on, so a connection the server dropped is replaced
+  transparently instead of failing the load
+- Idle eviction: engines with no checked-out connection that were not used for DASHBOARD_SQL_ENGINE_IDLE_SECONDS are
+  disposed (checked on every connect)
+- Metrics per engine: checkouts, new database connections, connections replaced by pre-ping, checkout time (waiting
+  for a pooled connection plus, when none is idle, opening a new one and the pre-ping)
+"""
+from typing import Dict, Any, Iterator
+from contextlib import contextmanager
+import os
+import threading
+import time
+
+SQL_POOL_SIZE = int(os.environ.get("DASHBOARD_SQL_POOL_SIZE", "5"))
+SQL_MAX_OVERFLOW = int(os.environ.get("DASHBOARD_SQL_MAX_OVERFLOW", "5"))
+SQL_POOL_TIMEOUT = float(os.environ.get("DASHBOARD_SQL_POOL_TIMEOUT", "30"))
+SQL_POOL_RECYCLE = int(os.environ.get("DASHBOARD_SQL_POOL_RECYCLE", "1800"))
+SQL_ENGINE_IDLE_SECONDS = float(os.environ.get("DASHBOARD_SQL_ENGINE_IDLE_SECONDS", "600"))
+
+
+def normalize_conn_str(conn_str: str) -> str:
+    """Canonical form of a connection string (registry key)."""
+    import sqlalchemy as sa
+    url = sa.engine.make_url(conn_str.strip())
+    return url.update_query_dict(dict(sorted(url.query.items())), append=False).render_as_string(hide_password=False)
+
+
+class EngineRegistry:
+    def __init__(self, idle_seconds: float = SQL_ENGINE_IDLE_SECONDS):
+        self.idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+
+    # ---------- Public API ----------
+    def get_engine(self, conn_str: str):
+        """Shared engine for conn_str, created on first use."""
+        return self._entry(normalize_conn_str(conn_str))["engine"]
+
+    @contextmanager
+    def connect(self, conn_str: str) -> Iterator[Any]:
+        """Pooled connection for conn_str; checkout time and usage are recorded in the engine's metrics."""
+        key = normalize_conn_str(conn_str)
+        self.evict_idle()
+        entry = self._entry(key, checkout=True)
+        try:
+            start = time.perf_counter()
+            conn = entry["engine"].connect()
+            took = (time.perf_counter() - start) * 1000
+            with self._lock:
+                entry["checkouts"] += 1
+                entry["checkout_ms_total"] += took
+                entry["checkout_ms_max"] = max(entry["checkout_ms_max"], took)
+            with conn:
+                yield conn
+        finally:
+            with self._lock:
+                entry["active"] -= 1
+                entry["last_used"] = time.time()
+
+    def evict_idle(self) -> int:
+        """Dispose engines with no connection in use that were idle longer than idle_seconds; returns the count."""
+        cutoff = time.time() - self.idle_seconds
+        with self._lock:
+            idle = [k for k, e in self._entries.items() if e["active"] == 0 and e["last_used"] < cutoff]
+            evicted = [self._entries.pop(k) for k in idle]
+        for entry in evicted:
+            entry["engine"].dispose()
+        return len(evicted)
+
+    def dispose_all(self):
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            entry["engine"].dispose()
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            engines = {}
+            for e in self._entries.values():
+                engines[e["engine"].url.render_as_string(hide_password=True)] = {
+                    "checkouts": e["checkouts"],
+                    "connects": e["connects"],
+                    "invalidated": e["invalidated"],
+                    "in_use": e["active"],
+                    "checkout_ms_total": round(e["checkout_ms_total"], 1),
+                    "checkout_ms_avg": round(e["checkout_ms_total"] / e["checkouts"], 2) if e["checkouts"] else 0.0,
+                    "checkout_ms_max": round(e["checkout_ms_max"], 1),
+                    "pool": e["engine"].pool.status(),
+                    "idle_s": round(now - e["last_used"], 1),
+                }
+            return {"engines": len(engines), "idle_seconds": self.idle_seconds, "by_url": engines}
+
+    # ---------- Internals ----------
+    def _entry(self, key: str, checkout: bool = False) -> Dict[str, Any]:
+        """
+        Registry entry for key, created on first use. checkout=True counts a connection in use before the lock is
+        released, so evict_idle cannot dispose the engine between the lookup and the connect.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = {"engine": self._create_engine(key), "active": 0, "last_used": time.time(), "checkouts": 0,
+                         "connects": 0, "invalidated": 0, "checkout_ms_total": 0.0, "checkout_ms_max": 0.0}
+                self._listen(entry)
+                self._entries[key] = entry
+            if checkout:
+                entry["active"] += 1
+            return entry
+
+    @staticmethod
+    def _create_engine(key: str):
+        import sqlalchemy as sa
+        url = sa.engine.make_url(key)
+        kwargs: Dict[str, Any] = {"pool_pre_ping": True}
+        # Singleton / static pools (e.g. in-memory SQLite) do not take queue-pool sizing arguments
+        if issubclass(url.get_dialect().get_pool_class(url), sa.pool.QueuePool):
+            kwargs.update(pool_size=SQL_POOL_SIZE, max_overflow=SQL_MAX_OVERFLOW,
+                          pool_timeout=SQL_POOL_TIMEOUT, pool_recycle=SQL_POOL_RECYCLE)
+        return sa.create_engine(url, **kwargs)
+
+    def _listen(self, entry: Dict[str, Any]):
+        import sqlalchemy as sa
+
+        def on_connect(dbapi_conn, record):
+            with self._lock:
+                entry["connects"] += 1
+
+        def on_invalidate(dbapi_conn, record, exc):
+            with self._lock:
+                entry["invalidated"] += 1
+
+        sa.event.listen(entry["engine"], "connect", on_connect)
+        sa.event.listen(entry["engine"].pool, "invalidate", on_invalidate)
+
+
+_engine_registry = None
+_engine_registry_lock = threading.Lock()
+
+
+def get_engine_registry() -> EngineRegistry:
+    """Process-wide registry shared by every Streamlit session."""
+    global _engine_registry
+    with _engine_registry_lock:
+        if _engine_registry is None:
+            _engine_registry = EngineRegistry()
+    return _engine_registry
@@ -0,0 +1,41 @@
+"""
+projection.py
+- Template-driven column projection: decide which columns a run needs before the data is loaded
+- Roles are inferred on the first PROJECTION_SAMPLE_ROWS rows (source_loader.load_sample), the template is mapped on
+  them, and the run loads only the columns the mapped components read plus every numeric column (the insight
+  engine summarises all of them)
+- The mapping computed here is the one the run uses, so it always refers to loaded columns
+- Set DASHBOARD_PROJECTION=0 to always load every column
+"""
+from typing import Dict, Any, List
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from Schema_mapper.schema_mapper import infer_field_roles, map_template_fields
+from Dashboard.aggregation_planner import component_columns
+
+PROJECTION_ENABLED = os.environ.get("DASHBOARD_PROJECTION", "1") != "0"
+PROJECTION_SAMPLE_ROWS = int(os.environ.get("DASHBOARD_PROJECTION_SAMPLE_ROWS", "5000"))
+
+
+def plan_projection(template: Dict, sample: pd.DataFrame) -> Dict[str, Any]:
+    """{columns (in source order), total_columns, roles, mapping} for running template on sample's source."""
+    roles = infer_field_roles(sample)
+    mapping = map_template_fields(template, roles)
+    needed = {c for comp in template.get("layout", []) for c in component_columns(comp, mapping)}
+    needed.update(sample.select_dtypes(include=[np.number]).columns)
+    return {
+        "columns": [c for c in sample.columns if c in needed],
+        "total_columns": len(sample.columns),
+        "roles": roles,
+        "mapping": mapping,
+    }
+
+
+def projection_key(fingerprint: str, columns: List[str]) -> str:
+    """Dataset store key of a source loaded with only `columns`."""
+    digest = hashlib.blake2b(repr(list(columns)).encode(), digest_size=8).hexdigest()
+    return f"{fingerprint}:cols:{digest}"
@@ -0,0 +1,248 @@
+"""
+source_loader.py
+- Loads the app's data sources (sample files, uploads, database tables) into DataFrames, without Streamlit, so the
+  app, the background jobs, the warm-up and the batch CLI share one loader
+- file_info dicts come from ui.input_ui.render_input_ui (or sample_file_info); uploads are any binary file object
+  with a name (Streamlit UploadedFile, an open file)
+- load_dataframe / load_sample: full or first-rows load through the ingest cache and the Arrow / chunked / XLSX
+  readers; source_fingerprint / with_fingerprint: cheap source identity; estimate_rows: row count before loading
+- pandas and the readers are imported on first use, so importing this module stays cheap
+"""
+import os
+import re
+import hashlib
+import zipfile
+
+
+def sample_file_info(current_dir):
+    """file_info for the bundled sample dataset (CSV preferred, XLSX fallback)."""
+    return {
+        "type": "sample",
+        "path_csv": os.path.join(current_dir, "Data", "bank_transactions.csv"),
+        "path_xlsx": os.path.join(current_dir, "Data", "bank_transactions.xlsx"),
+        "uploaded": None, "conn": None, "table": None,
+    }
+
+
+def load_dataframe(file_info, on_progress=None, columns=None, report=None):
+    """
+    Load the actual DataFrame only when needed. on_progress(rows_loaded) is called while a table streams in;
+    large CSVs call on_progress(rows_loaded, bytes_read, total_bytes) after every chunk.
+    CSV / XLSX sources are served from the columnar ingest cache (Cache/ingest_cache.py) after their first parse.
+    columns, if given, loads only those columns: SELECT list for tables, usecols for CSV, projection of the
+    cached columnar copy for XLSX (the workbook is parsed whole either way, so the full copy is cached).
+    CSVs above DASHBOARD_CHUNKED_MIN_BYTES are read in bounded-memory chunks (Data_loader/chunked_ingest.py) and
+    raise IngestBudgetExceeded when they would not fit the ingest budget; report, if given, receives the chunked
+    reader's summary (sample_fraction < 1 when the file was sampled to fit; sampled frames are not cached).
+    """
+    if file_info["type"] == "db":
+        df = None
+        if file_info["conn"] and file_info["table"]:
+            from Data_loader.data_loader import read_sql_table
+            df = read_sql_table(file_info["conn"], file_info["table"], on_progress=on_progress, columns=columns)
+        return df
+
+    from Cache import ingest_cache
+    fingerprint = source_fingerprint(file_info) if ingest_cache.enabled() else None
+    if fingerprint is not None:
+        df = ingest_cache.get_frame(ingest_cache.ingest_key(fingerprint), columns)
+        if df is None and columns:
+            df = ingest_cache.get_frame(ingest_cache.ingest_key(fingerprint, columns))
+        if df is not None:
+            return df
+
+    parse_columns = None if _is_xlsx(file_info) else columns
+    summary = {} if report is None else report
+    df = _parse_file(file_info, columns=parse_columns, on_progress=on_progress, report=summary)
+    if df is not None and fingerprint is not None and summary.get("sample_fraction", 1.0) >= 1.0:
+        ingest_cache.put_frame(ingest_cache.ingest_key(fingerprint, parse_columns), df)
+    if df is not None and columns and parse_columns is None:
+        df = df[list(columns)]
+    return df
+
+
+def load_sample(file_info, rows):
+    """First `rows` rows (all columns) of the source, used to plan a projected load; None if nothing to load."""
+    if file_info["type"] == "db":
+        if not (file_info["conn"] and file_info["table"]):
+            return None
+        from Data_loader.data_loader import read_sql_table
+        return read_sql_table(file_info["conn"], file_info["table"], max_rows=rows)
+
+    from Cache import ingest_cache
+    fingerprint = source_fingerprint(file_info) if ingest_cache.enabled() else None
+    if fingerprint is not None:
+        df = ingest_cache.get_head(ingest_cache.ingest_key(fingerprint), rows)
+        if df is not None:
+            return df
+        if _is_xlsx(file_info):
+            # The projected load that follows parses the whole sheet anyway; parse it once now and cache it
+            df = load_dataframe(file_info)
+            return None if df is None else df.head(rows)
+    return _parse_file(file_info, nrows=rows)
+
+
+def _is_xlsx(file_info):
+    if file_info["type"] == "sample":
+        return not os.path.exists(file_info["path_csv"])
+    if file_info["type"] == "upload" and file_info["uploaded"]:
+        return not file_info["uploaded"].name.lower().endswith(".csv")
+    return False
+
+
+def _upload_bytes(uploaded):
+    """Whole content of an uploaded file, leaving its position unchanged."""
+    if hasattr(uploaded, "getvalue"):
+        return uploaded.getvalue()
+    pos = uploaded.tell()
+    uploaded.seek(0)
+    data = uploaded.read()
+    uploaded.seek(pos)
+    return data
+
+
+def _is_date_column(name):
+    return "date" in name.lower()
+
+
+def _parse_file(file_info, columns=None, nrows=None, on_progress=None, report=None):
+    """
+    Parse the sample or uploaded CSV / XLSX file (only `columns` / the first `nrows` rows if given).
+    Whole CSVs go through the multithreaded Arrow parser (Data_loader/arrow_ingest.py), or the bounded-memory
+    chunked reader (Data_loader/chunked_ingest.py) when they are large, and workbooks through the streaming XLSX
+    reader (Data_loader/xlsx_ingest.py); pandas is the fallback for all of them.
+    """
+    import pandas as pd
+    from Data_loader.arrow_ingest import read_csv_arrow
+    from Data_loader.chunked_ingest import read_csv_chunked, source_bytes, use_chunked
+    from Data_loader.xlsx_ingest import read_xlsx
+    df = None
+    if file_info["type"] == "sample":
+        if os.path.exists(file_info["path_csv"]):
+            path = file_info["path_csv"]
+            chunked = nrows is None and use_chunked(source_bytes(path))
+            if nrows is None and not chunked:
+                df = read_csv_arrow(path, columns, is_date_column=_is_date_column)
+            if df is None:
+                # the same date columns on every path, so a projection probe (nrows) sees the types the load gets
+                headers = pd.read_csv(path, nrows=0).columns.tolist()
+                date_cols = [c for c in headers if _is_date_column(c) and (columns is None or c in columns)]
+                if chunked:
+                    df = read_csv_chunked(path, columns, date_columns=date_cols, on_progress=on_progress,
+                                          report=report)
+                else:
+                    df = pd.read_csv(path, parse_dates=date_cols, usecols=columns, nrows=nrows)
+        elif os.path.exists(file_info["path_xlsx"]):
+            df = read_xlsx(file_info["path_xlsx"], columns=columns, nrows=nrows)
+            if df is None:
+                df = pd.read_excel(file_info["path_xlsx"], parse_dates=True, usecols=columns, nrows=nrows)
+
+    elif file_info["type"] == "upload" and file_info["uploaded"]:
+        uploaded = file_info["uploaded"]
+        uploaded.seek(0)
+        if uploaded.name.lower().endswith(".csv"):
+            chunked = nrows is None and use_chunked(source_bytes(uploaded))
+            if nrows is None and not chunked:
+                df = read_csv_arrow(_upload_bytes(uploaded), columns, is_date_column=_is_date_column)
+            if df is None:
+                headers = pd.read_csv(uploaded, nrows=0).columns.tolist()
+                date_cols = [c for c in headers if _is_date_column(c) and (columns is None or c in columns)]
+                uploaded.seek(0)
+                if chunked:
+                    df = read_csv_chunked(uploaded, columns, date_columns=date_cols, on_progress=on_progress,
+                                          report=report)
+                else:
+                    df = pd.read_csv(uploaded, parse_dates=date_cols, usecols=columns, nrows=nrows)
+        else:
+            df = read_xlsx(_upload_bytes(uploaded), columns=columns, nrows=nrows, is_date_column=_is_date_column)
+            if df is None:
+                headers = pd.read_excel(uploaded, nrows=0).columns.tolist()
+                date_cols = [c for c in headers if _is_date_column(c) and (columns is None or c in columns)]
+                uploaded.seek(0)
+                df = pd.read_excel(uploaded, parse_dates=date_cols, usecols=columns, nrows=nrows)
+
+    return df
+
+
+def source_fingerprint(file_info):
+    """
+    Cheap identity of the data source, computed before loading:
+    sample -> path + size + mtime, upload -> hash of the uploaded bytes, db -> connection string + table.
+    Returns None when there is nothing to load. A file_info from with_fingerprint() carries it already.
+    """
+    if "fingerprint" in file_info:
+        return file_info["fingerprint"]
+    h = hashlib.blake2b(digest_size=16)
+    if file_info["type"] == "sample":
+        for path in (file_info["path_csv"], file_info["path_xlsx"]):
+            if os.path.exists(path):
+                st_ = os.stat(path)
+                h.update(f"sample:{os.path.abspath(path)}:{st_.st_size}:{st_.st_mtime_ns}".encode())
+                return h.hexdigest()
+        return None
+    if file_info["type"] == "upload" and file_info["uploaded"]:
+        h.update(b"upload:" + _upload_bytes(file_info["uploaded"]))
+        return h.hexdigest()
+    if file_info["type"] == "db" and file_info["conn"] and file_info["table"]:
+        h.update(f"db:{file_info['conn']}:{file_info['table']}".encode())
+        return h.hexdigest()
+    return None
+
+
+def with_fingerprint(file_info):
+    """Copy of file_info carrying its source_fingerprint, so an upload is hashed once per run, not per lookup."""
+    if "fingerprint" in file_info:
+        return file_info
+    return dict(file_info, fingerprint=source_fingerprint(file_info))
+
+
+_DIMENSION_RE = re.compile(rb'<dimension ref="[A-Z]+\d+:[A-Z]+(\d+)"')
+
+
+def _csv_rows(head, total_size):
+    """Row estimate from the average line length of the first block."""
+    lines = head.count(b"\n")
+    if lines == 0:
+        return 1 if head else 0
+    return max(0, int(total_size / (len(head) / lines)) - 1)
+
+
+def _xlsx_rows(fileobj):
+    """Row count from the first sheet's <dimension> tag (no workbook parsing)."""
+    try:
+        with zipfile.ZipFile(fileobj) as zf:
+            sheets = sorted(n for n in zf.namelist() if n.startswith("xl/worksheets/sheet"))
+            if not sheets:
+                return None
+            with zf.open(sheets[0]) as f:
+                m = _DIMENSION_RE.search(f.read(4096))
+    except (zipfile.BadZipFile, OSError):
+        return None
+    return int(m.group(1)) - 1 if m else None
+
+
+def estimate_rows(file_info):
+    """
+    Cheap estimate of the row count before loading, used to size a run's memory; None when unknown (db).
+    CSV: file size / average line length of the first 64 KB; XLSX: the sheet's declared dimension.
+    """
+    if file_info["type"] == "sample":
+        if os.path.exists(file_info["path_csv"]):
+            with open(file_info["path_csv"], "rb") as f:
+                return _csv_rows(f.read(65536), os.path.getsize(file_info["path_csv"]))
+        if os.path.exists(file_info["path_xlsx"]):
+            return _xlsx_rows(file_info["path_xlsx"])
+        return None
+    if file_info["type"] == "upload" and file_info["uploaded"]:
+        uploaded = file_info["uploaded"]
+        pos = uploaded.tell()
+        try:
+            uploaded.seek(0, os.SEEK_END)
+            size = uploaded.tell()
+            uploaded.seek(0)
+            if uploaded.name.lower().endswith(".csv"):
+                return _csv_rows(uploaded.read(65536), size)
+            return _xlsx_rows(uploaded)
+        finally:
+            uploaded.seek(pos)
+    return None
@@ -0,0 +1,408 @@
+"""
+xlsx_ingest.py
+- Fast reader for .xlsx workbooks used by load_dataframe instead of pandas.read_excel / openpyxl
+- Streaming and read-only: the sheet XML is decompressed in blocks cut at row boundaries, and the cells of each
+  block are matched with one regular expression. No cell objects are built; each block becomes compact numpy
+  arrays (column, row, kind, number, shared-string index) right away.
+- Vectorized type conversion per column, matching what read_excel returns:
+  - integral numbers -> int64, other numbers -> float64, empty cells -> NaN
+  - date-formatted numbers (cell style) -> datetime64
+  - shared / inline strings -> object, booleans -> bool
+  - mixed columns -> object
+- nrows stops reading the sheet once enough rows were parsed (cheap header + sample reads for projection)
+- Parallel on DASHBOARD_XLSX_WORKERS processes (default: one per core, at most 4): several sheets are parsed side
+  by side, and the blocks of one large sheet are parsed by a bounded pool (the main process keeps streaming).
+  Workers are spawned, not forked: the app calls this from Streamlit, job-queue and warm-up threads, and a forked
+  child of a threaded process can deadlock on a lock held by another thread
+- Returns None for anything it does not understand (e.g. cells without a reference); the caller then falls
+  back to pandas.read_excel. DASHBOARD_XLSX_ENGINE=openpyxl disables it.
+"""
+from typing import Callable, Dict, List, Optional, Union
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import unescape
+import io
+import multiprocessing
+import os
+import posixpath
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+XLSX_ENGINE = os.environ.get("DASHBOARD_XLSX_ENGINE", "fast")
+XLSX_WORKERS = max(1, int(os.environ.get("DASHBOARD_XLSX_WORKERS", str(min(4, os.cpu_count() or 1)))))
+# Decompressed bytes of sheet XML matched per block.
+XLSX_BLOCK_BYTES = int(os.environ.get("DASHBOARD_XLSX_BLOCK_BYTES", str(8 * 1024 * 1024)))
+
+XlsxSource = Union[str, bytes]
+
+_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_CELL = re.compile(
+    r'<c r="([A-Z]+)(\d+)"([^>]*?)(?:/>|>(?:<f[^>]*?(?:/>|>.*?</f>))?(?:<v>([^<]*)</v>|<is>(.*?)</is>)?</c>)', re.S
+)
+_ATTR = re.compile(r'\b([st])="([^"]*)"')
+_INLINE_TEXT = re.compile(r"<t[^>]*>([^<]*)</t>")
+_DATE_FORMAT_IDS = set(range(14, 23)) | {45, 46, 47}
+_XML_ENTITIES = {"&quot;": '"', "&apos;": "'"}
+
+# read_excel's default NA strings, and the strings its parser turns into booleans
+_NA_STRINGS = {"", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+               "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"}
+_BOOL_STRINGS = {"True": True, "TRUE": True, "true": True, "False": False, "FALSE": False, "false": False}
+
+# Cell kinds
+_EMPTY, _NUMBER, _SHARED, _OTHER = 0, 1, 2, 3
+
+
+class _Unsupported(Exception):
+    """The workbook uses something this reader does not handle; read_excel is used instead."""
+
+
+def fast_xlsx_enabled() -> bool:
+    return XLSX_ENGINE == "fast"
+
+
+# ---------- Workbook parts ----------
+def _open(source: XlsxSource) -> zipfile.ZipFile:
+    return zipfile.ZipFile(io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source)
+
+
+def _sheet_paths(zf: zipfile.ZipFile) -> Dict[str, str]:
+    """Sheet name -> zip member, in workbook order."""
+    workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    targets = {r.get("Id"): r.get("Target") for r in rels}
+    paths = {}
+    for sheet in workbook.iter(f"{_NS}sheet"):
+        target = targets[sheet.get(f"{_REL_NS}id")]
+        paths[sheet.get("name")] = target.lstrip("/") if target.startswith("/") else posixpath.join("xl", target)
+    return paths
+
+
+def _date1904(zf: zipfile.ZipFile) -> bool:
+    pr = ET.fromstring(zf.read("xl/workbook.xml")).find(f"{_NS}workbookPr")
+    return pr is not None and pr.get("date1904") in ("1", "true")
+
+
+def _shared_strings(zf: zipfile.ZipFile) -> np.ndarray:
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return np.array([], dtype=object)
+    root = ET.fromstring(zf.read("xl/sharedStrings.xml"))
+    strings = []
+    for si in root.iter(f"{_NS}si"):
+        t = si.find(f"{_NS}t")
+        if t is not None:
+            strings.append(t.text or "")
+        else:  # rich text: concatenate the runs, skip phonetic hints
+            strings.append("".join(r.findtext(f"{_NS}t", "") for r in si.findall(f"{_NS}r")))
+    return np.array(strings, dtype=object)
+
+
+def _is_date_format(code: str) -> bool:
+    code = re.sub(r'"[^"]*"|\[[^\]]*\]|\\.', "", code)
+    return bool(re.search(r"[dmyhs]", code, re.I))
+
+
+def _date_styles(zf: zipfile.ZipFile) -> set:
+    """Indexes of cell styles whose number format is a date / time."""
+    if "xl/styles.xml" not in zf.namelist():
+        return set()
+    root = ET.fromstring(zf.read("xl/styles.xml"))
+    custom = {int(f.get("numFmtId")): f.get("formatCode", "") for f in root.iter(f"{_NS}numFmt")}
+    xfs = root.find(f"{_NS}cellXfs")
+    styles = set()
+    for i, xf in enumerate(xfs if xfs is not None else []):
+        fmt = int(xf.get("numFmtId", "0"))
+        if fmt in _DATE_FORMAT_IDS or (fmt in custom and _is_date_format(custom[fmt])):
+            styles.add(i)
+    return styles
+
+
+def _column_index(letters: str) -> int:
+    n = 0
+    for ch in letters:
+        n = n * 26 + ord(ch) - 64
+    return n - 1
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+# ---------- Sheet parsing ----------
+def _parse_block(text: str, date_styles: set, attr_cache: Dict[str, tuple]) -> Optional[Dict[str, np.ndarray]]:
+    cells = _CELL.findall(text)
+    if len(cells) != text.count("<c ") + text.count("<c>"):
+        raise _Unsupported("cell without a reference")
+    if not cells:
+        return None
+    letters, rows, attrs, values, inline = zip(*cells)
+    values = np.array(values, dtype=object)
+    inline = np.array(inline, dtype=object) if "<is>" in text else None
+
+    letter_codes, uniq_letters = pd.factorize(np.array(letters, dtype=object))
+    col = np.array([_column_index(s) for s in uniq_letters], dtype=np.int32)[letter_codes]
+
+    attr_codes, uniq_attrs = pd.factorize(np.array(attrs, dtype=object))
+    parsed = []
+    for a in uniq_attrs:
+        if a not in attr_cache:
+            found = dict(_ATTR.findall(a))
+            attr_cache[a] = (found.get("t", "n"), int(found.get("s", "0")) in date_styles)
+        parsed.append(attr_cache[a])
+    cell_type = np.array([p[0] for p in parsed], dtype=object)[attr_codes]
+    is_date = np.array([p[1] for p in parsed], dtype=bool)[attr_codes]
+
+    has_value = values != ""
+    if inline is not None:
+        has_value |= inline != ""
+    kind = np.full(len(cells), _OTHER, dtype=np.int8)
+    kind[(cell_type == "n") & has_value] = _NUMBER
+    kind[(cell_type == "s") & has_value] = _SHARED
+    kind[~has_value | (cell_type == "e")] = _EMPTY
+
+    number = np.full(len(cells), np.nan)
+    mask = kind == _NUMBER
+    number[mask] = values[mask].astype(np.float64)
+    shared = np.full(len(cells), -1, dtype=np.int64)
+    mask = kind == _SHARED
+    shared[mask] = values[mask].astype(np.int64)
+    other = {}
+    for i in np.flatnonzero(kind == _OTHER):
+        t = cell_type[i]
+        if t == "b":
+            other[i] = values[i] == "1"
+        elif t == "inlineStr":
+            other[i] = unescape("".join(_INLINE_TEXT.findall(inline[i])), _XML_ENTITIES)
+        elif t == "d":
+            other[i] = pd.Timestamp(values[i])
+        else:  # "str" (formula text)
+            other[i] = unescape(values[i], _XML_ENTITIES)
+    other_pos = np.array(sorted(other), dtype=np.int64)
+    return {
+        "col": col, "row": np.array(rows).astype(np.int64), "kind": kind, "date": is_date & (kind == _NUMBER),
+        "number": number, "shared": shared,
+        "other_pos": other_pos, "other_val": np.array([other[i] for i in other_pos], dtype=object),
+    }
+
+
+def _iter_blocks(zf: zipfile.ZipFile, member: str, nrows: Optional[int]):
+    """Decompressed sheet XML cut at row boundaries; stops after header + nrows rows when nrows is given."""
+    leftover = b""
+    first_row = None
+    with zf.open(member) as f:
+        while True:
+            chunk = f.read(XLSX_BLOCK_BYTES)
+            buf = leftover + chunk
+            if chunk:
+                cut = buf.rfind(b"</row>")
+                if cut < 0:
+                    leftover = buf
+                    continue
+                cut += len(b"</row>")
+            else:
+                cut = len(buf)
+            block, leftover = buf[:cut], buf[cut:]
+            if block:
+                text = block.decode("utf-8")
+                yield text
+                if nrows is not None:
+                    rows = re.findall(r'<row r="(\d+)"', text)
+                    if rows:
+                        first_row = first_row or int(rows[0])
+                        if int(rows[-1]) > first_row + nrows:
+                            return
+            if not chunk:
+                return
+
+
+def _concat(blocks: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    offsets = np.cumsum([0] + [len(b["kind"]) for b in blocks[:-1]])
+    out = {k: np.concatenate([b[k] for b in blocks]) for k in ("col", "row", "kind", "date", "number", "shared")}
+    out["other_pos"] = np.concatenate([b["other_pos"] + o for b, o in zip(blocks, offsets)])
+    out["other_val"] = np.concatenate([b["other_val"] for b in blocks])
+    return out
+
+
+def _cell_values(cells: Dict[str, np.ndarray], sel: np.ndarray, sst: np.ndarray, date1904: bool) -> np.ndarray:
+    """Python values of the selected cells (object array) - used for headers and mixed columns."""
+    out = np.full(sel.sum(), np.nan, dtype=object)
+    idx = np.flatnonzero(sel)
+    kind = cells["kind"][idx]
+    numbers = cells["number"][idx]
+    for i in np.flatnonzero(kind == _NUMBER):
+        v = numbers[i]
+        out[i] = int(v) if v.is_integer() else float(v)
+    dates = np.flatnonzero(cells["date"][idx])
+    if len(dates):
+        out[dates] = list(_serial_to_datetime(numbers[dates], date1904))
+    shared = np.flatnonzero(kind == _SHARED)
+    out[shared] = sst[cells["shared"][idx][shared]]
+    other = np.isin(cells["other_pos"], idx)
+    out[np.searchsorted(idx, cells["other_pos"][other])] = cells["other_val"][other]
+    return out
+
+
+def _serial_to_datetime(serial: np.ndarray, date1904: bool) -> pd.DatetimeIndex:
+    origin = "1904-01-01" if date1904 else "1899-12-30"
+    return pd.to_datetime(np.round(serial * 86400000), unit="ms", origin=origin)
+
+
+def _column(cells, sel, positions, n_rows, sst, date1904) -> np.ndarray:
+    """One output column from its cells, converted in bulk when every value has the same kind."""
+    kind = cells["kind"][sel]
+    filled = kind != _EMPTY
+    kinds = set(np.unique(kind[filled]).tolist())
+    complete = filled.all() and len(kind) == n_rows
+    if kinds == {_NUMBER}:
+        values = cells["number"][sel]
+        dates = cells["date"][sel][filled]
+        if dates.all():
+            out = np.full(n_rows, np.datetime64("NaT"), dtype="datetime64[ns]")
+            out[positions[filled]] = _serial_to_datetime(values[filled], date1904).values
+            return out
+        if not dates.any():
+            if complete and np.all(np.mod(values, 1) == 0) and np.all(np.abs(values) < 2 ** 63):
+                out = np.zeros(n_rows, dtype=np.int64)
+                out[positions] = values.astype(np.int64)
+                return out
+            out = np.full(n_rows, np.nan)
+            out[positions] = values
+            return out
+    if kinds == {_SHARED}:
+        out = np.full(n_rows, np.nan, dtype=object)
+        out[positions[filled]] = sst[cells["shared"][sel][filled]]
+        return out
+    out = np.full(n_rows, np.nan, dtype=object)
+    out[positions] = _cell_values(cells, sel, sst, date1904)
+    if complete and all(isinstance(v, bool) for v in out):
+        return out.astype(bool)
+    return out
+
+
+def _infer_text(values: np.ndarray):
+    """
+    What read_excel's text parser makes of an object column: NA strings -> NaN, then numbers if every value is
+    numeric (e.g. zip codes stored as text), booleans if every value is True / False, otherwise unchanged.
+    """
+    series = pd.Series(values, dtype=object)
+    series = series.mask(series.isin(_NA_STRINGS))
+    try:
+        return pd.to_numeric(series)
+    except (ValueError, TypeError):
+        pass
+    present = series.dropna()
+    if len(series) and len(present) == len(series) and present.isin(_BOOL_STRINGS).all():
+        return series.map(_BOOL_STRINGS).astype(bool)
+    return series
+
+
+def _header_names(values: np.ndarray) -> List[str]:
+    names, seen = [], {}
+    for i, v in enumerate(values):
+        name = f"Unnamed: {i}" if (not isinstance(v, str) and pd.isna(v)) else v
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _parse_blocks(texts, date_styles: set, workers: int) -> List[Dict[str, np.ndarray]]:
+    """Parse sheet blocks in order, on up to `workers` processes with at most 2 blocks per worker in flight."""
+    if workers <= 1:
+        attr_cache: Dict[str, tuple] = {}
+        parsed = [_parse_block(t, date_styles, attr_cache) for t in texts]
+    else:
+        parsed, pending = [], deque()
+        with _pool(workers) as pool:
+            for t in texts:
+                pending.append(pool.submit(_parse_block, t, date_styles, {}))
+                if len(pending) >= 2 * workers:
+                    parsed.append(pending.popleft().result())
+            parsed.extend(f.result() for f in pending)
+    return [b for b in parsed if b is not None]
+
+
+def _read_sheet(source: XlsxSource, member: str, columns: Optional[List[str]], nrows: Optional[int],
+                workers: int = 1) -> pd.DataFrame:
+    with _open(source) as zf:
+        sst = _shared_strings(zf)
+        date_styles = _date_styles(zf)
+        date1904 = _date1904(zf)
+        # small reads (header + sample) are not worth starting processes for
+        large = nrows is None and zf.getinfo(member).file_size > 2 * XLSX_BLOCK_BYTES
+        blocks = _parse_blocks(_iter_blocks(zf, member, nrows), date_styles, workers if large else 1)
+    if not blocks:
+        return pd.DataFrame()
+    cells = _concat(blocks)
+
+    header_row = cells["row"].min()
+    last_row = cells["row"].max() if nrows is None else min(cells["row"].max(), header_row + nrows)
+    n_rows = int(last_row - header_row)
+    n_cols = int(cells["col"].max()) + 1
+
+    header = np.full(n_cols, np.nan, dtype=object)
+    is_header = cells["row"] == header_row
+    header[cells["col"][is_header]] = _cell_values(cells, is_header, sst, date1904)
+    names = _header_names(header)
+
+    in_data = (cells["row"] > header_row) & (cells["row"] <= last_row)
+    order = np.argsort(cells["col"], kind="stable")
+    bounds = np.searchsorted(cells["col"][order], np.arange(n_cols + 1))
+    data = {}
+    for c, name in enumerate(names):
+        if columns is not None and name not in columns:
+            continue
+        sel = np.zeros(len(cells["kind"]), dtype=bool)
+        sel[order[bounds[c]:bounds[c + 1]]] = True
+        sel &= in_data
+        positions = cells["row"][sel] - header_row - 1
+        values = _column(cells, sel, positions, n_rows, sst, date1904)
+        data[name] = _infer_text(values) if values.dtype == object else values
+    return pd.DataFrame(data)
+
+
+# ---------- Public API ----------
+def read_xlsx(source: XlsxSource, sheet_name: Union[int, str, List, None] = 0,
+              columns: Optional[List[str]] = None, nrows: Optional[int] = None,
+              is_date_column: Optional[Callable[[str], bool]] = None):
+    """
+    Read a workbook (path or bytes) like pandas.read_excel: sheet_name is an index / name (one frame) or a list /
+    None (dict of frames, parsed in parallel). is_date_column(name) selects text columns parsed as dates
+    (read_excel's parse_dates). Returns None if the fast reader cannot handle the workbook.
+    """
+    if not fast_xlsx_enabled():
+        return None
+    try:
+        with _open(source) as zf:
+            paths = _sheet_paths(zf)
+        names = list(paths)
+        wanted = names if sheet_name is None else sheet_name if isinstance(sheet_name, list) else [sheet_name]
+        wanted = [names[s] if isinstance(s, int) else s for s in wanted]
+        members = [paths[s] for s in wanted]
+        if len(members) > 1 and XLSX_WORKERS > 1:
+            with _pool(min(XLSX_WORKERS, len(members))) as pool:
+                frames = list(pool.map(_read_sheet, [source] * len(members), members,
+                                       [columns] * len(members), [nrows] * len(members)))
+        else:
+            frames = [_read_sheet(source, m, columns, nrows, XLSX_WORKERS) for m in members]
+    except (_Unsupported, KeyError, IndexError, ValueError, zipfile.BadZipFile, ET.ParseError):
+        return None
+
+    for df in frames:
+        for c in df.columns:
+            if is_date_column is not None and isinstance(c, str) and is_date_column(c) and df[c].dtype == object:
+                try:
+                    df[c] = pd.to_datetime(df[c])
+                except (ValueError, TypeError, OverflowError):
+                    pass
+    if isinstance(sheet_name, list) or sheet_name is None:
+        return dict(zip(wanted, frames))
+    return frames[0]
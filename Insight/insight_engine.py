@@ -65,15 +65,22 @@ def detect_top_drivers(df: pd.DataFrame, target: str, top_n:int=3) -> List[Tuple
     res = sorted(res, key=lambda x: -abs(x[1]))
     return res[:top_n]
 
-def category_concentration(df: pd.DataFrame, category_col: str, value_col: Optional[str]=None) -> Dict[str, Any]:
+def category_concentration(df: pd.DataFrame, category_col: str, value_col: Optional[str]=None, aggregates: Optional[Dict]=None) -> Dict[str, Any]:
+    """
+    Top-category share by absolute value (or row count when no value_col).
+    `aggregates` may hold the shared ("abs_sum", value_col, (category_col,), None) result from aggregation_planner.
+    """
     if category_col not in df.columns:
         return {"error":"category_col not in df"}
-    df2 = df.copy()
     if value_col and value_col in df.columns:
-        df2['abs_val'] = df2[value_col].abs()
-        agg = df2.groupby(category_col)['abs_val'].sum().sort_values(ascending=False)
+        key = ("abs_sum", value_col, (category_col,), None)
+        if aggregates is not None and key in aggregates:
+            agg = aggregates[key]
+        else:
+            agg = df[value_col].abs().groupby(df[category_col], observed=True).sum()
+        agg = agg.sort_values(ascending=False)
     else:
-        agg = df2[category_col].value_counts()
+        agg = df[category_col].value_counts()
     total = agg.sum()
     top = agg.head(3)
     share = (top / total * 100).round(2).to_dict()
@@ -120,10 +127,12 @@ def generate_insights(
     date_col:Optional[str]=None, 
     category_col:Optional[str]=None, 
     use_llm:bool=False, 
-    llm_client=None
+    llm_client=None,
+    aggregates:Optional[Dict]=None
 ) -> List[str]:
     """
     Returns list of insights. If use_llm True, will call llm_client(prompt)->str to get polished text (requires ollama_client or similar).
+    `aggregates` is passed through to category_concentration to reuse the dashboard's shared group sums.
     """
     insights = []
     # basic summary
@@ -134,7 +143,7 @@ def generate_insights(
         insights.append(f"Total {target_value_col}: {tot:,.2f}")
     # concentration
     if category_col and category_col in df.columns:
-        cc = category_concentration(df, category_col, target_value_col)
+        cc = category_concentration(df, category_col, target_value_col, aggregates=aggregates)
         if "top_share_percent" in cc:
             top_share = cc["top_share_percent"]
             for k,v in top_share.items():
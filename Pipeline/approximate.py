@@ -0,0 +1,288 @@
+"""
+approximate.py
+- Approximate dashboard mode: KPIs and charts are computed from a sample and scaled up to the whole table, so very
+  large sources render in seconds; KPIs carry a confidence interval, and the exact run can follow in the background
+- Loaded frames: stratified sample of APPROX_SAMPLE_ROWS rows over the bar / pie / heatmap group columns
+  (combined while there are at most APPROX_MAX_STRATA strata), so every category the charts show is represented;
+  allocation is proportional with at least APPROX_MIN_PER_STRATUM rows per stratum (expected; strata smaller than
+  that are kept whole)
+  - each sampled row stands for N_h / n_h rows of its stratum; sums (KPIs, line / bar / pie / heatmap buckets) are
+    the weighted sums, means the weighted ratio
+  - intervals use the stratified variance, sum_h N_h^2 (1 - n_h/N_h) s_h^2 / n_h (linearised for means)
+- Database pushdown: the GROUP BY queries run on a sampled table instead, TABLESAMPLE BERNOULLI on PostgreSQL and
+  "integer primary key % k = 0" (modulo hash) elsewhere; sums are scaled by rows / sampled rows and intervals use
+  simple random sampling variance. Tables with neither run exactly. The numeric summary stays exact (one scan).
+- Sampled ingest: a CSV that only fit the ingest budget as a uniform sample (Data_loader/chunked_ingest.py,
+  "sample" mode) is estimated as a one-stratum sample of the rows read (estimate_sample); the numeric summary
+  insights scale their sums the same way (estimate_numeric_summary)
+- DASHBOARD_APPROXIMATE: auto (default, tables of APPROX_MIN_ROWS rows or more), 1 (always), 0 (never);
+  run_pipeline(approximate=True / False) overrides it per run
+"""
+from typing import Dict, Any, List, Optional, Tuple
+from statistics import NormalDist
+import os
+
+import numpy as np
+import pandas as pd
+
+from Dashboard.aggregation_planner import AggKey, execute_plan
+
+APPROXIMATE = os.environ.get("DASHBOARD_APPROXIMATE", "auto")
+APPROX_MIN_ROWS = int(os.environ.get("DASHBOARD_APPROX_MIN_ROWS", "5000000"))
+APPROX_SAMPLE_ROWS = int(os.environ.get("DASHBOARD_APPROX_SAMPLE_ROWS", "200000"))
+APPROX_CONFIDENCE = float(os.environ.get("DASHBOARD_APPROX_CONFIDENCE", "0.95"))
+APPROX_MAX_STRATA = int(os.environ.get("DASHBOARD_APPROX_MAX_STRATA", "1000"))
+APPROX_MIN_PER_STRATUM = int(os.environ.get("DASHBOARD_APPROX_MIN_PER_STRATUM", "30"))
+_SEED = 0
+
+
+def should_approximate(rows: Optional[int], requested: Optional[bool] = None) -> bool:
+    """Whether a source of `rows` rows runs on a sample (requested overrides DASHBOARD_APPROXIMATE)."""
+    if rows is None or rows <= APPROX_SAMPLE_ROWS:
+        return False
+    if requested is not None:
+        return requested
+    if APPROXIMATE == "auto":
+        return rows >= APPROX_MIN_ROWS
+    return APPROXIMATE != "0"
+
+
+def _z() -> float:
+    return NormalDist().inv_cdf((1 + APPROX_CONFIDENCE) / 2)
+
+
+def _variance(n, N, total, total_sq):
+    """Variance of an estimated total from n of N rows (simple random sampling) given sum and sum of squares."""
+    n = np.asarray(n, dtype="float64")
+    N = np.asarray(N, dtype="float64")
+    s2 = np.where(n > 1, (total_sq - total ** 2 / np.maximum(n, 1)) / np.maximum(n - 1, 1), 0.0)
+    return float(np.sum(N ** 2 * (1 - n / N) * np.maximum(s2, 0.0) / n))
+
+
+# ---------- Loaded frames ----------
+def _strata_columns(df: pd.DataFrame, keys: List[AggKey]) -> List[str]:
+    """Group columns of categorical aggregations, fewest categories first, while their combinations stay few."""
+    candidates = dict.fromkeys(g for _, _, groups, freq in keys if freq is None for g in groups)
+    cardinality = {c: df[c].nunique(dropna=False) for c in candidates if c in df}
+    chosen: List[str] = []
+    strata = 1
+    for c in sorted(cardinality, key=cardinality.get):
+        if strata * cardinality[c] > APPROX_MAX_STRATA:
+            break
+        chosen.append(c)
+        strata *= cardinality[c]
+    return chosen
+
+
+def _stratum_codes(df: pd.DataFrame, strata: List[str]) -> np.ndarray:
+    """Dense stratum number of every row (mixed-radix combination of the strata columns' codes, O(rows))."""
+    combined = np.zeros(len(df), dtype="int64")
+    for c in strata:
+        col = df[c]
+        codes = col.cat.codes.to_numpy() if isinstance(col.dtype, pd.CategoricalDtype) else pd.factorize(col)[0]
+        combined = combined * (int(codes.max(initial=-1)) + 2) + codes + 1  # -1 (missing) is a stratum too
+    used = np.bincount(combined) > 0
+    return (np.cumsum(used) - 1)[combined]
+
+
+def stratified_sample(df: pd.DataFrame, strata: List[str], rows: int) -> Tuple[pd.DataFrame, np.ndarray, pd.DataFrame]:
+    """
+    (sample, stratum code of each sampled row, per-stratum {N, n}) with proportional allocation over `strata`.
+    Each row of stratum h is kept with probability n_h / N_h (one pass, no sort); n is the realised count.
+    Without strata the whole frame is one stratum.
+    """
+    codes = _stratum_codes(df, strata)
+    N = np.bincount(codes)
+    target = np.minimum(N, np.maximum(rows * N / len(df), APPROX_MIN_PER_STRATUM))
+    picked = np.flatnonzero(np.random.default_rng(_SEED).random(len(df)) < (target / N)[codes])
+    sampled_codes = codes[picked]
+    return df.iloc[picked], sampled_codes, pd.DataFrame({"N": N, "n": np.bincount(sampled_codes, minlength=len(N))})
+
+
+def _weighted(sample: pd.DataFrame, keys: List[AggKey], weights: np.ndarray) -> pd.DataFrame:
+    """The sample with every value column multiplied by its row weight (so sums over it estimate totals)."""
+    frame = sample.copy(deep=False)
+    for val in dict.fromkeys(k[1] for k in keys):
+        frame[val] = sample[val].astype("float64") * weights
+    return frame
+
+
+def _scalar_estimate(sample: pd.DataFrame, codes: np.ndarray, counts: pd.DataFrame, key: AggKey,
+                     weights: np.ndarray) -> Tuple[float, float]:
+    """(estimate, variance) of a KPI aggregation from the stratified sample."""
+    agg = key[0]
+    values = sample[key[1]].astype("float64").to_numpy()
+    if agg in ("abs_sum", "mean_abs"):
+        values = np.abs(values)
+    present = ~np.isnan(values)
+    y = np.where(present, values, 0.0)
+    total = float(np.sum(weights * y))
+    if agg in ("mean", "mean_abs"):
+        # ratio estimator: total / estimated number of non-null rows, linearised residuals for the variance
+        rows = float(np.sum(weights * present))
+        estimate = total / rows if rows else float("nan")
+        d = y - (estimate if rows else 0.0) * present
+        scale = rows ** 2 if rows else 1.0
+    else:
+        estimate, d, scale = total, y, 1.0
+    by = pd.DataFrame({"code": codes, "d": d, "d2": d * d}).groupby("code").sum()
+    var = _variance(counts["n"].to_numpy()[by.index], counts["N"].to_numpy()[by.index], by["d"].to_numpy(),
+                    by["d2"].to_numpy())
+    return estimate, var / scale
+
+
+def _evaluate(sample: pd.DataFrame, codes: np.ndarray, counts: pd.DataFrame,
+              keys: List[AggKey]) -> Tuple[Dict[AggKey, Any], Dict[AggKey, float]]:
+    """(aggregates in execute_plan shapes, KPI key -> interval half width) of keys over a stratified sample."""
+    weights = (counts["N"] / counts["n"]).to_numpy()[codes]
+    aggregates = execute_plan(_weighted(sample, keys, weights), [k for k in keys if k[2]])
+    intervals: Dict[AggKey, float] = {}
+    z = _z()
+    for key in (k for k in keys if not k[2]):
+        aggregates[key], var = _scalar_estimate(sample, codes, counts, key, weights)
+        intervals[key] = z * var ** 0.5
+    return aggregates, intervals
+
+
+def estimate_plan(df: pd.DataFrame, keys: List[AggKey], rows: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Evaluate keys on a stratified sample of df, scaled to the whole frame.
+    Returns {aggregates (execute_plan shapes), intervals (key -> half width), sample_rows, population_rows,
+    strata, confidence, method}.
+    """
+    strata = _strata_columns(df, keys)
+    sample, codes, counts = stratified_sample(df, strata, rows or APPROX_SAMPLE_ROWS)
+    aggregates, intervals = _evaluate(sample, codes, counts, keys)
+    return {
+        "aggregates": aggregates,
+        "intervals": intervals,
+        "sample_rows": len(sample),
+        "population_rows": len(df),
+        "strata": strata,
+        "confidence": APPROX_CONFIDENCE,
+        "method": "stratified" if strata else "uniform",
+    }
+
+
+# ---------- Sampled ingest ----------
+def estimate_sample(sample: pd.DataFrame, keys: List[AggKey], population_rows: int) -> Dict[str, Any]:
+    """
+    Evaluate keys on sample, a uniform random sample of a source of population_rows rows, scaled to the whole
+    source. Same fields as estimate_plan (method "ingest").
+    """
+    codes = np.zeros(len(sample), dtype="int64")
+    counts = pd.DataFrame({"N": [max(population_rows, len(sample))], "n": [len(sample)]})
+    aggregates, intervals = _evaluate(sample, codes, counts, keys)
+    return {
+        "aggregates": aggregates,
+        "intervals": intervals,
+        "sample_rows": len(sample),
+        "population_rows": int(counts["N"].iloc[0]),
+        "strata": [],
+        "confidence": APPROX_CONFIDENCE,
+        "method": "ingest",
+    }
+
+
+def estimate_numeric_summary(sample: pd.DataFrame, population_rows: int) -> List[str]:
+    """
+    basic_kpi_insights for a uniform sample of a population_rows-row source: each sum is scaled to the source and
+    carries its interval; avg / min / max are the sample's.
+    """
+    n = len(sample)
+    z = _z()
+    insights = []
+    for col in sample.select_dtypes(include=[np.number]).columns:
+        values = sample[col].astype("float64").fillna(0.0).to_numpy()
+        total = float(values.sum())
+        half = z * _variance(n, population_rows, total, float(np.sum(values * values))) ** 0.5 if n else 0.0
+        estimate = total * population_rows / n if n else 0.0
+        insights.append(
+            f"{col}: sum≈{estimate:.2f} ± {half:.2f}, avg={sample[col].mean():.2f}, "
+            f"min={sample[col].min():.2f}, max={sample[col].max():.2f} (from a {n:,}-row sample)"
+        )
+    return insights
+
+
+# ---------- Database pushdown ----------
+def sampled_source(tbl, fraction: float, dialect: str):
+    """FROM clause holding about `fraction` of tbl's rows, or None when the dialect / table cannot be sampled."""
+    import sqlalchemy as sa
+    if dialect == "postgresql":
+        return sa.tablesample(tbl, sa.func.bernoulli(fraction * 100), name="sampled", seed=sa.literal(_SEED))
+    pk = [c for c in tbl.primary_key.columns]
+    if len(pk) != 1 or not isinstance(pk[0].type, sa.Integer):
+        return None
+    k = max(1, round(1 / fraction))
+    return sa.select(tbl).where(pk[0] % k == 0).subquery("sampled")
+
+
+def _sql_scalar_stats(conn, source, key: AggKey):
+    """(sampled rows, non-null count, sum, sum of squares) of a KPI value column over the sampled source."""
+    import sqlalchemy as sa
+    col = source.c[key[1]]
+    if key[0] in ("abs_sum", "mean_abs"):
+        col = sa.func.abs(col)
+    row = conn.execute(sa.select(sa.func.count(), sa.func.count(col), sa.func.sum(col), sa.func.sum(col * col))).one()
+    return tuple(0.0 if v is None else float(v) for v in row)
+
+
+def run_pushdown_approximate(conn_str: str, table: str, keys: List[AggKey], numeric_columns: Optional[List[str]] = None,
+                             requested: Optional[bool] = None, rows: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    run_pushdown on a sample of the table: {aggregates, insights, row_count, pushed_down, fallback} plus the
+    estimate_plan fields. None when the table is too small for approximate mode or cannot be sampled in SQL.
+    """
+    import sqlalchemy as sa
+    from Data_loader.data_loader import reflect_table
+    from Data_loader.engine_registry import get_engine_registry
+    from Dashboard.sql_pushdown import execute_plan_sql, execute_plan_fallback, numeric_summary_sql
+
+    rows = rows or APPROX_SAMPLE_ROWS
+    with get_engine_registry().connect(conn_str) as conn:
+        dialect = conn.dialect.name
+        tbl = reflect_table(conn, table)
+        row_count = conn.execute(sa.select(sa.func.count()).select_from(tbl)).scalar()
+        if not should_approximate(row_count, requested):
+            return None
+        source = sampled_source(tbl, rows / row_count, dialect)
+        if source is None:
+            return None
+        sampled = conn.execute(sa.select(sa.func.count()).select_from(source)).scalar()
+        if not sampled:
+            return None
+        aggregates, fallback = execute_plan_sql(conn, source, [k for k in keys if k[2]])
+        intervals: Dict[AggKey, float] = {}
+        z = _z()
+        for key in (k for k in keys if not k[2]):
+            n, present, total, total_sq = _sql_scalar_stats(conn, source, key)
+            if key[0] in ("mean", "mean_abs"):
+                estimate = total / present if present else float("nan")
+                r = estimate if present else 0.0
+                var = _variance(n, row_count, total - r * present, total_sq - 2 * r * total + r * r * present)
+                var /= (present * row_count / n) ** 2 if present else 1.0
+            else:
+                estimate = total * row_count / n
+                var = _variance(n, row_count, total, total_sq)
+            aggregates[key] = estimate
+            intervals[key] = z * var ** 0.5
+        insights = numeric_summary_sql(conn, tbl, numeric_columns or [])
+
+    scale = row_count / sampled
+    for key in list(aggregates):
+        if key[2] and key[0] in ("sum", "abs_sum"):
+            aggregates[key] = aggregates[key] * scale
+    aggregates.update(execute_plan_fallback(conn_str, table, fallback))
+    return {
+        "aggregates": aggregates,
+        "insights": insights,
+        "row_count": row_count,
+        "pushed_down": len(keys) - len(fallback),
+        "fallback": fallback,
+        "intervals": intervals,
+        "sample_rows": sampled,
+        "population_rows": row_count,
+        "strata": [],
+        "confidence": APPROX_CONFIDENCE,
+        "method": "tablesample" if dialect == "postgresql" else "modulo",
+    }
@@ -0,0 +1,175 @@
+"""
+batch_cli.py
+- Headless batch renderer: builds dashboards for many datasets x templates without Streamlit
+- Reuses the same pipeline as the app (load_dataframe, infer_field_roles, map_template_fields,
+  Dashboard.dashboard_generator, Insight.insight_engine) via run_pipeline
+- Spreads (dataset, template) tasks across a process pool
+- Writes per task, under <out>/<dataset>-<hash>/<template>-<hash>/ (hash of the absolute path, so same-named files
+  from different directories do not collide): kpis.json, insights.json, charts/<component>.json and .html
+- Headless: data is loaded by Data_loader/source_loader.py, Streamlit is never imported
+- Runs are exact (approximate=False); only a CSV sampled to fit the ingest budget is estimated, and its summary
+  says so ("approximate"). "rows" counts the rows of the input file, not of the frame kept in memory
+- Prints a throughput summary at the end (and writes it to summary.json)
+
+Usage:
+    python -m Pipeline.batch_cli --inputs extracts/ other.csv --templates Dashboard/sample_dashboard.json --out out/
+"""
+from typing import Dict, Any, List
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+DATA_EXTENSIONS = (".csv", ".xlsx")
+
+
+def _expand(paths: List[str], extensions) -> List[str]:
+    """Files as given, plus every matching file inside given directories (sorted, non-recursive)."""
+    files = []
+    for p in paths:
+        if os.path.isdir(p):
+            files.extend(os.path.join(p, n) for n in sorted(os.listdir(p)) if n.lower().endswith(extensions))
+        else:
+            files.append(p)
+    return files
+
+
+def _stem(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def _task_name(path: str) -> str:
+    """Output directory name of an input file: its stem plus a short hash of its absolute path."""
+    digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:8]
+    return f"{_stem(path)}-{digest}"
+
+
+def _source_rows(result: Dict[str, Any]) -> int:
+    """Rows of the input file the dashboard describes (the frame in memory may be a sample of it)."""
+    ingest = result["ingest"] or {}
+    if "rows_read" in ingest:
+        return ingest["rows_read"]
+    if result["backend"] is not None:
+        return result["backend"].row_count()
+    return len(result["df"])
+
+
+def render_dataset(data_path: str, template_path: str, out_dir: str, write_html: bool = True,
+                   use_cache: bool = True) -> Dict[str, Any]:
+    """Run the pipeline for one dataset/template pair and write its artefacts. Never raises."""
+    from Pipeline.pipeline_executor import run_pipeline, CHART_GENERATORS
+    from Pipeline.dependency_graph import component_id
+    from Dashboard.template_registry import get_template
+
+    started = time.perf_counter()
+    summary = {"dataset": data_path, "template": template_path, "rows": 0, "error": None}
+    try:
+        template = get_template(template_path)
+        with open(data_path, "rb") as fh:
+            # An open file behaves like a Streamlit upload (name + seek), so load_dataframe is reused unchanged.
+            file_info = {"type": "upload", "uploaded": fh}
+            result = run_pipeline(file_info, template, chart_workers=1, use_cache=use_cache, incremental=False,
+                                  approximate=False)
+        if result["error"]:
+            raise RuntimeError(result["error"])
+
+        task_dir = os.path.join(out_dir, _task_name(data_path), _task_name(template_path))
+        chart_dir = os.path.join(task_dir, "charts")
+        os.makedirs(chart_dir, exist_ok=True)
+        with open(os.path.join(task_dir, "kpis.json"), "w", encoding="utf-8") as f:
+            json.dump(result["kpi_results"], f, indent=2, default=str)
+        with open(os.path.join(task_dir, "insights.json"), "w", encoding="utf-8") as f:
+            json.dump(result["insight_results"], f, indent=2, default=str)
+
+        layout = template.get("layout", [])
+        charts = [(component_id(c, layout.index(c)), c) for c in template["charts"] if c.get("type") in CHART_GENERATORS]
+        for (cid, _), (_, fig) in zip(charts, result["chart_results"]):
+            with open(os.path.join(chart_dir, f"{cid}.json"), "w", encoding="utf-8") as f:
+                f.write(fig.to_json())
+            if write_html:
+                fig.write_html(os.path.join(chart_dir, f"{cid}.html"), include_plotlyjs="cdn")
+
+        summary.update({
+            "rows": _source_rows(result),
+            "approximate": bool(result["estimates"]),
+            "charts": len(result["chart_results"]),
+            "chart_errors": result["chart_errors"],
+            "cache_hit": result["cache_hit"],
+            "stages_ms": {e["stage"]: e["elapsed_ms"] for e in result["timings"]},
+            "output": task_dir,
+        })
+    except Exception as e:
+        summary["error"] = f"{type(e).__name__}: {e}"
+    summary["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return summary
+
+
+def run_batch(inputs: List[str], templates: List[str], out_dir: str, workers: int = None,
+              write_html: bool = True, use_cache: bool = True) -> Dict[str, Any]:
+    """Render every dataset x template pair on a process pool and return the throughput summary."""
+    datasets = _expand(inputs, DATA_EXTENSIONS)
+    template_files = _expand(templates, (".json",))
+    tasks = [(d, t) for d in datasets for t in template_files]
+    os.makedirs(out_dir, exist_ok=True)
+
+    started = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(render_dataset, d, t, out_dir, write_html, use_cache) for d, t in tasks]
+        for fut in as_completed(futures):
+            res = fut.result()
+            results.append(res)
+            status = "FAILED " + res["error"] if res["error"] else f"{res['rows']:,} rows"
+            if res.get("approximate"):
+                status += " (approximate)"
+            print(f"[{len(results)}/{len(tasks)}] {res['dataset']} x {_stem(res['template'])}: "
+                  f"{status} in {res['elapsed_ms']:.0f} ms", flush=True)
+    wall_s = time.perf_counter() - started
+
+    ok = [r for r in results if not r["error"]]
+    total_rows = sum(r["rows"] for r in ok)
+    summary = {
+        "tasks": len(tasks),
+        "succeeded": len(ok),
+        "failed": len(results) - len(ok),
+        "workers": workers or os.cpu_count(),
+        "wall_seconds": round(wall_s, 2),
+        "rows": total_rows,
+        "rows_per_second": round(total_rows / wall_s, 1) if wall_s else None,
+        "dashboards_per_minute": round(len(ok) / wall_s * 60, 2) if wall_s else None,
+        "results": sorted(results, key=lambda r: (r["dataset"], r["template"])),
+    }
+    with open(os.path.join(out_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, default=str)
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Render dashboards for many datasets without the Streamlit UI.")
+    parser.add_argument("--inputs", nargs="+", required=True, help="CSV/XLSX files or directories containing them")
+    parser.add_argument("--templates", nargs="+",
+                        default=[os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                              "Dashboard", "sample_dashboard.json")],
+                        help="Template JSON files or directories (default: sample_dashboard.json)")
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--no-html", action="store_true", help="Skip the standalone HTML export of each figure")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the shared result cache")
+    args = parser.parse_args(argv)
+
+    summary = run_batch(args.inputs, args.templates, args.out, workers=args.workers,
+                        write_html=not args.no_html, use_cache=not args.no_cache)
+    rate = "n/a" if summary["rows_per_second"] is None else f"{summary['rows_per_second']:,}"
+    print(
+        f"\n{summary['succeeded']}/{summary['tasks']} dashboards in {summary['wall_seconds']} s "
+        f"({summary['dashboards_per_minute']} dashboards/min, {rate} rows/s, "
+        f"{summary['workers']} workers); {summary['failed']} failed"
+    )
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+dependency_graph.py
+- Links every template component (and the insight engine) to the dataset columns and shared aggregates it uses
+- Signs each node with its spec, resolved columns and per-column content fingerprints
+- Only nodes whose signature changed since the previous run are recomputed; the rest are reused
+- Appended rows: when a column's old rows are unchanged, sum aggregates are updated from the new rows only
+"""
+from typing import Dict, Any, List, Optional, Set, Tuple
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+from Dashboard.aggregation_planner import aggregation_key, component_columns, execute_plan, resample_freq
+
+INSIGHTS_NODE = "__insights__"
+
+# Aggregations that can be updated from appended rows alone.
+_ADDITIVE_AGGS = ("sum", "abs_sum")
+
+
+def component_id(comp: Dict, index: int) -> str:
+    return comp.get("id") or comp.get("title") or f"component_{index}"
+
+
+# ---------- Graph ----------
+def build_dependency_graph(template: Dict, mapping: Dict, df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """
+    {node id: {"spec", "columns", "aggregate"}} for every KPI/chart plus the insights node,
+    which depends on all numeric columns (basic_kpi_insights summarises each of them).
+    """
+    graph = {}
+    for i, comp in enumerate(template.get("layout", [])):
+        graph[component_id(comp, i)] = {
+            "spec": comp,
+            "columns": [c for c in component_columns(comp, mapping) if c in df.columns],
+            "aggregate": aggregation_key(comp, mapping),
+        }
+    graph[INSIGHTS_NODE] = {
+        "spec": {"type": "insights"},
+        "columns": df.select_dtypes(include=[np.number]).columns.tolist(),
+        "aggregate": None,
+    }
+    return graph
+
+
+def _column_hash(series: pd.Series) -> str:
+    return hashlib.blake2b(
+        pd.util.hash_pandas_object(series, index=True).values.tobytes(), digest_size=16
+    ).hexdigest()
+
+
+def column_fingerprints(df: pd.DataFrame, graph: Dict[str, Dict[str, Any]],
+                        previous: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, str], Set[str]]:
+    """
+    Fingerprint every column referenced by the graph. Returns (fingerprints, appended) where appended holds
+    the columns whose first previous["rows"] values are unchanged, i.e. only new rows were added.
+    """
+    columns = sorted({c for node in graph.values() for c in node["columns"]})
+    fps = {c: _column_hash(df[c]) for c in columns}
+    appended = set()
+    if previous:
+        old_rows, old_fps = previous.get("rows", 0), previous.get("columns", {})
+        if 0 < old_rows < len(df):
+            for c in columns:
+                if c in old_fps and _column_hash(df[c].iloc[:old_rows]) == old_fps[c]:
+                    appended.add(c)
+    return fps, appended
+
+
+def node_signature(node: Dict[str, Any], fps: Dict[str, str]) -> str:
+    body = json.dumps(
+        {"spec": node["spec"], "columns": node["columns"], "fps": [fps.get(c) for c in node["columns"]],
+         "aggregate": repr(node["aggregate"])},
+        sort_keys=True, default=str,
+    )
+    return hashlib.blake2b(body.encode(), digest_size=16).hexdigest()
+
+
+def dirty_nodes(graph: Dict[str, Dict[str, Any]], fps: Dict[str, str],
+                previous: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, str], Set[str]]:
+    """Return (signatures, ids whose signature differs from the previous run or that have no previous result)."""
+    prev_nodes = (previous or {}).get("nodes", {})
+    sigs = {nid: node_signature(node, fps) for nid, node in graph.items()}
+    dirty = {nid for nid, sig in sigs.items() if prev_nodes.get(nid, {}).get("signature") != sig}
+    return sigs, dirty
+
+
+# ---------- Aggregates ----------
+def _merge_append(old, new, freq: Optional[str]):
+    if not isinstance(old, pd.Series):
+        return old + new
+    merged = old.add(new, fill_value=0)
+    if freq is not None:
+        merged = merged.resample(resample_freq(freq)).sum()
+    return merged.rename(old.name)
+
+
+def incremental_aggregates(df: pd.DataFrame, keys: List, fps: Dict[str, str], appended: Set[str],
+                           previous: Optional[Dict[str, Any]] = None) -> Tuple[Dict, Dict[str, int]]:
+    """
+    Evaluate aggregate keys, reusing the previous run where possible:
+    - columns unchanged -> previous result reused as is
+    - columns only gained rows and the aggregate is a sum -> updated from the appended rows
+    - otherwise recomputed from the full frame
+    Returns (aggregates, {"reused", "appended", "computed"} counts).
+    """
+    prev_aggs = (previous or {}).get("aggregates", {})
+    prev_fps = (previous or {}).get("columns", {})
+    old_rows = (previous or {}).get("rows", 0)
+    results: Dict = {}
+    delta_keys, full_keys = [], []
+    for key in keys:
+        agg, val, groups, _ = key
+        cols = {val, *groups}
+        if key in prev_aggs and all(c in fps and prev_fps.get(c) == fps[c] for c in cols):
+            results[key] = prev_aggs[key]
+        elif key in prev_aggs and agg in _ADDITIVE_AGGS and cols <= appended:
+            delta_keys.append(key)
+        else:
+            full_keys.append(key)
+
+    counts = {"reused": len(results), "appended": len(delta_keys), "computed": len(full_keys)}
+    if full_keys:
+        results.update(execute_plan(df, full_keys))
+    if delta_keys:
+        delta = execute_plan(df.iloc[old_rows:], delta_keys)
+        for key in delta_keys:
+            results[key] = _merge_append(prev_aggs[key], delta[key], key[3])
+    return results, counts
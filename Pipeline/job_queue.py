@@ -0,0 +1,195 @@
+"""
+job_queue.py
+- Local background job system so "Run Agent" never blocks the Streamlit script thread
+- A fixed pool of worker threads runs submitted jobs; each job has an id, status, progress and result
+- The UI submits a run, polls status across reruns, can cancel it, and picks up finished results
+- Identical concurrent submissions (same dedupe key, e.g. from different sessions) share one job
+- DASHBOARD_JOB_WORKERS is the global concurrency limit; which queued job starts next is decided by the
+  per-user fair, memory-aware FairScheduler (Pipeline/scheduler.py); status() reports the queue position
+
+A job function is called as fn(report, should_cancel) where report(event) records a progress event and
+should_cancel() returns True once cancel() was requested; it should stop by raising JobCancelled.
+"""
+from typing import Dict, Any, Callable, Optional
+import os
+import threading
+import time
+import uuid
+
+from Pipeline.scheduler import FairScheduler, estimate_job_memory
+
+JOB_WORKERS = int(os.environ.get("DASHBOARD_JOB_WORKERS", "2"))
+# Finished jobs are kept this long so other sessions (and reruns) can pick up their results.
+JOB_RESULT_TTL = int(os.environ.get("DASHBOARD_JOB_RESULT_TTL", "600"))
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+ACTIVE = (QUEUED, RUNNING)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested."""
+
+
+class JobQueue:
+    def __init__(self, workers: int = JOB_WORKERS, scheduler: Optional[FairScheduler] = None):
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._by_key: Dict[str, str] = {}
+        self._scheduler = scheduler if scheduler is not None else FairScheduler()
+        self._running_memory = 0
+        self._running = 0
+        self._threads = []
+        for i in range(max(1, workers)):
+            t = threading.Thread(target=self._worker, name=f"dashboard-job-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    # ---------- Public API ----------
+    def submit(self, fn: Callable, dedupe_key: Optional[str] = None, owner: Optional[str] = None,
+               rows: Optional[int] = None) -> str:
+        """
+        Queue fn and return its job id; an active or recently finished job with the same key is reused.
+        rows (expected input rows, None if unknown) sizes the job's memory estimate for admission.
+        """
+        with self._lock:
+            self._expire()
+            if dedupe_key and dedupe_key in self._by_key:
+                existing = self._jobs.get(self._by_key[dedupe_key])
+                # a running job whose cancellation was requested stops at its next checkpoint; do not join it
+                if existing and existing["status"] in ACTIVE + (DONE,) and not existing["cancel"].is_set():
+                    existing["subscribers"] += 1
+                    return existing["id"]
+            job_id = uuid.uuid4().hex[:12]
+            self._jobs[job_id] = {
+                "id": job_id,
+                "fn": fn,
+                "owner": owner,
+                "dedupe_key": dedupe_key,
+                "rows": rows,
+                "memory_estimate": estimate_job_memory(rows),
+                "status": QUEUED,
+                "progress": None,
+                "result": None,
+                "error": None,
+                "submitted": time.time(),
+                "started": None,
+                "finished": None,
+                "cancel": threading.Event(),
+                "subscribers": 1,
+            }
+            if dedupe_key:
+                self._by_key[dedupe_key] = job_id
+            self._scheduler.add(job_id, owner, self._jobs[job_id]["memory_estimate"])
+            self._wakeup.notify()
+        return job_id
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Snapshot of a job (without its function / cancel event), or None if unknown or expired.
+        A queued job also reports "position" (1 = next in line) and "queued" (jobs waiting in total).
+        """
+        with self._lock:
+            self._expire()
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = {k: v for k, v in job.items() if k not in ("fn", "cancel")}
+            if job["status"] == QUEUED:
+                snapshot["position"] = self._scheduler.position(job_id)
+                snapshot["queued"] = len(self._scheduler)
+            return snapshot
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Request cancellation. A shared (deduplicated) job only stops once every subscriber cancelled it;
+        a queued job is cancelled immediately, a running one at its next checkpoint.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] not in ACTIVE:
+                return False
+            job["subscribers"] -= 1
+            if job["subscribers"] > 0:
+                return True
+            job["cancel"].set()
+            if job["status"] == QUEUED:
+                self._scheduler.remove(job_id)
+                self._finish(job, CANCELLED)
+            return True
+
+    def forget(self, job_id: str):
+        """Drop a finished job's result once its owner has picked it up (other subscribers keep it until TTL)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job["status"] not in ACTIVE:
+                job["subscribers"] -= 1
+                if job["subscribers"] <= 0:
+                    self._drop(job)
+
+    # ---------- Internals ----------
+    def _finish(self, job: Dict[str, Any], status: str, result=None, error: Optional[str] = None):
+        job["status"], job["result"], job["error"] = status, result, error
+        job["finished"] = time.time()
+        job["fn"] = None
+        if status != DONE and job["dedupe_key"] and self._by_key.get(job["dedupe_key"]) == job["id"]:
+            self._by_key.pop(job["dedupe_key"], None)
+
+    def _drop(self, job: Dict[str, Any]):
+        self._jobs.pop(job["id"], None)
+        if job["dedupe_key"] and self._by_key.get(job["dedupe_key"]) == job["id"]:
+            self._by_key.pop(job["dedupe_key"], None)
+
+    def _expire(self):
+        now = time.time()
+        for job in list(self._jobs.values()):
+            if job["finished"] and now - job["finished"] > JOB_RESULT_TTL:
+                self._drop(job)
+
+    def _next_job(self) -> Dict[str, Any]:
+        """Block until the scheduler admits a queued job, then mark it running (lock held)."""
+        while True:
+            job_id = self._scheduler.pop_next(self._running_memory, self._running)
+            job = self._jobs.get(job_id) if job_id else None
+            if job is not None and job["status"] == QUEUED:
+                job["status"], job["started"] = RUNNING, time.time()
+                self._running += 1
+                self._running_memory += job["memory_estimate"]
+                return job
+            if job_id is None:
+                self._wakeup.wait()
+
+    def _worker(self):
+        while True:
+            with self._lock:
+                job = self._next_job()
+                fn, cancel = job["fn"], job["cancel"]
+
+            def report(event, job=job):
+                job["progress"] = event
+
+            try:
+                result = fn(report, cancel.is_set)
+                status, error = DONE, None
+            except JobCancelled:
+                result, status, error = None, CANCELLED, None
+            except Exception as e:
+                result, status, error = None, FAILED, f"{type(e).__name__}: {e}"
+            with self._lock:
+                self._finish(job, status, result, error)
+                self._running -= 1
+                self._running_memory -= job["memory_estimate"]
+                self._wakeup.notify_all()
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Process-wide queue shared by every Streamlit session."""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue()
+    return _job_queue
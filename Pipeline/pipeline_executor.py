@@ -0,0 +1,626 @@
+"""
+pipeline_executor.py
+- Runs the dashboard pipeline stages back to back (STAGES): load -> roles -> compaction -> result cache lookup ->
+  mapping -> change detection -> aggregation plan -> KPIs -> charts -> insights
+- Emits real progress events (stage, elapsed ms, rows processed) to an optional callback; should_cancel() is checked
+  between stages and components; every stage and component runs inside a tracing span (Pipeline/tracing.py)
+- Charts build on a bounded thread pool; a failing chart never aborts the others (ctx["chart_errors"])
+- Work is skipped or moved where possible: result cache (Cache/result_cache.py), incremental recompute
+  (Pipeline/dependency_graph.py), projected loads (Data_loader/projection.py), SQL pushdown (Dashboard/sql_pushdown.py),
+  out-of-core DuckDB (Dashboard/execution_backend.py) and approximate mode (Pipeline/approximate.py)
+- submit_run() queues a run as a background job on the shared dataset store; see "Background jobs" below
+"""
+from typing import Dict, Any, Callable, Optional, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+
+from Data_loader.source_loader import load_dataframe, load_sample, source_fingerprint, with_fingerprint, estimate_rows
+from Schema_mapper.schema_mapper import infer_field_roles, map_template_fields
+from Dashboard.dashboard_generator import (
+    _empty_figure, generate_kpi, generate_line, generate_bar, generate_pie,
+    generate_scatter, generate_histogram, generate_heatmap
+)
+from Dashboard.template_registry import compile_template, is_compiled
+from Data_loader.dtype_compaction import compact_dataframe
+from Dashboard.aggregation_planner import plan_aggregations, aggregation_key, histogram_key
+from Dashboard.sql_pushdown import run_pushdown, PUSHDOWN_SAMPLE_ROWS
+from Dashboard.execution_backend import BACKEND_SAMPLE_ROWS, choose_backend, open_backend
+from Data_loader.data_loader import read_sql_table
+from Data_loader.chunked_ingest import IngestBudgetExceeded
+from Data_loader.projection import PROJECTION_ENABLED, PROJECTION_SAMPLE_ROWS, plan_projection, projection_key
+from Pipeline.approximate import (
+    should_approximate, estimate_plan, estimate_sample, estimate_numeric_summary, run_pushdown_approximate
+)
+from Insight.insight_engine import basic_kpi_insights
+from Cache.result_cache import dataframe_fingerprint, result_key, get_results, put_results
+from Pipeline.job_queue import JobCancelled, get_job_queue
+from Cache.dataset_store import get_dataset_store
+from Pipeline.tracing import trace_run, span, propagate
+from Pipeline.dependency_graph import (
+    INSIGHTS_NODE, component_id, build_dependency_graph, column_fingerprints, dirty_nodes, incremental_aggregates
+)
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+CHART_GENERATORS = {
+    "line": generate_line,
+    "bar": generate_bar,
+    "pie": generate_pie,
+    "scatter": generate_scatter,
+    "histogram": generate_histogram,
+    "heatmap": generate_heatmap,
+}
+
+# Worker threads used for chart generation; 1 keeps the old sequential behaviour.
+CHART_WORKERS = int(os.environ.get("DASHBOARD_CHART_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Set DASHBOARD_COMPACT_DTYPES=0 to keep the dtypes exactly as loaded.
+COMPACT_DTYPES = os.environ.get("DASHBOARD_COMPACT_DTYPES", "1") != "0"
+# Database sources aggregate in the database (Dashboard/sql_pushdown.py); 0 loads the whole table instead.
+SQL_PUSHDOWN = os.environ.get("DASHBOARD_SQL_PUSHDOWN", "1") != "0"
+
+
+# ---------- Helpers ----------
+def _rows(ctx: Dict[str, Any]) -> int:
+    df = ctx.get("df")
+    return 0 if df is None else len(df)
+
+
+class _Emitter:
+    """Builds progress events relative to the start of a stage and forwards them to the callback."""
+
+    def __init__(self, stage: str, label: str, on_progress: Optional[ProgressCallback]):
+        self.stage = stage
+        self.label = label
+        self.on_progress = on_progress
+        self.start = time.perf_counter()
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.start) * 1000, 1)
+
+    def __call__(self, status: str, rows: int, done: Optional[int] = None, total: Optional[int] = None, detail: str = ""):
+        event = {
+            "stage": self.stage,
+            "label": self.label,
+            "status": status,
+            "elapsed_ms": self.elapsed_ms(),
+            "rows": rows,
+            "done": done,
+            "total": total,
+            "detail": detail,
+        }
+        if self.on_progress is not None:
+            self.on_progress(event)
+        return event
+
+
+def _plan_projection(ctx: Dict[str, Any], sample: Optional[pd.DataFrame], emit: _Emitter) -> Optional[List[str]]:
+    """Columns to load for this template, or None for all of them (ctx["projection"] records the plan)."""
+    if not PROJECTION_ENABLED or sample is None:
+        return None
+    projection = plan_projection(ctx["template"], sample)
+    if len(projection["columns"]) >= projection["total_columns"]:
+        return None
+    ctx["projection"] = projection
+    emit("running", 0, detail=f"loading {len(projection['columns'])} of {projection['total_columns']} columns")
+    return projection["columns"]
+
+
+def _open_backend(ctx: Dict[str, Any], sample: Optional[pd.DataFrame], columns: Optional[List[str]], emit: _Emitter):
+    """Out-of-core backend when the (projected) source is estimated not to fit in memory, else None."""
+    fi = ctx["file_info"]
+    if sample is not None and columns:
+        sample = sample[columns]
+    if choose_backend(sample, estimate_rows(fi)) != "duckdb":
+        return None
+    backend = open_backend(fi, source_fingerprint(fi), columns)
+    if backend is not None:
+        emit("running", 0, detail=f"out-of-core: {backend.name} over the source file")
+    return backend
+
+
+# ---------- Stages ----------
+def _stage_load(ctx: Dict[str, Any], emit: _Emitter):
+    fi = ctx["file_info"]
+    if SQL_PUSHDOWN and fi.get("type") == "db" and fi.get("conn") and fi.get("table"):
+        ctx["pushdown"] = {"conn": fi["conn"], "table": fi["table"]}
+    if ctx["df"] is None and ctx["pushdown"]:
+        # Only a sample is loaded (roles, preview, scatter / histogram); aggregations run in the database
+        ctx["df"] = read_sql_table(fi["conn"], fi["table"], max_rows=PUSHDOWN_SAMPLE_ROWS,
+                                   on_progress=lambda rows: emit("running", rows, detail="sampling"))
+    elif ctx["df"] is None:
+        # the first rows plan the projection and size the source for the backend choice
+        sample = load_sample(fi, PROJECTION_SAMPLE_ROWS)
+        columns = _plan_projection(ctx, sample, emit)
+        ctx["backend"] = _open_backend(ctx, sample, columns, emit)
+        if ctx["backend"] is not None:
+            # Only a sample is loaded (roles, preview, scatter); aggregations and histograms run in the backend
+            ctx["df"] = ctx["backend"].sample(BACKEND_SAMPLE_ROWS)
+            return
+        start = time.perf_counter()
+
+        def progress(rows, bytes_read=None, total_bytes=None):
+            if bytes_read is None:
+                emit("running", rows, detail="streaming")
+                return
+            mb = bytes_read / (1024 * 1024)
+            rate = mb / max(time.perf_counter() - start, 1e-6)
+            of = f" of {total_bytes / (1024 * 1024):.0f}" if total_bytes else ""
+            emit("running", rows, detail=f"streaming {mb:.0f}{of} MB, {rate:.1f} MB/s")
+
+        ctx["ingest"] = {}
+        try:
+            ctx["df"] = load_dataframe(fi, on_progress=progress, columns=columns, report=ctx["ingest"])
+        except IngestBudgetExceeded as e:
+            ctx["error"] = str(e)
+            return
+        if ctx["ingest"].get("sample_fraction", 1.0) < 1.0:
+            emit("running", _rows(ctx), detail=f"sampled {ctx['ingest']['sample_fraction']:.0%} of rows to fit the ingest budget")
+    if ctx["df"] is None:
+        ctx["error"] = "Failed to load data file."
+
+
+def _stage_cache_lookup(ctx: Dict[str, Any], emit: _Emitter):
+    if not ctx["use_cache"] or ctx["pushdown"] or ctx["backend"] or _ingest_sampled(ctx):
+        # pushdown / out-of-core / sampled runs only loaded a sample; it says nothing about the rest of the source
+        return
+    ctx["cache_key"] = result_key(dataframe_fingerprint(ctx["df"]), ctx["template"])
+    cached = get_results(ctx["cache_key"])
+    if cached is not None:
+        ctx.update(cached)
+        ctx["cache_hit"] = True
+    emit("running", _rows(ctx), detail="hit" if ctx["cache_hit"] else "miss")
+
+
+def _stage_roles(ctx: Dict[str, Any], emit: _Emitter):
+    ctx["roles"] = infer_field_roles(ctx["df"])
+
+
+def _stage_compact(ctx: Dict[str, Any], emit: _Emitter):
+    if not COMPACT_DTYPES:
+        return
+    ctx["df"], ctx["compaction"] = compact_dataframe(ctx["df"], ctx["roles"])
+    saved = ctx["compaction"]["saved_bytes"] / (1024 * 1024)
+    emit("running", _rows(ctx), detail=f"{len(ctx['compaction']['converted'])} columns compacted, {saved:.1f} MB saved")
+
+
+def _stage_mapping(ctx: Dict[str, Any], emit: _Emitter):
+    if ctx["projection"]:
+        # the mapping the projection was planned with; it only refers to loaded columns
+        ctx["mapping"] = ctx["projection"]["mapping"]
+        return
+    ctx["mapping"] = map_template_fields(ctx["template"], ctx["roles"])
+
+
+def _stage_changes(ctx: Dict[str, Any], emit: _Emitter):
+    layout = ctx["template"].get("layout", [])
+    ctx["node_ids"] = {id(comp): component_id(comp, i) for i, comp in enumerate(layout)}
+    if not ctx["incremental"] or ctx["pushdown"] or ctx["backend"] or _approximating(ctx):
+        # estimates are neither reused nor kept for the next run
+        ctx["dirty"] = set(ctx["node_ids"].values()) | {INSIGHTS_NODE}
+        return
+    previous = ctx["previous"]
+    graph = build_dependency_graph(ctx["template"], ctx["mapping"], ctx["df"])
+    fps, appended = column_fingerprints(ctx["df"], graph, previous)
+    sigs, ctx["dirty"] = dirty_nodes(graph, fps, previous)
+    ctx["state"] = {"rows": _rows(ctx), "columns": fps, "appended": appended, "signatures": sigs, "nodes": {}}
+    emit("running", _rows(ctx), detail=f"{len(ctx['dirty'])}/{len(graph)} components to recompute")
+
+
+def _reuse(ctx: Dict[str, Any], nid: str):
+    """Previous result for a node whose inputs did not change, else None."""
+    if nid in ctx["dirty"] or not ctx["previous"]:
+        return None
+    return ctx["previous"].get("nodes", {}).get(nid, {}).get("result")
+
+
+def _remember(ctx: Dict[str, Any], nid: str, result):
+    if ctx["state"] is not None:
+        ctx["state"]["nodes"][nid] = {"signature": ctx["state"]["signatures"][nid], "result": result}
+
+
+def _ingest_sampled(ctx: Dict[str, Any]) -> bool:
+    """The loaded frame is a uniform sample of the file, kept to fit the ingest budget."""
+    return (ctx["ingest"] or {}).get("sample_fraction", 1.0) < 1.0
+
+
+def _approximating(ctx: Dict[str, Any]) -> bool:
+    """In-memory runs on a sample (pushdown runs decide once the table's row count is known)."""
+    if ctx["pushdown"] or ctx["backend"]:
+        return False
+    return _ingest_sampled(ctx) or should_approximate(_rows(ctx), ctx["approximate"])
+
+
+def _estimated(ctx: Dict[str, Any], result: Dict[str, Any], emit: _Emitter):
+    """Keep the sample description in ctx["estimates"] and report it."""
+    ctx["estimates"] = {k: result.pop(k) for k in
+                        ("intervals", "sample_rows", "population_rows", "strata", "confidence", "method")}
+    est = ctx["estimates"]
+    strata = f" stratified by {', '.join(est['strata'])}" if est["strata"] else ""
+    emit("running", _rows(ctx), detail=(
+        f"approximate: {est['sample_rows']:,} of {est['population_rows']:,} rows ({est['method']}{strata})"
+    ))
+
+
+def _stage_plan(ctx: Dict[str, Any], emit: _Emitter):
+    plan = plan_aggregations(ctx["template"], ctx["mapping"])
+    if ctx["pushdown"]:
+        numeric = ctx["df"].select_dtypes(include="number").columns.tolist()
+        conn, table = ctx["pushdown"]["conn"], ctx["pushdown"]["table"]
+        pushed = run_pushdown_approximate(conn, table, list(plan), numeric, requested=ctx["approximate"])
+        if pushed is not None:
+            _estimated(ctx, pushed, emit)
+        else:
+            pushed = run_pushdown(conn, table, list(plan), numeric)
+        ctx["aggregates"] = pushed.pop("aggregates")
+        ctx["pushdown"].update(pushed)
+        emit("running", _rows(ctx), detail=(
+            f"{pushed['pushed_down']} of {len(plan)} aggregations pushed down to SQL "
+            f"over {pushed['row_count']:,} rows, {len(pushed['fallback'])} in pandas"
+        ))
+        return
+    if ctx["backend"]:
+        ctx["aggregates"], unsupported = ctx["backend"].execute_plan(list(plan))
+        ctx["aggregates"].update(ctx["backend"].execute_plan_columns(unsupported))
+        for comp in ctx["template"]["charts"]:
+            key = histogram_key(comp, ctx["mapping"])
+            # a histogram over a missing column is left to fail on its own, like any other component
+            if key is not None and all(c in ctx["df"].columns for c in (key[1],) + key[2]):
+                ctx["aggregates"][key] = ctx["backend"].histogram(key[1], int(key[3]), *key[2])
+        emit("running", _rows(ctx), detail=(
+            f"{len(plan) - len(unsupported)} of {len(plan)} aggregations in {ctx['backend'].name}, "
+            f"{len(unsupported)} in pandas"
+        ))
+        return
+    if _approximating(ctx):
+        if _ingest_sampled(ctx):
+            estimated = estimate_sample(ctx["df"], list(plan), ctx["ingest"]["rows_read"])
+        else:
+            estimated = estimate_plan(ctx["df"], list(plan))
+        ctx["aggregates"] = estimated.pop("aggregates")
+        _estimated(ctx, estimated, emit)
+        return
+    state = ctx["state"]
+    fps = state["columns"] if state else {}
+    appended = state["appended"] if state else set()
+    ctx["aggregates"], counts = incremental_aggregates(ctx["df"], list(plan), fps, appended, ctx["previous"])
+    if state is not None:
+        state["aggregates"] = ctx["aggregates"]
+    shared = sum(len(ids) for ids in plan.values())
+    emit("running", _rows(ctx), detail=(
+        f"{len(plan)} distinct aggregations for {shared} components "
+        f"({counts['computed']} computed, {counts['appended']} appended, {counts['reused']} reused)"
+    ))
+
+
+def _check_cancel(ctx: Dict[str, Any]):
+    if ctx["should_cancel"] is not None and ctx["should_cancel"]():
+        raise JobCancelled()
+
+
+def _stage_kpis(ctx: Dict[str, Any], emit: _Emitter):
+    kpis = ctx["template"]["kpis"]
+    rows = _rows(ctx)
+    for i, comp in enumerate(kpis):
+        _check_cancel(ctx)
+        nid = ctx["node_ids"][id(comp)]
+        kpi = _reuse(ctx, nid)
+        if kpi is None:
+            with span("kpi", component_id=nid, rows=rows):
+                kpi = generate_kpi(ctx["df"], comp, ctx["mapping"], ctx["aggregates"])
+            if ctx["estimates"]:
+                key = aggregation_key(comp, ctx["mapping"])
+                if key in ctx["estimates"]["intervals"]:
+                    kpi["ci"] = round(ctx["estimates"]["intervals"][key], 2)
+                    kpi["confidence"] = ctx["estimates"]["confidence"]
+        ctx["kpi_results"].append(kpi)
+        _remember(ctx, nid, kpi)
+        emit("running", rows, done=i + 1, total=len(kpis), detail=comp.get("id", ""))
+
+
+def _build_chart(df, comp: Dict, mapping: Dict, aggregates: Optional[Dict] = None):
+    """Build one chart; any exception is turned into a placeholder figure so siblings are unaffected."""
+    chart_type = comp.get("type")
+    try:
+        with span(f"chart.{chart_type}", component_id=comp.get("id"), rows=len(df)):
+            return chart_type, CHART_GENERATORS[chart_type](df, comp, mapping, aggregates), None
+    except Exception as e:
+        title = comp.get("title", chart_type)
+        return chart_type, _empty_figure(f"{title} - failed: {e}"), str(e)
+
+
+def run_components(df, comps: List[Dict], mapping: Dict, max_workers: int = 1, aggregates: Optional[Dict] = None,
+                   on_done: Optional[Callable[[int, Dict], None]] = None) -> Tuple[List[Tuple[str, Any]], Dict[str, str]]:
+    """
+    Build chart components, optionally on a thread pool of max_workers.
+    Results are returned in template order regardless of completion order; on_done(i, comp)
+    is called from the calling thread as each component finishes (Streamlit widgets are not thread-safe).
+    Returns (results, errors): a failing component yields a placeholder figure in results and
+    its message in errors[component id]; nothing is raised.
+    """
+    results: List[Optional[Tuple[str, Any]]] = [None] * len(comps)
+    errors: Dict[str, str] = {}
+
+    def _store(i, built):
+        chart_type, fig, err = built
+        results[i] = (chart_type, fig)
+        if err:
+            errors[comps[i].get("id", str(i))] = err
+        if on_done is not None:
+            on_done(i, comps[i])
+
+    if max_workers <= 1 or len(comps) <= 1:
+        for i, comp in enumerate(comps):
+            _store(i, _build_chart(df, comp, mapping, aggregates))
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(comps))) as pool:
+            futures = {pool.submit(propagate(_build_chart), df, comp, mapping, aggregates): i for i, comp in enumerate(comps)}
+            try:
+                for fut in as_completed(futures):
+                    _store(futures[fut], fut.result())
+            except BaseException:
+                # e.g. cancellation raised from on_done: drop charts that have not started yet
+                for fut in futures:
+                    fut.cancel()
+                raise
+
+    return results, errors
+
+
+def _stage_charts(ctx: Dict[str, Any], emit: _Emitter):
+    charts = [c for c in ctx["template"]["charts"] if c.get("type") in CHART_GENERATORS]
+    rows = _rows(ctx)
+    nids = [ctx["node_ids"][id(c)] for c in charts]
+    results = [_reuse(ctx, nid) for nid in nids]
+    todo = [i for i, r in enumerate(results) if r is None]
+    finished = []
+
+    def on_done(i, comp):
+        finished.append(i)
+        emit("running", rows, done=len(finished), total=len(todo),
+             detail=f"{comp.get('type')} chart, {len(charts) - len(todo)} reused")
+        _check_cancel(ctx)
+
+    built, ctx["chart_errors"] = run_components(
+        ctx["df"], [charts[i] for i in todo], ctx["mapping"], max_workers=ctx["chart_workers"],
+        aggregates=ctx["aggregates"], on_done=on_done
+    )
+    for i, chart in zip(todo, built):
+        results[i] = tuple(chart)
+    for nid, chart in zip(nids, results):
+        if nid not in ctx["chart_errors"]:
+            _remember(ctx, nid, chart)
+    ctx["chart_results"] = results
+
+
+def _stage_insights(ctx: Dict[str, Any], emit: _Emitter):
+    ctx["insight_results"] = _reuse(ctx, INSIGHTS_NODE)
+    if ctx["insight_results"] is None and ctx["pushdown"]:
+        ctx["insight_results"] = ctx["pushdown"]["insights"]
+    elif ctx["insight_results"] is None and ctx["backend"]:
+        with span(f"insights.{ctx['backend'].name}"):
+            numeric = ctx["df"].select_dtypes(include="number").columns.tolist()
+            ctx["insight_results"] = ctx["backend"].insights(numeric)
+    elif ctx["insight_results"] is None and _ingest_sampled(ctx):
+        with span("insights.estimate_numeric_summary", rows=_rows(ctx)):
+            ctx["insight_results"] = estimate_numeric_summary(ctx["df"], ctx["ingest"]["rows_read"])
+    elif ctx["insight_results"] is None:
+        with span("insights.basic_kpi_insights", rows=_rows(ctx)):
+            ctx["insight_results"] = basic_kpi_insights(ctx["df"])
+    _remember(ctx, INSIGHTS_NODE, ctx["insight_results"])
+
+
+STAGES = [
+    ("load", "📂 Loading data", _stage_load),
+    ("roles", "🔍 Inferring field roles", _stage_roles),
+    ("compact", "🗜️ Compacting column types", _stage_compact),
+    ("cache", "🗄️ Checking result cache", _stage_cache_lookup),
+    ("mapping", "🗺️ Mapping template fields", _stage_mapping),
+    ("changes", "🧩 Detecting changed inputs", _stage_changes),
+    ("plan", "🧮 Computing shared aggregations", _stage_plan),
+    ("kpis", "📊 Generating KPIs", _stage_kpis),
+    ("charts", "📈 Generating Charts", _stage_charts),
+    ("insights", "💡 Generating Insights", _stage_insights),
+]
+
+
+# ---------- Executor ----------
+def run_pipeline(file_info: Dict, template: Dict, on_progress: Optional[ProgressCallback] = None,
+                 chart_workers: Optional[int] = None, use_cache: bool = True,
+                 previous: Optional[Dict[str, Any]] = None, incremental: bool = True,
+                 should_cancel: Optional[Callable[[], bool]] = None,
+                 df: Optional[pd.DataFrame] = None, approximate: Optional[bool] = None) -> Dict[str, Any]:
+    """
+    Run every stage in order and return the pipeline context:
+    df, roles, mapping, kpi_results, chart_results, chart_errors, insight_results, timings and (on failure) error.
+    Each stage reports a "started" and a "finished" event; KPI and chart stages also report per-component progress.
+    template may be raw or already compiled by Dashboard.template_registry (raw ones are validated here and
+    raise TemplateError). chart_workers defaults to CHART_WORKERS. With use_cache, results are read from / written to the result cache
+    and ctx["cache_hit"] tells whether the stages after the lookup were skipped.
+    With incremental, ctx["state"] holds per-component signatures and results; pass it back as `previous`
+    on the next run so only components whose template spec, mapped columns or column contents changed are rebuilt.
+    Raises JobCancelled as soon as should_cancel() returns True at a stage or component boundary.
+    A preloaded df skips load_dataframe (file_info is then only informational).
+    approximate forces (True) or rules out (False) approximate mode; None leaves it to DASHBOARD_APPROXIMATE.
+    Approximate runs fill ctx["estimates"] and are neither cached nor kept as incremental state.
+    ctx["trace"] lists the run's spans (stage, component id, rows, duration, peak memory); they are also exported.
+    """
+    if not is_compiled(template):
+        template = compile_template(template)
+    ctx: Dict[str, Any] = {
+        "file_info": file_info,
+        "template": template,
+        "df": df,
+        "roles": None,
+        "mapping": None,
+        "aggregates": {},
+        "kpi_results": [],
+        "chart_results": [],
+        "chart_errors": {},
+        "chart_workers": CHART_WORKERS if chart_workers is None else chart_workers,
+        "insight_results": [],
+        "timings": [],
+        "error": None,
+        "use_cache": use_cache,
+        "cache_key": None,
+        "cache_hit": False,
+        "compaction": None,
+        "pushdown": None,
+        "backend": None,
+        "projection": None,
+        "ingest": None,
+        "approximate": approximate,
+        "estimates": None,
+        "incremental": incremental,
+        "previous": previous if incremental else None,
+        "state": None,
+        "dirty": set(),
+        "node_ids": {},
+        "should_cancel": should_cancel,
+    }
+    pipeline_start = time.perf_counter()
+
+    with trace_run("dashboard_run", template=template.get("title", "")) as spans:
+        ctx["trace"] = spans
+        for stage, label, func in STAGES:
+            if ctx["cache_hit"]:
+                break
+            _check_cancel(ctx)
+            emit = _Emitter(stage, label, on_progress)
+            emit("started", _rows(ctx))
+            with span(stage) as stage_span:
+                func(ctx, emit)
+                stage_span["rows"] = _rows(ctx)
+            ctx["timings"].append(emit("finished", _rows(ctx)))
+            if ctx["error"]:
+                break
+
+    # a failed chart or an estimate is not worth keeping until the next code change
+    if (ctx["cache_key"] and not ctx["cache_hit"] and not ctx["error"] and not ctx["chart_errors"]
+            and not ctx["estimates"]):
+        put_results(ctx["cache_key"], ctx)
+
+    ctx["total_ms"] = round((time.perf_counter() - pipeline_start) * 1000, 1)
+    return ctx
+
+
+# ---------- Background jobs ----------
+# (source fingerprint, template hash) -> dataset store key of the projected frame the last such run loaded
+_projected_keys: Dict[Tuple[str, str], str] = {}
+
+
+def run_on_shared_dataset(file_info: Dict, template: Dict, fingerprint: Optional[str], **kwargs) -> Dict[str, Any]:
+    """
+    run_pipeline on the frame the dataset store holds for fingerprint (the full frame, or the projected frame an
+    earlier run of the same template loaded); if it holds neither, the frame this run loads is published there.
+    ctx["df"] is the stored frame and ctx["dataset_key"] its key.
+    """
+    if not is_compiled(template):
+        template = compile_template(template)
+    store = get_dataset_store()
+    handle = None
+    if fingerprint:
+        handle = store.acquire(fingerprint)
+        projected = _projected_keys.get((fingerprint, template["hash"]))
+        if handle is None and projected:
+            handle = store.acquire(projected)
+    ctx = run_pipeline(file_info, template, df=handle.df if handle else None, **kwargs)
+    key = handle.key if handle else fingerprint
+    if fingerprint and (ctx["backend"] or _ingest_sampled(ctx)):
+        # an out-of-core run's or a sampled ingest's rows must never be served to a later run as the source frame
+        key = f"{fingerprint}:sample"
+    elif fingerprint and ctx["projection"]:
+        key = projection_key(fingerprint, ctx["projection"]["columns"])
+        _projected_keys[(fingerprint, template["hash"])] = key
+    if key and ctx["df"] is not None:
+        handle = handle or store.put(key, ctx["df"])
+        ctx["df"] = handle.df
+        handle.release()
+    ctx["dataset_key"] = key
+    return ctx
+
+
+# ctx entries a background job hands back; the frame stays in the dataset store under "dataset_key"
+JOB_RESULT_KEYS = (
+    "dataset_key", "kpi_results", "chart_results", "chart_errors", "insight_results", "estimates", "ingest",
+    "state", "timings", "trace", "total_ms", "error", "cache_hit",
+)
+
+
+def job_result(ctx: Dict[str, Any], fingerprint: Optional[str]) -> Dict[str, Any]:
+    """
+    What a job keeps of a run_on_shared_dataset context until it is forgotten: JOB_RESULT_KEYS plus rows,
+    out_of_core, projected and columns (of a frame stored under its own key, else None). No frame, file_info or
+    previous state.
+    """
+    result = {k: ctx.get(k) for k in JOB_RESULT_KEYS}
+    out_of_core = ctx["backend"] is not None
+    own_key = not out_of_core and ctx["dataset_key"] not in (None, fingerprint) and ctx["df"] is not None
+    result.update({
+        "rows": _rows(ctx),
+        "out_of_core": out_of_core,
+        "projected": own_key and not _ingest_sampled(ctx),
+        "columns": list(ctx["df"].columns) if own_key else None,
+    })
+    return result
+
+
+def acquire_result_frame(file_info: Dict, result: Dict[str, Any]):
+    """
+    Dataset store handle to the frame a job result was computed on (result["dataset_key"]), reloading it from
+    file_info if the store evicted it since: the backend sample for out-of-core runs, else the (projected) columns.
+    """
+    def load():
+        if result["out_of_core"]:
+            return load_sample(file_info, BACKEND_SAMPLE_ROWS)
+        df = load_dataframe(file_info, columns=result["columns"])
+        if df is None or not COMPACT_DTYPES:
+            return df
+        return compact_dataframe(df, infer_field_roles(df))[0]
+
+    if not result["dataset_key"]:
+        return None
+    return get_dataset_store().get_or_load(result["dataset_key"], load)
+
+
+def _state_digest(state: Dict[str, Any]) -> str:
+    """Short digest of an incremental state's column fingerprints and signatures (part of the dedupe key)."""
+    payload = json.dumps([state.get("columns"), state.get("signatures")], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+
+def submit_run(file_info: Dict, template: Dict, previous: Optional[Dict[str, Any]] = None,
+               owner: Optional[str] = None, approximate: Optional[bool] = None) -> str:
+    """
+    Queue a dashboard run on the shared job queue and return its job id. Runs of the same source, template and
+    previous state share one job (and its finished result), whichever session or the warm-up submitted it.
+    The job is admitted by the fair scheduler using its expected row count (stored frame or estimate_rows).
+    approximate=False refines an approximate dashboard: the exact run is a separate job.
+    The job's result is job_result(ctx); pick the frame up with acquire_result_frame().
+    Pass a with_fingerprint() file_info to reuse its fingerprint (uploads are otherwise hashed here).
+    """
+    if not is_compiled(template):
+        template = compile_template(template)
+    file_info = with_fingerprint(file_info)
+    fingerprint = file_info["fingerprint"]
+    stored = get_dataset_store().acquire(fingerprint) if fingerprint else None
+    rows = len(stored.df) if stored is not None else estimate_rows(file_info)
+    if stored is not None:
+        stored.release()
+
+    def job(report, should_cancel):
+        ctx = run_on_shared_dataset(file_info, template, fingerprint, on_progress=report, previous=previous,
+                                    should_cancel=should_cancel, approximate=approximate)
+        return job_result(ctx, fingerprint)
+
+    dedupe_key = f"{fingerprint}:{template['hash']}" if fingerprint else None
+    if dedupe_key and approximate is not None:
+        dedupe_key += ":approximate" if approximate else ":exact"
+    if dedupe_key and previous:
+        # only sessions starting from the same state may share a run (and its reused components)
+        dedupe_key += f":{_state_digest(previous)}"
+    return get_job_queue().submit(job, dedupe_key=dedupe_key, owner=owner, rows=rows)
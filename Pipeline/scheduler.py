@@ -0,0 +1,98 @@
+"""
+scheduler.py
+- Admission policy for background dashboard runs (used by Pipeline/job_queue.py)
+- Fair queueing: one FIFO per owner (user), owners are served round-robin, so one user submitting many runs
+  cannot push everybody else back
+- Memory admission: every job carries a memory estimate (rows x DASHBOARD_JOB_BYTES_PER_ROW); a job only starts
+  while the estimates of the running jobs plus its own fit the budget (DASHBOARD_JOB_MEMORY_BUDGET), so a huge
+  upload waits instead of pushing the server into swap. A job larger than the whole budget runs alone.
+- Small jobs may overtake a large one that does not fit yet, but only DASHBOARD_JOB_MAX_OVERTAKES times;
+  after that the large job blocks the queue until enough memory is free, so it cannot starve either
+- Not thread-safe on its own: JobQueue calls it with its lock held
+"""
+from typing import Dict, List, Optional
+from collections import OrderedDict, deque
+import os
+
+
+def _default_memory_budget() -> int:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // 2
+    except (AttributeError, ValueError, OSError):
+        return 4 * 1024 * 1024 * 1024
+
+
+JOB_MEMORY_BUDGET = int(os.environ.get("DASHBOARD_JOB_MEMORY_BUDGET", str(_default_memory_budget())))
+# Peak working memory of a run per input row; ~1.5 KB/row was measured on the 24-column sample data.
+JOB_BYTES_PER_ROW = int(os.environ.get("DASHBOARD_JOB_BYTES_PER_ROW", "2048"))
+# Row count assumed when a source cannot be sized up front (e.g. a database table).
+JOB_DEFAULT_ROWS = int(os.environ.get("DASHBOARD_JOB_DEFAULT_ROWS", "100000"))
+JOB_MAX_OVERTAKES = int(os.environ.get("DASHBOARD_JOB_MAX_OVERTAKES", "8"))
+
+
+def estimate_job_memory(rows: Optional[int]) -> int:
+    """Bytes a run over `rows` input rows is expected to need at peak."""
+    return (JOB_DEFAULT_ROWS if rows is None else rows) * JOB_BYTES_PER_ROW
+
+
+class FairScheduler:
+    def __init__(self, memory_budget: int = JOB_MEMORY_BUDGET, max_overtakes: int = JOB_MAX_OVERTAKES):
+        self.memory_budget = memory_budget
+        self.max_overtakes = max_overtakes
+        self._queues: "OrderedDict[str, deque]" = OrderedDict()  # owner -> job ids, in ring order
+        self._memory: Dict[str, int] = {}
+        self._overtaken: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def add(self, job_id: str, owner: Optional[str], memory: int):
+        self._queues.setdefault(owner or "", deque()).append(job_id)
+        self._memory[job_id] = memory
+        self._overtaken[job_id] = 0
+
+    def remove(self, job_id: str) -> bool:
+        for owner, q in self._queues.items():
+            if job_id in q:
+                q.remove(job_id)
+                if not q:
+                    del self._queues[owner]
+                self._memory.pop(job_id, None)
+                self._overtaken.pop(job_id, None)
+                return True
+        return False
+
+    def order(self) -> List[str]:
+        """Queued job ids in the order they would be served if memory were no constraint."""
+        queues = [list(q) for q in self._queues.values()]
+        out = []
+        for depth in range(max((len(q) for q in queues), default=0)):
+            out.extend(q[depth] for q in queues if depth < len(q))
+        return out
+
+    def position(self, job_id: str) -> Optional[int]:
+        """1-based place in the fair order, or None if not queued."""
+        order = self.order()
+        return order.index(job_id) + 1 if job_id in order else None
+
+    def pop_next(self, running_memory: int, running: int) -> Optional[str]:
+        """Next job allowed to start given what is running, or None if nothing may start now."""
+        skipped = []
+        for owner, q in self._queues.items():
+            job_id = q[0]
+            memory = self._memory[job_id]
+            if running == 0 or running_memory + memory <= self.memory_budget:
+                q.popleft()
+                if q:
+                    self._queues.move_to_end(owner)
+                else:
+                    del self._queues[owner]
+                for s in skipped:
+                    self._overtaken[s] += 1
+                self._memory.pop(job_id)
+                self._overtaken.pop(job_id)
+                return job_id
+            if self._overtaken[job_id] >= self.max_overtakes:
+                return None
+            skipped.append(job_id)
+        return None
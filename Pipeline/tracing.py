@@ -0,0 +1,180 @@
+"""
+tracing.py
+- Lightweight span instrumentation for the dashboard pipeline
+- Each span records: stage, component id, row count, duration, the change of the process's current RSS over the
+  span (rss_delta_mb) and the process's RSS high-water mark at its end (process_peak_rss_mb). Both are
+  process-wide, so spans running concurrently on other threads show up in each other's delta
+- Spans of a run are appended to a local JSON-lines file (DASHBOARD_TRACE_FILE, "" disables it)
+- Optional OTLP-compatible file exporter (DASHBOARD_OTLP_FILE): one OTLP/JSON ExportTraceServiceRequest per line,
+  the format written by the OpenTelemetry Collector file exporter
+
+Usage:
+    with trace_run("dashboard") as spans:
+        with span("load") as s:
+            df = load_dataframe(...)
+            s["rows"] = len(df)
+"""
+from typing import Dict, Any, List, Optional
+from contextlib import contextmanager
+import contextvars
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+
+from Cache.disk_lru import CACHE_ROOT
+
+try:
+    import resource  # not available on Windows
+except ImportError:
+    resource = None
+
+TRACE_FILE = os.environ.get("DASHBOARD_TRACE_FILE", os.path.join(CACHE_ROOT, "traces", "trace.jsonl"))
+OTLP_FILE = os.environ.get("DASHBOARD_OTLP_FILE", "")
+# Trace files are rotated to <file>.1 once they exceed this size.
+TRACE_MAX_BYTES = int(os.environ.get("DASHBOARD_TRACE_MAX_BYTES", str(50 * 1024 * 1024)))
+SERVICE_NAME = "insighto-dashboard-agent"
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("dashboard_trace", default=None)
+_current_span: contextvars.ContextVar = contextvars.ContextVar("dashboard_span", default=None)
+_write_lock = threading.Lock()
+
+
+def _current_rss_mb() -> Optional[float]:
+    """Resident set size right now (Linux /proc; None where it cannot be read)."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+@contextmanager
+def span(stage: str, component_id: Optional[str] = None, rows: Optional[int] = None):
+    """
+    Time a block as a child of the current span. Yields the mutable span record so callers can set "rows"
+    once known. Outside trace_run() this is a no-op apart from the yielded dict.
+    """
+    trace = _current_trace.get()
+    record: Dict[str, Any] = {"stage": stage, "component_id": component_id, "rows": rows}
+    if trace is None:
+        yield record
+        return
+
+    parent = _current_span.get()
+    record.update({
+        "trace_id": trace["trace_id"],
+        "span_id": secrets.token_hex(8),
+        "parent_id": parent["span_id"] if parent else None,
+        "thread": threading.current_thread().name,
+        "status": "ok",
+        "error": None,
+    })
+    rss_before = _current_rss_mb()
+    record["start_unix_ns"] = time.time_ns()
+    start = time.perf_counter()
+    token = _current_span.set(record)
+    try:
+        yield record
+    except BaseException as e:
+        record["status"], record["error"] = "error", f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        record["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        record["end_unix_ns"] = record["start_unix_ns"] + int(record["duration_ms"] * 1e6)
+        rss_after = _current_rss_mb()
+        record["rss_delta_mb"] = round(rss_after - rss_before, 1) if rss_before is not None else None
+        record["process_peak_rss_mb"] = _peak_rss_mb()
+        with trace["lock"]:
+            trace["spans"].append(record)
+
+
+@contextmanager
+def trace_run(name: str, **attributes):
+    """Open a trace with a root span; on exit the spans are exported and remain in the yielded list."""
+    trace = {"trace_id": secrets.token_hex(16), "spans": [], "lock": threading.Lock(), "attributes": attributes}
+    token = _current_trace.set(trace)
+    try:
+        with span(name):
+            yield trace["spans"]
+    finally:
+        _current_trace.reset(token)
+        trace["spans"].sort(key=lambda s: s["start_unix_ns"])
+        export(trace["spans"], attributes)
+
+
+def propagate(fn):
+    """Wrap fn so it runs in a copy of the caller's context (keeps the trace across thread pools)."""
+    ctx = contextvars.copy_context()
+    return lambda *args, **kwargs: ctx.run(fn, *args, **kwargs)
+
+
+# ---------- Exporters ----------
+def _append_lines(path: str, lines: List[str]):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with _write_lock:
+        if os.path.exists(path) and os.path.getsize(path) > TRACE_MAX_BYTES:
+            os.replace(path, path + ".1")
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+def _otlp_value(v) -> Dict[str, Any]:
+    if isinstance(v, bool):
+        return {"boolValue": v}
+    if isinstance(v, int):
+        return {"intValue": str(v)}
+    if isinstance(v, float):
+        return {"doubleValue": v}
+    return {"stringValue": str(v)}
+
+
+def to_otlp(spans: List[Dict[str, Any]], attributes: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Convert span records into an OTLP/JSON ExportTraceServiceRequest."""
+    otlp_spans = []
+    for s in spans:
+        attrs = {"dashboard.stage": s["stage"], "dashboard.thread": s.get("thread")}
+        for k in ("component_id", "rows", "rss_delta_mb", "process_peak_rss_mb"):
+            if s.get(k) is not None:
+                attrs[f"dashboard.{k}"] = s[k]
+        otlp_spans.append({
+            "traceId": s["trace_id"],
+            "spanId": s["span_id"],
+            "parentSpanId": s["parent_id"] or "",
+            "name": s["stage"] if not s.get("component_id") else f"{s['stage']}:{s['component_id']}",
+            "kind": 1,
+            "startTimeUnixNano": str(s["start_unix_ns"]),
+            "endTimeUnixNano": str(s["end_unix_ns"]),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in attrs.items() if v is not None],
+            "status": {"code": 2, "message": s["error"]} if s["status"] == "error" else {"code": 1},
+        })
+    resource_attrs = {"service.name": SERVICE_NAME, **(attributes or {})}
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": k, "value": _otlp_value(v)} for k, v in resource_attrs.items()]},
+        "scopeSpans": [{"scope": {"name": "dashboard.pipeline"}, "spans": otlp_spans}],
+    }]}
+
+
+def export(spans: List[Dict[str, Any]], attributes: Optional[Dict[str, Any]] = None):
+    """Write spans to the JSON-lines trace file and, if configured, the OTLP file. Export errors are swallowed."""
+    if not spans:
+        return
+    try:
+        if TRACE_FILE:
+            _append_lines(TRACE_FILE, [json.dumps(s, default=str) for s in spans])
+        if OTLP_FILE:
+            _append_lines(OTLP_FILE, [json.dumps(to_otlp(spans, attributes), default=str)])
+    except OSError:
+        pass
@@ -0,0 +1,62 @@
+"""
+warmup.py
+- Warm start for the bundled sample dashboard: the sample data and sample_dashboard.json are static, so they are
+  run through the pipeline once per server process instead of on the first user's click
+- start_warmup() is called by main.py right after the login form is drawn, i.e. on the first script run after the
+  server starts; it is a no-op on every later call and returns immediately (the work runs on a daemon thread)
+- The run is an ordinary background job (Pipeline/job_queue.py) with the same dedupe key a session uses, so:
+  - a user who clicks "Run Agent" while it is still running joins it instead of starting another
+  - its loaded frame stays in the shared dataset store and its results in the result cache for later sessions
+  - once it finishes, the warm-up forgets its own subscription, so the job result is only held for sessions
+    that joined it
+- Set DASHBOARD_WARMUP=0 to disable
+"""
+import os
+import threading
+import time
+
+WARMUP_ENABLED = os.environ.get("DASHBOARD_WARMUP", "1") != "0"
+WARMUP_POLL_INTERVAL = float(os.environ.get("DASHBOARD_WARMUP_POLL_INTERVAL", "1.0"))
+
+_warmup_started = False
+_warmup_lock = threading.Lock()
+
+
+def _submit_warmup(current_dir: str):
+    from Data_loader.source_loader import sample_file_info, source_fingerprint
+    from Dashboard.template_registry import get_template, TemplateError
+    from Pipeline.pipeline_executor import submit_run
+    from Pipeline.job_queue import get_job_queue, ACTIVE
+
+    file_info = sample_file_info(current_dir)
+    if source_fingerprint(file_info) is None:
+        return
+    try:
+        template = get_template(os.path.join(current_dir, "Dashboard", "sample_dashboard.json"))
+    except TemplateError:
+        return
+    job_id = submit_run(file_info, template, owner="warmup")
+
+    queue = get_job_queue()
+    while True:
+        job = queue.status(job_id)
+        if job is None or job["status"] not in ACTIVE:
+            break
+        time.sleep(WARMUP_POLL_INTERVAL)
+    queue.forget(job_id)
+
+
+def start_warmup(current_dir: str) -> bool:
+    """
+    Queue the sample dashboard run once per process. Importing the pipeline (pandas, plotly) happens on a
+    background thread so the login screen is not held up. Returns True only on the call that started it.
+    """
+    global _warmup_started
+    if not WARMUP_ENABLED:
+        return False
+    with _warmup_lock:
+        if _warmup_started:
+            return False
+        _warmup_started = True
+    threading.Thread(target=_submit_warmup, args=(current_dir,), name="dashboard-warmup", daemon=True).start()
+    return True
@@ -0,0 +1,16 @@
+"""
+conftest.py
+- Puts the repository root on sys.path (the app is a flat set of top-level packages, not an installed one)
+- Points every on-disk cache, the trace file and the warm-up at throwaway settings before any module reads them
+"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+os.environ.setdefault("DASHBOARD_CACHE_DIR", tempfile.mkdtemp(prefix="dashboard-tests-"))
+os.environ.setdefault("DASHBOARD_TRACE_FILE", "")
+os.environ.setdefault("DASHBOARD_WARMUP", "0")
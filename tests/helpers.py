@@ -0,0 +1,169 @@
+"""
+helpers.py
+- Shared test data: deterministic synthetic transactions (Benchmarks/synthetic_data.py), the sample template and
+  SQLite copies of a frame for the database paths
+- baseline_*: the computations the app ran before the staged pipeline (the original dashboard_generator code and
+  basic_kpi_insights on the raw frame), so every new execution path is compared with what the app used to show
+- chart_values: the numbers a figure displays, keyed by label, so figures built by different paths compare
+  independently of trace order and dtypes
+"""
+from typing import Dict, Any, List, Optional
+import base64
+import io
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from Benchmarks.synthetic_data import generate_transactions
+from Dashboard.aggregation_planner import resample_freq
+from Dashboard.template_registry import get_template
+from Schema_mapper.schema_mapper import infer_field_roles, map_template_fields
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_PATH = os.path.join(ROOT, "Dashboard", "sample_dashboard.json")
+
+
+def transactions(rows: int = 5000, seed: int = 7) -> pd.DataFrame:
+    return generate_transactions(rows, seed=seed)
+
+
+def sample_template() -> Dict[str, Any]:
+    return get_template(TEMPLATE_PATH)
+
+
+def components(template: Dict[str, Any], kind: str) -> List[Dict]:
+    """The template's KPI ("kpi") or chart ("chart") components, in layout order."""
+    charts = ("line", "bar", "pie", "scatter", "histogram", "heatmap")
+    return [c for c in template.get("layout", []) if (c.get("type") == "kpi") == (kind == "kpi")
+            and (kind == "kpi" or c.get("type") in charts)]
+
+
+def mapping_for(df: pd.DataFrame, template: Dict[str, Any]) -> Dict[str, str]:
+    return map_template_fields(template, infer_field_roles(df))
+
+
+def csv_upload(df: pd.DataFrame, name: str = "transactions.csv") -> Dict[str, Any]:
+    """file_info of an in-memory CSV upload of df (a BytesIO behaves like a Streamlit UploadedFile)."""
+    uploaded = io.BytesIO(df.to_csv(index=False).encode("utf-8"))
+    uploaded.name = name
+    return {"type": "upload", "path_csv": None, "path_xlsx": None, "uploaded": uploaded, "conn": None, "table": None}
+
+
+def sqlite_table(df: pd.DataFrame, table: str = "transactions") -> str:
+    """Connection string of a fresh SQLite file holding df as table."""
+    import sqlalchemy as sa
+    conn_str = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'source.db')}"
+    engine = sa.create_engine(conn_str)
+    df.to_sql(table, engine, index=False)
+    engine.dispose()
+    return conn_str
+
+
+def db_source(conn_str: str, table: str = "transactions") -> Dict[str, Any]:
+    return {"type": "db", "path_csv": None, "path_xlsx": None, "uploaded": None, "conn": conn_str, "table": table}
+
+
+# ---------- Baseline (pre-pipeline) computations ----------
+def baseline_kpi(df: pd.DataFrame, comp: Dict, mapping: Dict):
+    val_field = mapping.get(comp.get("value_field")) or mapping.get(f"{comp.get('id')}.value_field")
+    agg = comp.get("agg", "sum")
+    if val_field is None:
+        return "N/A"
+    if agg == "mean":
+        v = df[val_field].mean()
+    elif agg == "mean_abs":
+        v = df[val_field].abs().mean()
+    else:
+        v = df[val_field].sum()
+    return round(float(v), 2)
+
+
+def baseline_chart(df: pd.DataFrame, comp: Dict, mapping: Dict) -> Optional[Dict]:
+    """label -> value of a line / bar / pie / heatmap component, as the original generators computed it."""
+    ctype = comp.get("type")
+    if ctype == "line":
+        date = mapping.get(comp.get("date_field")) or mapping.get(f"{comp.get('id')}.date_field")
+        val = mapping.get(comp.get("value_field")) or mapping.get(f"{comp.get('id')}.value_field")
+        df2 = df.copy()
+        df2[date] = pd.to_datetime(df2[date])
+        series = df2.set_index(date).resample(resample_freq(comp.get("time_granularity")))[val].sum()
+        return {pd.Timestamp(k): float(v) for k, v in series.items()}
+    if ctype in ("bar", "pie"):
+        grp = mapping.get(comp.get("group_field")) or mapping.get(f"{comp.get('id')}.group_field")
+        val = mapping.get(comp.get("value_field")) or mapping.get(f"{comp.get('id')}.value_field")
+        df2 = df.copy()
+        df2["abs_val"] = df2[val].abs()
+        summed = df2.groupby(grp)["abs_val"].sum().reset_index()
+        if ctype == "bar":
+            summed = summed.sort_values("abs_val", ascending=False).head(comp.get("top_n", 10))
+        return {str(k): float(v) for k, v in zip(summed[grp], summed["abs_val"])}
+    if ctype == "heatmap":
+        x = mapping.get(comp.get("x_field", ""), comp.get("x_field"))
+        y = mapping.get(comp.get("y_field", ""), comp.get("y_field"))
+        val = mapping.get(comp.get("value_field", ""), comp.get("value_field"))
+        pivot = df.pivot_table(index=y, columns=x, values=val, aggfunc="sum", fill_value=0)
+        return {(str(r), str(c)): float(pivot.loc[r, c]) for r in pivot.index for c in pivot.columns}
+    return None
+
+
+def baseline_insights(df: pd.DataFrame) -> List[str]:
+    insights = []
+    for col in df.select_dtypes(include=[np.number]).columns:
+        insights.append(f"{col}: sum={df[col].sum():.2f}, avg={df[col].mean():.2f}, "
+                        f"min={df[col].min():.2f}, max={df[col].max():.2f}")
+    return insights
+
+
+def _array(values):
+    """Plain values of a trace attribute, decoding the typed-array form figures restored from JSON carry."""
+    if isinstance(values, dict) and "bdata" in values:
+        arr = np.frombuffer(base64.b64decode(values["bdata"]), dtype=values["dtype"])
+        shape = values.get("shape")
+        return arr.reshape([int(n) for n in str(shape).split(",")]) if shape else arr
+    return values
+
+
+def chart_values(chart_type: str, fig) -> Optional[Dict]:
+    """label -> value shown by a line / bar / pie / heatmap figure (None for raw-row charts)."""
+    trace = fig.data[0] if fig.data else None
+    if trace is None:
+        return {}
+    if chart_type == "line":
+        return {pd.Timestamp(k): float(v) for k, v in zip(_array(trace.x), _array(trace.y))}
+    if chart_type == "bar":
+        return {str(k): float(v) for k, v in zip(_array(trace.x), _array(trace.y))}
+    if chart_type == "pie":
+        return {str(k): float(v) for k, v in zip(_array(trace.labels), _array(trace.values))}
+    if chart_type == "heatmap":
+        z = _array(trace.z)
+        return {(str(r), str(c)): float(z[i][j]) for i, r in enumerate(_array(trace.y)) for j, c in enumerate(_array(trace.x))}
+    return None
+
+
+def assert_values_close(test, actual: Dict, expected: Dict, rel: float = 1e-9, msg: str = ""):
+    test.assertEqual(set(actual), set(expected), msg)
+    for k in expected:
+        test.assertTrue(np.isclose(actual[k], expected[k], rtol=rel, atol=1e-6),
+                        f"{msg} {k}: {actual[k]} != {expected[k]}")
+
+
+def assert_matches_baseline(test, result: Dict[str, Any], df: pd.DataFrame, template: Dict[str, Any],
+                            rel: float = 1e-9, insights: bool = True):
+    """A run_pipeline context shows the same KPIs, charts and insights as the baseline code on df."""
+    mapping = mapping_for(df, template)
+    kpis = [baseline_kpi(df, c, mapping) for c in components(template, "kpi")]
+    test.assertEqual(len(result["kpi_results"]), len(kpis))
+    for got, want in zip(result["kpi_results"], kpis):
+        test.assertTrue(np.isclose(got["value"], want, rtol=rel, atol=0.011), f"{got['title']}: {got['value']} != {want}")
+    charts = components(template, "chart")
+    test.assertEqual(len(result["chart_results"]), len(charts))
+    test.assertEqual(result["chart_errors"], {})
+    for comp, (chart_type, fig) in zip(charts, result["chart_results"]):
+        test.assertEqual(chart_type, comp["type"])
+        expected = baseline_chart(df, comp, mapping)
+        if expected is not None:
+            assert_values_close(test, chart_values(chart_type, fig), expected, rel, comp["id"])
+    if insights:
+        test.assertEqual(result["insight_results"], baseline_insights(df))
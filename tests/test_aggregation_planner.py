@@ -0,0 +1,67 @@
+import unittest
+
+import helpers as h
+from Dashboard.aggregation_planner import aggregation_key, execute_plan, plan_aggregations, resample_freq
+from Dashboard.dashboard_generator import generate_kpi
+from Data_loader.dtype_compaction import compact_dataframe
+from Pipeline.pipeline_executor import CHART_GENERATORS, run_pipeline
+from Schema_mapper.schema_mapper import infer_field_roles
+
+
+class AggregationPlannerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.df = h.transactions(5000)
+        cls.template = h.sample_template()
+        cls.mapping = h.mapping_for(cls.df, cls.template)
+        cls.plan = plan_aggregations(cls.template, cls.mapping)
+
+    def test_shared_aggregations_are_planned_once(self):
+        bar = next(c for c in self.template["layout"] if c["type"] == "bar")
+        twin = dict(bar, id="twin_pie", type="pie")  # same group and value field as the bar
+        plan = plan_aggregations({"layout": self.template["layout"] + [twin]}, self.mapping)
+        self.assertEqual(len(plan), len(self.plan))
+        self.assertEqual(plan[aggregation_key(bar, self.mapping)], [bar["id"], "twin_pie"])
+        keys = [aggregation_key(c, self.mapping) for c in self.template["layout"]]
+        self.assertEqual(set(self.plan), {k for k in keys if k is not None})
+
+    def test_period_end_aliases_use_the_current_pandas_spelling(self):
+        self.assertEqual([resample_freq(g) for g in (None, "M", "2M", "Q", "A", "W", "D")],
+                         ["ME", "ME", "2ME", "QE", "YE", "W", "D"])
+        line = next(c for c in self.template["layout"] if c["type"] == "line")
+        self.assertEqual(aggregation_key(line, self.mapping)[3], "ME")
+
+    def test_planned_components_match_the_original_generators(self):
+        for frame in (self.df, compact_dataframe(self.df, infer_field_roles(self.df))[0]):
+            aggregates = execute_plan(frame, list(self.plan))
+            for comp in h.components(self.template, "kpi"):
+                self.assertAlmostEqual(generate_kpi(frame, comp, self.mapping, aggregates)["value"],
+                                       h.baseline_kpi(self.df, comp, self.mapping), places=2)
+            for comp in h.components(self.template, "chart"):
+                expected = h.baseline_chart(self.df, comp, self.mapping)
+                if expected is None:
+                    continue
+                fig = CHART_GENERATORS[comp["type"]](frame, comp, self.mapping, aggregates)
+                h.assert_values_close(self, h.chart_values(comp["type"], fig), expected, msg=comp["id"])
+
+    def test_unplanned_components_aggregate_on_demand(self):
+        for comp in h.components(self.template, "chart"):
+            if aggregation_key(comp, self.mapping) is None:
+                continue
+            planned = CHART_GENERATORS[comp["type"]](self.df, comp, self.mapping, execute_plan(self.df, list(self.plan)))
+            on_demand = CHART_GENERATORS[comp["type"]](self.df, comp, self.mapping)
+            self.assertEqual(planned.to_json(), on_demand.to_json(), comp["id"])
+
+    def test_key_over_missing_column_fails_only_its_component(self):
+        broken = {"id": "broken", "type": "heatmap", "x_field": "nope", "y_field": "nope", "value_field": "amount"}
+        template = {"title": "broken", "layout": self.template["layout"] + [broken]}
+        plan = plan_aggregations(template, self.mapping)
+        self.assertNotIn(aggregation_key(broken, self.mapping), execute_plan(self.df, list(plan)))
+        result = run_pipeline(h.csv_upload(self.df), template, use_cache=False)
+        self.assertIsNone(result["error"])
+        self.assertEqual(list(result["chart_errors"]), ["broken"])
+        self.assertEqual(len(result["chart_results"]), len(h.components(self.template, "chart")) + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import helpers as h
+from Dashboard.aggregation_planner import execute_plan, plan_aggregations
+from Pipeline import approximate
+from Pipeline.approximate import estimate_plan, estimate_sample, should_approximate
+from Pipeline.pipeline_executor import run_pipeline
+
+
+class ApproximateTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.df = h.transactions(30000, seed=121)
+        cls.template = h.sample_template()
+        cls.mapping = h.mapping_for(cls.df, cls.template)
+        cls.keys = list(plan_aggregations(cls.template, cls.mapping))
+        cls.exact = execute_plan(cls.df, cls.keys)
+        cls.kpi_keys = [k for k in cls.keys if not k[2]]
+
+    def _coverage(self, estimate):
+        covered = total = 0
+        for seed in range(40):
+            with mock.patch.object(approximate, "_SEED", seed):
+                result = estimate()
+            for key in self.kpi_keys:
+                total += 1
+                covered += abs(result["aggregates"][key] - self.exact[key]) <= result["intervals"][key]
+        return covered / total
+
+    def test_stratified_intervals_cover_the_exact_kpis(self):
+        coverage = self._coverage(lambda: estimate_plan(self.df, self.keys, rows=3000))
+        self.assertGreaterEqual(coverage, 0.85)
+
+    def test_uniform_sample_intervals_cover_the_exact_kpis(self):
+        def estimate():
+            keep = np.random.default_rng(approximate._SEED + 1000).random(len(self.df)) < 0.1
+            return estimate_sample(self.df[keep], self.keys, len(self.df))
+        self.assertGreaterEqual(self._coverage(estimate), 0.85)
+
+    def test_every_charted_category_is_estimated(self):
+        result = estimate_plan(self.df, self.keys, rows=3000)
+        self.assertTrue(result["strata"])
+        for key in self.keys:
+            if key[2] and key[3] is None:
+                self.assertEqual(set(result["aggregates"][key].index), set(self.exact[key].index), key)
+                rel = (result["aggregates"][key] - self.exact[key]).abs() / self.exact[key].abs()
+                self.assertLess(rel.median(), 0.25, key)
+
+    def test_approximate_run_is_within_its_intervals(self):
+        with mock.patch.object(approximate, "APPROX_SAMPLE_ROWS", 5000):
+            result = run_pipeline({"type": "upload"}, self.template, df=self.df, approximate=True, use_cache=True)
+        self.assertEqual(result["estimates"]["population_rows"], len(self.df))
+        self.assertFalse(result["cache_hit"])
+        self.assertIsNone(result["state"])
+        for kpi, comp in zip(result["kpi_results"], self.template["kpis"]):
+            exact = h.baseline_kpi(self.df, comp, self.mapping)
+            self.assertLessEqual(abs(kpi["value"] - exact), kpi["ci"] + 0.01, kpi["title"])
+        exact_run = run_pipeline({"type": "upload"}, self.template, df=self.df, approximate=False, use_cache=False)
+        self.assertIsNone(exact_run["estimates"])
+        h.assert_matches_baseline(self, exact_run, self.df, self.template)
+
+    def test_should_approximate(self):
+        rows = approximate.APPROX_SAMPLE_ROWS
+        self.assertFalse(should_approximate(None))
+        self.assertFalse(should_approximate(rows, requested=True))
+        self.assertTrue(should_approximate(rows + 1, requested=True))
+        self.assertFalse(should_approximate(approximate.APPROX_MIN_ROWS, requested=False))
+        with mock.patch.object(approximate, "APPROXIMATE", "auto"):
+            self.assertTrue(should_approximate(approximate.APPROX_MIN_ROWS))
+            self.assertFalse(should_approximate(approximate.APPROX_MIN_ROWS - 1))
+        with mock.patch.object(approximate, "APPROXIMATE", "0"):
+            self.assertFalse(should_approximate(approximate.APPROX_MIN_ROWS))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import helpers as h
+from Data_loader import arrow_ingest
+from Data_loader.arrow_ingest import read_csv_arrow
+from Data_loader.source_loader import load_dataframe, sample_file_info
+
+
+def _is_date(name):
+    return "date" in name.lower()
+
+
+class ReadCsvArrowTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        df = h.transactions(3000, seed=99)
+        df["settled_on"] = df["transaction_date"].dt.strftime("%Y-%m-%d")  # ISO dates in a non-date column
+        df.loc[::7, "merchant"] = None
+        df.loc[::11, "amount"] = np.nan
+        cls.data = df.to_csv(index=False).encode("utf-8")
+        cls.path = os.path.join(tempfile.mkdtemp(), "transactions.csv")
+        with open(cls.path, "wb") as f:
+            f.write(cls.data)
+
+    def _baseline(self, columns=None):
+        return pd.read_csv(io.BytesIO(self.data), parse_dates=["transaction_date"], usecols=columns)
+
+    def test_matches_pandas_read_csv(self):
+        for source in (self.data, self.path):
+            got = read_csv_arrow(source, is_date_column=_is_date)
+            pd.testing.assert_frame_equal(got, self._baseline(), check_dtype=False)
+            self.assertEqual(got["settled_on"].dtype, object)
+            self.assertTrue(pd.api.types.is_datetime64_any_dtype(got["transaction_date"]))
+
+    def test_file_is_parsed_once(self):
+        import pyarrow.csv as pv
+        with mock.patch.object(pv, "read_csv", wraps=pv.read_csv) as read_csv:
+            got = read_csv_arrow(self.path, is_date_column=_is_date)
+        self.assertEqual(read_csv.call_count, 1)
+        self.assertEqual(got["settled_on"].tolist(), self._baseline()["settled_on"].tolist())
+
+    def test_sample_dataset_dates_are_parsed_natively(self):
+        import pyarrow.csv as pv
+        root = tempfile.mkdtemp()
+        os.mkdir(os.path.join(root, "Data"))
+        with open(os.path.join(root, "Data", "bank_transactions.csv"), "wb") as f:
+            f.write(self.data)
+        with mock.patch.object(pv, "read_csv", wraps=pv.read_csv) as read_csv:
+            got = load_dataframe(sample_file_info(root))
+        self.assertEqual(read_csv.call_count, 1)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(got["transaction_date"]))
+
+    def test_projected_columns_keep_file_order(self):
+        columns = ["amount", "transaction_date", "merchant"]
+        got = read_csv_arrow(self.data, columns, is_date_column=_is_date)
+        self.assertEqual(list(got.columns), ["transaction_date", "amount", "merchant"])
+        pd.testing.assert_frame_equal(got, self._baseline(columns), check_dtype=False)
+
+    def test_unparseable_dates_stay_text(self):
+        data = b"id,ship_date\n1,2024-01-05\n2,not a date\n"
+        got = read_csv_arrow(data, is_date_column=_is_date)
+        self.assertEqual(got["ship_date"].tolist(), ["2024-01-05", "not a date"])
+
+    def test_pandas_engine_opts_out(self):
+        with mock.patch.object(arrow_ingest, "CSV_ENGINE", "pandas"):
+            self.assertIsNone(read_csv_arrow(self.data))
+
+
+if __name__ == "__main__":
+    unittest.main()
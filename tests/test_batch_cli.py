@@ -0,0 +1,70 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import helpers as h
+from Dashboard import execution_backend
+from Data_loader import chunked_ingest
+from Pipeline.batch_cli import render_dataset, run_batch
+
+
+class BatchCliTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        cls.frames = [h.transactions(1500, seed=21), h.transactions(1500, seed=22)]
+        cls.paths = []
+        for i, df in enumerate(cls.frames):
+            folder = os.path.join(cls.tmp, f"extract{i}")
+            os.makedirs(folder)
+            cls.paths.append(os.path.join(folder, "transactions.csv"))
+            df.to_csv(cls.paths[-1], index=False)
+        cls.template = h.sample_template()
+
+    def test_same_named_inputs_get_their_own_output(self):
+        out = os.path.join(self.tmp, "out")
+        summary = run_batch(self.paths, [h.TEMPLATE_PATH], out, workers=2, write_html=False, use_cache=False)
+        self.assertEqual((summary["succeeded"], summary["failed"]), (2, 0))
+        by_dataset = {r["dataset"]: r["output"] for r in summary["results"]}
+        self.assertEqual(len(set(by_dataset.values())), 2)
+        for path, df in zip(self.paths, self.frames):
+            with open(os.path.join(by_dataset[path], "kpis.json"), encoding="utf-8") as f:
+                kpis = json.load(f)
+            mapping = h.mapping_for(df, self.template)
+            for got, comp in zip(kpis, self.template["kpis"]):
+                self.assertAlmostEqual(got["value"], h.baseline_kpi(df, comp, mapping), places=2)
+            with open(os.path.join(by_dataset[path], "insights.json"), encoding="utf-8") as f:
+                self.assertEqual(json.load(f), h.baseline_insights(df))
+            self.assertEqual(len(os.listdir(os.path.join(by_dataset[path], "charts"))), len(self.template["charts"]))
+
+    def test_sampled_ingest_reports_the_file_rows(self):
+        path = os.path.join(self.tmp, "sampled.csv")
+        h.transactions(20000, seed=23).to_csv(path, index=False)
+        with mock.patch.object(chunked_ingest, "INGEST_MODE", "chunked"), \
+                mock.patch.object(chunked_ingest, "CSV_CHUNK_ROWS", 2000), \
+                mock.patch.object(chunked_ingest, "INGEST_BUDGET_BYTES", 200000), \
+                mock.patch.object(chunked_ingest, "INGEST_OVER_BUDGET", "sample"), \
+                mock.patch.object(execution_backend, "EXECUTION_BACKEND", "pandas"):
+            summary = render_dataset(path, h.TEMPLATE_PATH, self.tmp, write_html=False, use_cache=False)
+        self.assertIsNone(summary["error"])
+        self.assertEqual(summary["rows"], 20000)
+        self.assertTrue(summary["approximate"])
+
+    def test_failure_is_reported_not_raised(self):
+        summary = render_dataset(os.path.join(self.tmp, "missing.csv"), h.TEMPLATE_PATH, self.tmp, write_html=False)
+        self.assertTrue(summary["error"].startswith("FileNotFoundError"))
+
+    def test_streamlit_is_never_imported(self):
+        code = ("import sys; from Pipeline.batch_cli import render_dataset; "
+                f"r = render_dataset({self.paths[0]!r}, {h.TEMPLATE_PATH!r}, {self.tmp!r}, False, False); "
+                "assert r['error'] is None, r['error']; print('streamlit' in sys.modules)")
+        out = subprocess.run([sys.executable, "-c", code], cwd=h.ROOT, capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.strip(), "False")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+import helpers as h
+from Pipeline.pipeline_executor import CHART_GENERATORS, run_components, run_pipeline
+
+
+class RunComponentsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.df = h.transactions(3000)
+        cls.template = h.sample_template()
+        cls.mapping = h.mapping_for(cls.df, cls.template)
+        cls.charts = [c for c in h.components(cls.template, "chart") if c.get("type") in CHART_GENERATORS]
+
+    def test_thread_pool_keeps_template_order_and_figures(self):
+        sequential, seq_errors = run_components(self.df, self.charts, self.mapping, max_workers=1)
+        pooled, pool_errors = run_components(self.df, self.charts, self.mapping, max_workers=4)
+        self.assertEqual(seq_errors, {})
+        self.assertEqual(pool_errors, {})
+        self.assertEqual([t for t, _ in pooled], [c["type"] for c in self.charts])
+        for (_, a), (_, b) in zip(sequential, pooled):
+            self.assertEqual(a.to_json(), b.to_json())
+
+    def test_failing_chart_does_not_abort_siblings(self):
+        broken = {"id": "broken_heatmap", "type": "heatmap", "x_field": "nope", "y_field": "nope", "value_field": "amount"}
+        comps = [self.charts[0], broken, self.charts[2]]
+        done = []
+        results, errors = run_components(self.df, comps, self.mapping, max_workers=3,
+                                         on_done=lambda i, comp: done.append(i))
+        self.assertEqual(sorted(done), [0, 1, 2])
+        self.assertEqual(list(errors), ["broken_heatmap"])
+        self.assertEqual(len(results), 3)
+        self.assertEqual(h.chart_values("line", results[0][1]),
+                         h.baseline_chart(self.df, self.charts[0], self.mapping))
+
+    def test_worker_count_does_not_change_the_dashboard(self):
+        one = run_pipeline(h.csv_upload(self.df), self.template, chart_workers=1, use_cache=False)
+        four = run_pipeline(h.csv_upload(self.df), self.template, chart_workers=4, use_cache=False)
+        self.assertEqual([f.to_json() for _, f in one["chart_results"]],
+                         [f.to_json() for _, f in four["chart_results"]])
+        h.assert_matches_baseline(self, four, self.df, self.template)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import io
+import re
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+import helpers as h
+from Dashboard import execution_backend
+from Data_loader import chunked_ingest
+from Data_loader.chunked_ingest import IngestBudgetExceeded, read_csv_chunked
+from Pipeline.pipeline_executor import run_pipeline
+
+
+def _ingest(**overrides):
+    """Patch the chunked reader's settings (and keep the run in memory) for a pipeline run."""
+    settings = {"INGEST_MODE": "chunked", "CSV_CHUNK_ROWS": 2000}
+    settings.update(overrides)
+    patches = [mock.patch.object(chunked_ingest, k, v) for k, v in settings.items()]
+    patches.append(mock.patch.object(execution_backend, "EXECUTION_BACKEND", "pandas"))
+    return patches
+
+
+class ChunkedIngestTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.df = h.transactions(12000, seed=111)
+        cls.data = cls.df.to_csv(index=False).encode("utf-8")
+        cls.template = h.sample_template()
+
+    def _run(self, df, **overrides):
+        patches = _ingest(**overrides)
+        for p in patches:
+            p.start()
+        try:
+            return run_pipeline(h.csv_upload(df), self.template, use_cache=False, incremental=False)
+        finally:
+            for p in patches:
+                p.stop()
+
+    def test_chunked_read_equals_a_whole_read(self):
+        progress, report = [], {}
+        got = read_csv_chunked(io.BytesIO(self.data), date_columns=["transaction_date"], chunk_rows=2500,
+                               budget_bytes=1 << 40, on_progress=lambda *a: progress.append(a), report=report)
+        baseline = pd.read_csv(io.BytesIO(self.data), parse_dates=["transaction_date"])
+        self.assertEqual(list(got.columns), list(baseline.columns))
+        for col in baseline.columns:
+            self.assertEqual(got[col].astype(object).tolist(), baseline[col].astype(object).tolist(), col)
+        self.assertEqual([p[0] for p in progress], [2500, 5000, 7500, 10000, 12000])
+        self.assertEqual(progress[-1][1], len(self.data))
+        self.assertEqual((report["rows_read"], report["rows_kept"], report["sample_fraction"]), (12000, 12000, 1.0))
+
+    def test_chunked_run_matches_baseline(self):
+        result = self._run(self.df)
+        self.assertIsNone(result["error"])
+        self.assertEqual(result["ingest"]["rows_read"], len(self.df))
+        h.assert_matches_baseline(self, result, self.df, self.template)
+
+    def test_over_budget_file_is_refused(self):
+        with self.assertRaises(IngestBudgetExceeded):
+            read_csv_chunked(io.BytesIO(self.data), chunk_rows=2000, budget_bytes=10000, over_budget="refuse")
+        df = h.transactions(12000, seed=112)
+        result = self._run(df, INGEST_BUDGET_BYTES=10000, INGEST_OVER_BUDGET="refuse")
+        self.assertIn("ingest budget", result["error"])
+        self.assertEqual(result["kpi_results"], [])
+
+    def test_sampled_file_is_scaled_within_its_intervals(self):
+        df = h.transactions(40000, seed=113)
+        full = {}
+        read_csv_chunked(io.BytesIO(df.to_csv(index=False).encode("utf-8")), chunk_rows=2000, budget_bytes=1 << 40,
+                         report=full)
+        budget = full["projected_bytes"] // 8
+        result = self._run(df, INGEST_BUDGET_BYTES=budget, INGEST_OVER_BUDGET="sample")
+        self.assertIsNone(result["error"])
+        ingest, estimates = result["ingest"], result["estimates"]
+        self.assertLess(ingest["sample_fraction"], 0.5)
+        self.assertEqual(ingest["rows_read"], len(df))
+        self.assertEqual((estimates["method"], estimates["population_rows"]), ("ingest", len(df)))
+        self.assertFalse(result["cache_hit"])
+        mapping = h.mapping_for(df, self.template)
+        for kpi, comp in zip(result["kpi_results"], self.template["kpis"]):
+            exact = h.baseline_kpi(df, comp, mapping)
+            self.assertLessEqual(abs(kpi["value"] - exact), kpi["ci"] + 0.01, kpi["title"])
+        amount = next(i for i in result["insight_results"] if i.startswith("amount:"))
+        estimate, half = map(float, re.match(r"amount: sum≈(\S+) ± (\S+),", amount).groups())
+        self.assertLessEqual(abs(estimate - df["amount"].sum()), half)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+import pandas as pd
+
+import helpers as h
+from Data_loader.data_loader import read_sql_table
+
+
+class ReadSqlTableTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.df = h.transactions(2500, seed=61)
+        cls.conn = h.sqlite_table(cls.df)
+
+    def _baseline(self, columns=None):
+        import sqlalchemy as sa
+        engine = sa.create_engine(self.conn)
+        try:
+            return pd.read_sql(f"SELECT {', '.join(columns) if columns else '*'} FROM transactions", engine)
+        finally:
+            engine.dispose()
+
+    def assert_same_values(self, got, want):
+        self.assertEqual(list(got.columns), list(want.columns))
+        self.assertEqual(len(got), len(want))
+        for col in want.columns:
+            if pd.api.types.is_numeric_dtype(want[col]):
+                same = (got[col].astype("float64") - want[col].astype("float64")).abs() < 1e-9
+            elif pd.api.types.is_datetime64_any_dtype(got[col]):
+                same = got[col] == pd.to_datetime(want[col])
+            else:
+                same = got[col].astype(str) == want[col].astype(str)
+            self.assertTrue(same.all(), col)
+
+    def test_chunked_read_matches_read_sql(self):
+        progress = []
+        got = read_sql_table(self.conn, "transactions", chunk_rows=700, max_rows=0, on_progress=progress.append)
+        self.assert_same_values(got, self._baseline())
+        self.assertEqual(progress, [700, 1400, 2100, 2500])
+
+    def test_chunk_size_does_not_change_dtypes(self):
+        whole = read_sql_table(self.conn, "transactions", chunk_rows=10000, max_rows=0)
+        chunked = read_sql_table(self.conn, "transactions", chunk_rows=300, max_rows=0)
+        self.assertEqual(whole.dtypes.tolist(), chunked.dtypes.tolist())
+        self.assert_same_values(chunked, whole)
+
+    def test_columns_and_row_limit(self):
+        got = read_sql_table(self.conn, "transactions", chunk_rows=400, max_rows=1000, columns=["merchant", "amount"])
+        self.assert_same_values(got, self._baseline(["merchant", "amount"]).head(1000))
+
+
+if __name__ == "__main__":
+    unittest.main()
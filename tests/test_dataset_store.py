@@ -0,0 +1,117 @@
+import gc
+import threading
+import time
+import unittest
+from unittest import mock
+
+import helpers as h
+from Cache.dataset_store import DatasetStore
+from Data_loader.dtype_compaction import estimate_frame_bytes
+from Data_loader.source_loader import with_fingerprint
+from Pipeline.job_queue import ACTIVE, DONE, get_job_queue
+from Pipeline.pipeline_executor import acquire_result_frame, submit_run
+
+
+def _wait(job_id, timeout=60.0):
+    queue = get_job_queue()
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = queue.status(job_id)
+        if status["status"] not in ACTIVE:
+            return status
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} still active after {timeout} s")
+
+
+class DatasetStoreTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.df = h.transactions(1000, seed=41)
+        cls.frame_bytes = estimate_frame_bytes(cls.df)
+
+    def test_handles_count_references(self):
+        store = DatasetStore()
+        first = store.put("a", self.df)
+        second = store.acquire("a")
+        self.assertIs(second.df, first.df)
+        self.assertEqual(store.stats()["references"], {"a": 2})
+        first.release()
+        first.release()
+        self.assertTrue(first.released)
+        self.assertIsNone(first.df)
+        del second
+        gc.collect()
+        self.assertEqual(store.stats()["references"], {"a": 0})
+        self.assertIsNone(store.acquire("missing"))
+
+    def test_only_unreferenced_entries_are_evicted_oldest_first(self):
+        store = DatasetStore(max_bytes=int(self.frame_bytes * 3.5))
+        store.put("old", self.df.copy()).release()
+        store.put("recent", self.df.copy()).release()
+        held = store.put("held", self.df.copy())
+        self.assertEqual(store.stats()["entries"], 3)
+        store.acquire("recent").release()
+        store.put("new", self.df.copy()).release()
+        self.assertIsNone(store.acquire("old"))
+        self.assertIsNotNone(store.acquire("recent"))
+        self.assertIsNotNone(store.acquire("held"))
+        self.assertIs(held.df, store.acquire("held").df)
+
+    def test_concurrent_get_or_load_loads_once(self):
+        store, calls = DatasetStore(), []
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.05)
+            return self.df
+
+        handles = []
+        threads = [threading.Thread(target=lambda: handles.append(store.get_or_load("k", loader))) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(hd.df is self.df for hd in handles))
+        self.assertEqual(store.stats()["references"], {"k": 4})
+
+
+class SubmitRunTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.df = h.transactions(2000, seed=42)
+        cls.template = h.sample_template()
+
+    def test_job_result_is_slim_and_matches_baseline(self):
+        file_info = with_fingerprint(h.csv_upload(self.df))
+        status = _wait(submit_run(file_info, self.template))
+        self.assertEqual(status["status"], DONE)
+        result = status["result"]
+        self.assertNotIn("df", result)
+        self.assertNotIn("previous", result)
+        self.assertEqual(result["rows"], len(self.df))
+        h.assert_matches_baseline(self, result, self.df, self.template)
+        handle = acquire_result_frame(file_info, result)
+        self.assertEqual(len(handle.df), len(self.df))
+        handle.release()
+
+    def test_result_frame_is_reloaded_after_eviction(self):
+        file_info = with_fingerprint(h.csv_upload(self.df, name="evicted.csv"))
+        result = _wait(submit_run(file_info, self.template))["result"]
+        with mock.patch("Pipeline.pipeline_executor.get_dataset_store", return_value=DatasetStore()):
+            handle = acquire_result_frame(file_info, result)
+        self.assertEqual(len(handle.df), len(self.df))
+        self.assertAlmostEqual(float(handle.df["amount"].sum()), float(self.df["amount"].sum()), places=2)
+        self.assertEqual(list(handle.df.columns), result["columns"] or list(self.df.columns))
+
+    def test_previous_state_gets_its_own_job(self):
+        file_info = with_fingerprint(h.csv_upload(self.df, name="previous.csv"))
+        first = _wait(submit_run(file_info, self.template))
+        self.assertEqual(submit_run(file_info, self.template), first["id"])
+        rerun = submit_run(file_info, self.template, previous=first["result"]["state"])
+        self.assertNotEqual(rerun, first["id"])
+        h.assert_matches_baseline(self, _wait(rerun)["result"], self.df, self.template)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+
+import helpers as h
+from Dashboard.aggregation_planner import execute_plan, plan_aggregations
+from Pipeline.dependency_graph import (
+    INSIGHTS_NODE, build_dependency_graph, column_fingerprints, incremental_aggregates,
+)
+from Pipeline.pipeline_executor import run_pipeline
+
+
+def _run(df, template, previous=None):
+    return run_pipeline(h.csv_upload(df), template, use_cache=False, previous=previous)
+
+
+class IncrementalRecomputeTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.df = h.transactions(4000, seed=11)
+        cls.template = h.sample_template()
+
+    def test_unchanged_rerun_reuses_every_component(self):
+        first = _run(self.df, self.template)
+        second = _run(self.df, self.template, previous=first["state"])
+        self.assertEqual(second["dirty"], set())
+        self.assertEqual(first["kpi_results"], second["kpi_results"])
+        self.assertEqual([f.to_json() for _, f in first["chart_results"]],
+                         [f.to_json() for _, f in second["chart_results"]])
+        h.assert_matches_baseline(self, second, self.df, self.template)
+
+    def test_changed_column_recomputes_only_its_components(self):
+        first = _run(self.df, self.template)
+        changed = self.df.copy()
+        changed["fraud_flag"] = 1 - changed["fraud_flag"]
+        second = _run(changed, self.template, previous=first["state"])
+        self.assertEqual(second["dirty"], {"kpi_fraud_count", "chart_scatter_age_amount", INSIGHTS_NODE})
+        h.assert_matches_baseline(self, second, changed, self.template)
+
+    def test_appended_rows_match_a_fresh_run(self):
+        first = _run(self.df.iloc[:3000].reset_index(drop=True), self.template)
+        second = _run(self.df, self.template, previous=first["state"])
+        fresh = run_pipeline(h.csv_upload(self.df), self.template, use_cache=False, incremental=False)
+        self.assertEqual([k["value"] for k in second["kpi_results"]], [k["value"] for k in fresh["kpi_results"]])
+        h.assert_matches_baseline(self, second, self.df, self.template)
+
+    def test_sum_aggregates_update_from_appended_rows(self):
+        mapping = h.mapping_for(self.df, self.template)
+        keys = list(plan_aggregations(self.template, mapping))
+        graph = build_dependency_graph(self.template, mapping, self.df)
+        head = self.df.iloc[:3000]
+        old_fps, _ = column_fingerprints(head, graph)
+        previous = {"rows": len(head), "columns": old_fps, "aggregates": execute_plan(head, keys)}
+        fps, appended = column_fingerprints(self.df, graph, previous)
+        self.assertEqual(appended, set(fps))
+        aggregates, counts = incremental_aggregates(self.df, keys, fps, appended, previous)
+        additive = [k for k in keys if k[0] in ("sum", "abs_sum")]
+        self.assertEqual(counts, {"reused": 0, "appended": len(additive), "computed": len(keys) - len(additive)})
+        expected = execute_plan(self.df, keys)
+        for key in keys:
+            got, want = aggregates[key], expected[key]
+            if hasattr(want, "index"):
+                h.assert_values_close(self, got.to_dict(), want.to_dict(), msg=str(key))
+            else:
+                self.assertAlmostEqual(got, want, places=6, msg=str(key))
+
+
+if __name__ == "__main__":
+    unittest.main()
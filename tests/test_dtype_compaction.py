@@ -0,0 +1,61 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import helpers as h
+from Data_loader.dtype_compaction import compact_dataframe, compact_like, concat_chunks, estimate_frame_bytes
+from Schema_mapper.schema_mapper import infer_field_roles
+
+
+def _as_text_dates(df):
+    out = df.copy()
+    out["transaction_date"] = out["transaction_date"].dt.strftime("%Y-%m-%d")
+    return out
+
+
+class DtypeCompactionTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.df = _as_text_dates(h.transactions(4000, seed=91))
+
+    def assert_same_values(self, got, want):
+        self.assertEqual(list(got.columns), list(want.columns))
+        for col in want.columns:
+            if col == "transaction_date":
+                self.assertTrue((got[col] == pd.to_datetime(want[col])).all(), col)
+            elif pd.api.types.is_numeric_dtype(want[col]):
+                self.assertTrue(np.array_equal(got[col].to_numpy("int64" if want[col].dtype.kind == "i" else "float64"),
+                                               want[col].to_numpy()), col)
+            else:
+                self.assertEqual(got[col].astype(object).tolist(), want[col].tolist(), col)
+
+    def test_compaction_keeps_every_value_and_saves_memory(self):
+        roles = infer_field_roles(self.df)
+        compact, report = compact_dataframe(self.df, roles)
+        self.assert_same_values(compact, self.df)
+        self.assertEqual(roles["transaction_date"], "datetime")
+        self.assertEqual(compact["merchant"].dtype, "category")
+        self.assertEqual(compact["customer_age"].dtype, np.int8)
+        self.assertEqual(compact["amount"].dtype, np.float64)
+        self.assertLess(report["after_bytes"], report["before_bytes"])
+        self.assertEqual(report["after_bytes"], estimate_frame_bytes(compact))
+
+    def test_chunks_compacted_alike_concat_to_the_whole_frame(self):
+        chunks = [self.df.iloc[i:i + 900] for i in range(0, len(self.df), 900)]
+        first, _ = compact_dataframe(chunks[0], infer_field_roles(chunks[0]))
+        pieces = [first] + [compact_like(c, first.dtypes) for c in chunks[1:]]
+        joined = concat_chunks(pieces)
+        self.assert_same_values(joined, self.df.reset_index(drop=True))
+        self.assertEqual(joined["merchant"].dtype, "category")
+
+    def test_sums_over_compacted_columns_do_not_overflow(self):
+        df = pd.DataFrame({"qty": np.full(100000, 120, dtype="int64"), "kind": ["a", "b"] * 50000})
+        compact, _ = compact_dataframe(df, infer_field_roles(df))
+        self.assertEqual(compact["qty"].dtype, np.int8)
+        self.assertEqual(int(compact["qty"].sum()), 120 * 100000)
+        self.assertEqual(int(compact["qty"].abs().sum()), 120 * 100000)
+
+
+if __name__ == "__main__":
+    unittest.main()
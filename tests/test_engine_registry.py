@@ -0,0 +1,60 @@
+import time
+import unittest
+
+import helpers as h
+from Data_loader.data_loader import read_sql_table
+from Data_loader.engine_registry import EngineRegistry, normalize_conn_str
+
+
+class EngineRegistryTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.conn = h.sqlite_table(h.transactions(500, seed=81))
+
+    def test_equivalent_connection_strings_share_an_engine(self):
+        self.assertEqual(normalize_conn_str("postgresql://u:p@db/x?b=2&a=1 "),
+                         normalize_conn_str("postgresql://u:p@db/x?a=1&b=2"))
+        registry = EngineRegistry()
+        self.assertIs(registry.get_engine(self.conn), registry.get_engine(f" {self.conn}"))
+        self.assertEqual(registry.stats()["engines"], 1)
+
+    def test_connections_are_counted(self):
+        registry = EngineRegistry()
+        for _ in range(3):
+            with registry.connect(self.conn) as conn:
+                conn.exec_driver_sql("SELECT 1")
+        stats = registry.stats()
+        self.assertEqual(stats["by_url"][self.conn]["checkouts"], 3)
+        self.assertEqual(stats["by_url"][self.conn]["in_use"], 0)
+        self.assertEqual(stats["by_url"][self.conn]["connects"], 1)
+
+    def test_idle_engines_are_disposed(self):
+        registry = EngineRegistry(idle_seconds=0.05)
+        engine = registry.get_engine(self.conn)
+        with registry.connect(self.conn):
+            self.assertEqual(registry.evict_idle(), 0)  # in use
+        time.sleep(0.1)
+        self.assertEqual(registry.evict_idle(), 1)
+        self.assertIsNot(registry.get_engine(self.conn), engine)
+
+    def test_engine_being_checked_out_is_not_evicted(self):
+        registry = EngineRegistry(idle_seconds=0)
+        # connect() counts the connection under the lock that found the entry, leaving evict_idle no gap
+        entry = registry._entry(normalize_conn_str(self.conn), checkout=True)
+        self.assertEqual(registry.evict_idle(), 0)
+        self.assertEqual(entry["active"], 1)
+        with registry.connect(self.conn) as conn:
+            conn.exec_driver_sql("SELECT 1")
+        self.assertEqual(registry.stats()["by_url"][self.conn]["in_use"], 1)
+
+    def test_repeated_loads_reuse_the_shared_engine(self):
+        from Data_loader.engine_registry import get_engine_registry
+        first = read_sql_table(self.conn, "transactions", max_rows=0)
+        engine = get_engine_registry().get_engine(self.conn)
+        second = read_sql_table(self.conn, "transactions", max_rows=0)
+        self.assertIs(get_engine_registry().get_engine(self.conn), engine)
+        self.assertTrue(first.equals(second))
+
+
+if __name__ == "__main__":
+    unittest.main()
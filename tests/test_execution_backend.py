@@ -0,0 +1,91 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import helpers as h
+from Dashboard import execution_backend
+from Dashboard.aggregation_planner import execute_plan, plan_aggregations
+from Dashboard.execution_backend import choose_backend, open_backend
+from Data_loader.source_loader import source_fingerprint
+from Insight.insight_engine import compute_correlations, detect_anomalies_zscore
+from Pipeline.pipeline_executor import run_pipeline
+
+
+class DuckDBBackendTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.df = h.transactions(6000, seed=131)
+        cls.template = h.sample_template()
+        cls.mapping = h.mapping_for(cls.df, cls.template)
+        cls.keys = list(plan_aggregations(cls.template, cls.mapping))
+        file_info = h.csv_upload(cls.df, name="backend.csv")
+        cls.backend = open_backend(file_info, source_fingerprint(file_info))
+
+    def test_plan_matches_pandas(self):
+        hourly = ("sum", "amount", ("transaction_date",), "h")
+        results, unsupported = self.backend.execute_plan(self.keys + [hourly])
+        self.assertEqual(unsupported, [hourly])
+        results.update(self.backend.execute_plan_columns(unsupported))
+        expected = execute_plan(self.df, self.keys + [hourly])
+        for key, want in expected.items():
+            if isinstance(want, pd.Series):
+                h.assert_values_close(self, {str(k): v for k, v in results[key].items()},
+                                      {str(k): v for k, v in want.items()}, msg=str(key))
+            else:
+                self.assertAlmostEqual(results[key], want, places=6, msg=str(key))
+
+    def test_numeric_summary_matches_the_insight_engine(self):
+        numeric = self.df.select_dtypes("number").columns.tolist()
+        self.assertEqual(self.backend.numeric_summary(numeric), h.baseline_insights(self.df))
+
+    def test_sample_spans_the_whole_file(self):
+        sample = self.backend.sample(100)
+        self.assertEqual(len(sample), 100)
+        self.assertGreater(sample["transaction_id"].max(), 1000)
+        pd.testing.assert_frame_equal(sample, self.backend.sample(100))
+
+    def test_histogram_bins_every_row(self):
+        binned = self.backend.histogram("amount", 30)
+        self.assertEqual(binned["count"].sum(), self.df["amount"].notna().sum())
+        counts, edges = np.histogram(self.df["amount"].dropna(), bins=30)
+        self.assertEqual(binned.set_index("bin")["count"].reindex(range(30), fill_value=0).tolist(), counts.tolist())
+        np.testing.assert_allclose(binned["bin_start"], edges[binned["bin"]])
+        by_color = self.backend.histogram("amount", 10, "fraud_flag")
+        self.assertEqual(by_color.groupby("fraud_flag")["count"].sum().to_dict(),
+                         self.df.groupby("fraud_flag")["amount"].count().to_dict())
+
+    def test_statistics_match_the_insight_engine(self):
+        numeric = self.df.select_dtypes("number").columns.tolist()
+        want = compute_correlations(self.df, min_corr=0.1)
+        got = self.backend.correlations(numeric, min_corr=0.1)
+        self.assertEqual([p[:2] for p in got], [p[:2] for p in want])
+        np.testing.assert_allclose([p[2] for p in got], [p[2] for p in want])
+        anomalies = self.backend.anomalies_zscore(numeric)
+        for col in numeric:
+            self.assertEqual(anomalies.get(col, 0), len(detect_anomalies_zscore(self.df, col)), col)
+        self.assertEqual(self.backend.insights(numeric)[:len(numeric)], h.baseline_insights(self.df))
+
+    def test_large_sources_are_sent_out_of_core(self):
+        sample = self.df.head(1000)
+        self.assertEqual(choose_backend(sample, len(self.df), budget=1 << 40), "pandas")
+        self.assertEqual(choose_backend(sample, len(self.df), budget=1024), "duckdb")
+        with mock.patch.object(execution_backend, "EXECUTION_BACKEND", "pandas"):
+            self.assertEqual(choose_backend(sample, len(self.df), budget=1024), "pandas")
+
+    def test_forced_backend_run_matches_baseline(self):
+        with mock.patch.object(execution_backend, "EXECUTION_BACKEND", "duckdb"):
+            result = run_pipeline(h.csv_upload(self.df, name="forced.csv"), self.template, use_cache=False,
+                                  incremental=False)
+        self.assertIsNone(result["error"])
+        self.assertIsNotNone(result["backend"])
+        h.assert_matches_baseline(self, result, self.df, self.template, insights=False)
+        numeric = self.df.select_dtypes("number").columns.tolist()
+        self.assertEqual(result["insight_results"], self.backend.insights(numeric))
+        figures = dict(result["chart_results"])
+        self.assertEqual(sum(sum(t.y) for t in figures["histogram"].data), len(self.df))
+
+
+if __name__ == "__main__":
+    unittest.main()
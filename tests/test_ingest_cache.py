@@ -0,0 +1,59 @@
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+import helpers as h
+from Cache import ingest_cache
+from Data_loader import source_loader
+from Data_loader.source_loader import load_dataframe, load_sample, source_fingerprint, with_fingerprint
+
+
+class IngestCacheTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.df = h.transactions(3000, seed=95)
+
+    def _baseline(self, file_info):
+        uploaded = file_info["uploaded"]
+        uploaded.seek(0)
+        return pd.read_csv(uploaded, parse_dates=["transaction_date"])
+
+    def test_cached_copy_equals_a_fresh_parse(self):
+        file_info = h.csv_upload(self.df, name="cached.csv")
+        parsed = load_dataframe(file_info)
+        with mock.patch.object(source_loader, "_parse_file", side_effect=AssertionError("parsed again")):
+            cached = load_dataframe(h.csv_upload(self.df, name="cached.csv"))
+            projected = load_dataframe(file_info, columns=["merchant", "amount"])
+            head = load_sample(file_info, 100)
+        pd.testing.assert_frame_equal(cached, parsed)
+        pd.testing.assert_frame_equal(projected, parsed[["merchant", "amount"]])
+        pd.testing.assert_frame_equal(head, parsed.head(100))
+        baseline = self._baseline(file_info)
+        for col in baseline.columns:
+            self.assertEqual(cached[col].astype(object).tolist(), baseline[col].astype(object).tolist(), col)
+
+    def test_changed_upload_misses(self):
+        load_dataframe(h.csv_upload(self.df, name="changed.csv"))
+        changed = self.df.copy()
+        changed.loc[0, "amount"] = 123456.0
+        reloaded = load_dataframe(h.csv_upload(changed, name="changed.csv"))
+        self.assertEqual(reloaded.loc[0, "amount"], 123456.0)
+
+    def test_disabled_cache_is_always_a_miss(self):
+        file_info = h.csv_upload(self.df, name="disabled.csv")
+        with mock.patch.object(ingest_cache, "INGEST_CACHE_ENABLED", False):
+            load_dataframe(file_info)
+            self.assertIsNone(ingest_cache.get_frame(ingest_cache.ingest_key(source_fingerprint(file_info))))
+
+    def test_carried_fingerprint_skips_rehashing(self):
+        file_info = h.csv_upload(self.df, name="carried.csv")
+        carried = with_fingerprint(file_info)
+        self.assertEqual(carried["fingerprint"], source_fingerprint(file_info))
+        self.assertIs(with_fingerprint(carried), carried)
+        with mock.patch.object(source_loader, "_upload_bytes", side_effect=AssertionError("hashed again")):
+            self.assertEqual(source_fingerprint(carried), carried["fingerprint"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+import helpers as h
+from Pipeline import job_queue
+from Pipeline.job_queue import ACTIVE, CANCELLED, DONE, FAILED, QUEUED, JobCancelled, JobQueue
+from Pipeline.pipeline_executor import run_pipeline
+
+
+def _wait(queue, job_id, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = queue.status(job_id)
+        if status is None or status["status"] not in ACTIVE:
+            return status
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} still active after {timeout} s")
+
+
+def _blocking(release, started=None):
+    def fn(report, should_cancel):
+        if started is not None:
+            started.set()
+        release.wait(10)
+        return "released"
+    return fn
+
+
+class JobQueueTest(unittest.TestCase):
+    def test_job_result_and_progress(self):
+        queue = JobQueue(workers=1)
+
+        def fn(report, should_cancel):
+            report({"stage": "load", "status": "finished"})
+            return 42
+
+        status = _wait(queue, queue.submit(fn))
+        self.assertEqual((status["status"], status["result"], status["error"]), (DONE, 42, None))
+        self.assertEqual(status["progress"], {"stage": "load", "status": "finished"})
+
+    def test_identical_submissions_share_one_job(self):
+        queue = JobQueue(workers=2)
+        release, calls = threading.Event(), []
+
+        def fn(report, should_cancel):
+            calls.append(1)
+            release.wait(10)
+            return "shared"
+
+        first = queue.submit(fn, dedupe_key="k", owner="a")
+        second = queue.submit(fn, dedupe_key="k", owner="b")
+        release.set()
+        self.assertEqual(first, second)
+        self.assertEqual(_wait(queue, first)["result"], "shared")
+        self.assertEqual(queue.submit(fn, dedupe_key="k"), first)  # finished results are shared too
+        self.assertEqual(len(calls), 1)
+
+    def test_cancelling_a_queued_job_never_runs_it(self):
+        queue = JobQueue(workers=1)
+        release, started, calls = threading.Event(), threading.Event(), []
+        blocker = queue.submit(_blocking(release, started))
+        started.wait(10)
+        queued = queue.submit(lambda report, should_cancel: calls.append(1))
+        self.assertEqual(queue.status(queued)["status"], QUEUED)
+        self.assertEqual(queue.status(queued)["position"], 1)
+        self.assertTrue(queue.cancel(queued))
+        release.set()
+        _wait(queue, blocker)
+        self.assertEqual(queue.status(queued)["status"], CANCELLED)
+        self.assertEqual(calls, [])
+
+    def test_running_job_stops_at_its_next_checkpoint(self):
+        queue = JobQueue(workers=1)
+        started = threading.Event()
+
+        def fn(report, should_cancel):
+            started.set()
+            while True:
+                if should_cancel():
+                    raise JobCancelled()
+                time.sleep(0.005)
+
+        job_id = queue.submit(fn)
+        started.wait(10)
+        self.assertTrue(queue.cancel(job_id))
+        self.assertEqual(_wait(queue, job_id)["status"], CANCELLED)
+
+    def test_shared_job_runs_until_every_subscriber_cancelled(self):
+        queue = JobQueue(workers=1)
+        release, started = threading.Event(), threading.Event()
+        job_id = queue.submit(_blocking(release, started), dedupe_key="k")
+        queue.submit(_blocking(release), dedupe_key="k")
+        started.wait(10)
+        queue.cancel(job_id)
+        release.set()
+        self.assertEqual(_wait(queue, job_id)["status"], DONE)
+
+    def test_cancelled_running_job_is_not_joined(self):
+        queue = JobQueue(workers=2)
+        started, stop = threading.Event(), threading.Event()
+
+        def slow_to_cancel(report, should_cancel):
+            started.set()
+            stop.wait(10)  # the checkpoint comes late
+            if should_cancel():
+                raise JobCancelled()
+
+        old = queue.submit(slow_to_cancel, dedupe_key="k")
+        started.wait(10)
+        queue.cancel(old)
+        new = queue.submit(lambda report, should_cancel: "fresh", dedupe_key="k")
+        self.assertNotEqual(new, old)
+        stop.set()
+        self.assertEqual(_wait(queue, old)["status"], CANCELLED)
+        self.assertEqual(_wait(queue, new)["result"], "fresh")
+        self.assertEqual(queue.submit(lambda report, should_cancel: "again", dedupe_key="k"), new)
+
+    def test_status_expires_finished_jobs(self):
+        queue = JobQueue(workers=1)
+        job_id = queue.submit(lambda report, should_cancel: 1)
+        _wait(queue, job_id)
+        with mock.patch.object(job_queue, "JOB_RESULT_TTL", -1):
+            self.assertIsNone(queue.status(job_id))
+
+    def test_failure_is_recorded_and_not_shared(self):
+        queue = JobQueue(workers=1)
+
+        def fn(report, should_cancel):
+            raise ValueError("boom")
+
+        job_id = queue.submit(fn, dedupe_key="k")
+        status = _wait(queue, job_id)
+        self.assertEqual((status["status"], status["error"]), (FAILED, "ValueError: boom"))
+        self.assertNotEqual(queue.submit(lambda report, should_cancel: 1, dedupe_key="k"), job_id)
+
+    def test_forget_drops_a_finished_job(self):
+        queue = JobQueue(workers=1)
+        job_id = queue.submit(lambda report, should_cancel: 1, dedupe_key="k")
+        _wait(queue, job_id)
+        queue.forget(job_id)
+        self.assertIsNone(queue.status(job_id))
+        self.assertNotEqual(queue.submit(lambda report, should_cancel: 1, dedupe_key="k"), job_id)
+
+    def test_background_run_matches_baseline(self):
+        queue = JobQueue(workers=1)
+        df, template = h.transactions(2000, seed=31), h.sample_template()
+        job_id = queue.submit(lambda report, should_cancel: run_pipeline(
+            h.csv_upload(df), template, on_progress=report, should_cancel=should_cancel,
+            use_cache=False, incremental=False))
+        status = _wait(queue, job_id)
+        self.assertEqual(status["status"], DONE)
+        self.assertEqual(status["progress"]["stage"], "insights")
+        h.assert_matches_baseline(self, status["result"], df, template)
+
+
+if __name__ == "__main__":
+    unittest.main()
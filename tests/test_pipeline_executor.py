@@ -0,0 +1,43 @@
+import unittest
+
+import helpers as h
+from Pipeline.pipeline_executor import STAGES, run_pipeline
+
+
+class RunPipelineTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.df = h.transactions(4000)
+        cls.template = h.sample_template()
+
+    def test_preloaded_frame_matches_baseline(self):
+        result = run_pipeline({"type": "upload"}, self.template, df=self.df, use_cache=False, incremental=False)
+        self.assertIsNone(result["error"])
+        h.assert_matches_baseline(self, result, self.df, self.template)
+
+    def test_uploaded_csv_matches_baseline(self):
+        result = run_pipeline(h.csv_upload(self.df), self.template, use_cache=False)
+        self.assertIsNone(result["error"])
+        h.assert_matches_baseline(self, result, self.df, self.template)
+
+    def test_every_stage_reports_start_and_finish(self):
+        events = []
+        result = run_pipeline(h.csv_upload(self.df), self.template, on_progress=events.append,
+                              use_cache=False)
+        stages = [s for s, _, _ in STAGES]
+        self.assertEqual([t["stage"] for t in result["timings"]], stages)
+        for stage in stages:
+            statuses = [e["status"] for e in events if e["stage"] == stage]
+            self.assertEqual(statuses[0], "started")
+            self.assertEqual(statuses[-1], "finished")
+        self.assertTrue(all(t["rows"] == len(self.df) for t in result["timings"][1:]))
+
+    def test_missing_source_ends_with_error(self):
+        file_info = {"type": "upload", "path_csv": None, "path_xlsx": None, "uploaded": None, "conn": None, "table": None}
+        result = run_pipeline(file_info, self.template, use_cache=False)
+        self.assertEqual(result["error"], "Failed to load data file.")
+        self.assertEqual(result["kpi_results"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import helpers as h
+from Data_loader.projection import plan_projection
+from Data_loader.source_loader import load_dataframe, load_sample, sample_file_info
+from Schema_mapper.schema_mapper import infer_field_roles, map_template_fields
+from Pipeline import pipeline_executor
+from Pipeline.pipeline_executor import run_pipeline
+
+
+class ProjectionTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.df = h.transactions(3000, seed=97)
+        cls.df["notes"] = ["free text %d" % i for i in range(len(cls.df))]
+        cls.template = h.sample_template()
+
+    def test_plan_keeps_mapped_and_numeric_columns(self):
+        projection = plan_projection(self.template, self.df.head(500))
+        self.assertEqual(projection["total_columns"], len(self.df.columns))
+        self.assertNotIn("notes", projection["columns"])
+        self.assertNotIn("currency", projection["columns"])
+        self.assertTrue(set(self.df.select_dtypes("number").columns) <= set(projection["columns"]))
+        self.assertEqual(projection["columns"], [c for c in self.df.columns if c in projection["columns"]])
+
+    def test_sample_dataset_probe_maps_like_the_full_load(self):
+        root = tempfile.mkdtemp()
+        os.mkdir(os.path.join(root, "Data"))
+        self.df.to_csv(os.path.join(root, "Data", "bank_transactions.csv"), index=False)
+        file_info = sample_file_info(root)
+        probe = load_sample(file_info, 500)
+        full = load_dataframe(file_info)
+        self.assertEqual(dict(probe.dtypes), dict(full.dtypes))
+        self.assertEqual(plan_projection(self.template, probe)["mapping"],
+                         map_template_fields(self.template, infer_field_roles(full)))
+
+    def test_projected_run_matches_a_full_load(self):
+        projected = run_pipeline(h.csv_upload(self.df, name="projected.csv"), self.template, use_cache=False,
+                                 incremental=False)
+        with mock.patch.object(pipeline_executor, "PROJECTION_ENABLED", False):
+            full = run_pipeline(h.csv_upload(self.df, name="full.csv"), self.template, use_cache=False,
+                                incremental=False)
+        self.assertIsNotNone(projected["projection"])
+        self.assertIsNone(full["projection"])
+        self.assertEqual(list(projected["df"].columns), projected["projection"]["columns"])
+        self.assertEqual(projected["kpi_results"], full["kpi_results"])
+        self.assertEqual([f.to_json() for _, f in projected["chart_results"]],
+                         [f.to_json() for _, f in full["chart_results"]])
+        h.assert_matches_baseline(self, projected, self.df, self.template)
+
+
+if __name__ == "__main__":
+    unittest.main()
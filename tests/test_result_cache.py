@@ -0,0 +1,54 @@
+import json
+import os
+import unittest
+
+import helpers as h
+from Cache import result_cache
+from Pipeline.pipeline_executor import run_pipeline
+
+
+def _run(df, template):
+    return run_pipeline(h.csv_upload(df), template, use_cache=True)
+
+
+class ResultCacheTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.template = h.sample_template()
+
+    def test_second_run_is_served_from_cache_unchanged(self):
+        df = h.transactions(2000, seed=101)
+        first, second = _run(df, self.template), _run(df, self.template)
+        self.assertFalse(first["cache_hit"])
+        self.assertTrue(second["cache_hit"])
+        self.assertEqual(first["kpi_results"], second["kpi_results"])
+        self.assertEqual(first["insight_results"], second["insight_results"])
+        self.assertEqual([json.loads(f.to_json()) for _, f in first["chart_results"]],
+                         [json.loads(f.to_json()) for _, f in second["chart_results"]])
+        h.assert_matches_baseline(self, second, df, self.template)
+
+    def test_changed_data_misses(self):
+        df = h.transactions(2000, seed=102)
+        _run(df, self.template)
+        changed = df.copy()
+        changed.loc[0, "amount"] += 1.0
+        result = _run(changed, self.template)
+        self.assertFalse(result["cache_hit"])
+        h.assert_matches_baseline(self, result, changed, self.template)
+
+    def test_failed_charts_are_not_cached(self):
+        df = h.transactions(2000, seed=103)
+        broken = {"id": "broken", "type": "heatmap", "x_field": "nope", "y_field": "nope", "value_field": "amount"}
+        template = {"title": "broken", "layout": self.template["layout"] + [broken]}
+        first = run_pipeline(h.csv_upload(df), template, use_cache=True)
+        self.assertEqual(list(first["chart_errors"]), ["broken"])
+        second = run_pipeline(h.csv_upload(df), template, use_cache=True)
+        self.assertFalse(second["cache_hit"])
+
+    def test_versioned_sources_exist(self):
+        for rel in result_cache._VERSIONED_SOURCES:
+            self.assertTrue(os.path.exists(os.path.join(result_cache._REPO_ROOT, rel)), rel)
+
+
+if __name__ == "__main__":
+    unittest.main()
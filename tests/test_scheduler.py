@@ -0,0 +1,94 @@
+import threading
+import time
+import unittest
+
+from Pipeline.job_queue import ACTIVE, JobQueue
+from Pipeline.scheduler import FairScheduler, estimate_job_memory, JOB_BYTES_PER_ROW, JOB_DEFAULT_ROWS
+
+MB = 1024 * 1024
+
+
+def _drain(scheduler, running_memory=0, running=0):
+    order = []
+    while True:
+        job_id = scheduler.pop_next(running_memory, running)
+        if job_id is None:
+            return order
+        order.append(job_id)
+
+
+class FairSchedulerTest(unittest.TestCase):
+    def test_owners_are_served_round_robin(self):
+        scheduler = FairScheduler(memory_budget=100 * MB)
+        for i in range(4):
+            scheduler.add(f"a{i}", "alice", MB)
+        scheduler.add("b0", "bob", MB)
+        scheduler.add("c0", None, MB)
+        self.assertEqual(scheduler.order(), ["a0", "b0", "c0", "a1", "a2", "a3"])
+        self.assertEqual(scheduler.position("c0"), 3)
+        self.assertEqual(len(scheduler), 6)
+        self.assertEqual(_drain(scheduler), ["a0", "b0", "c0", "a1", "a2", "a3"])
+
+    def test_job_waits_until_its_memory_fits(self):
+        scheduler = FairScheduler(memory_budget=10 * MB)
+        scheduler.add("big", "alice", 8 * MB)
+        self.assertIsNone(scheduler.pop_next(running_memory=5 * MB, running=1))
+        self.assertEqual(scheduler.pop_next(running_memory=2 * MB, running=1), "big")
+
+    def test_oversized_job_runs_alone(self):
+        scheduler = FairScheduler(memory_budget=10 * MB)
+        scheduler.add("huge", "alice", 50 * MB)
+        self.assertIsNone(scheduler.pop_next(running_memory=MB, running=1))
+        self.assertEqual(scheduler.pop_next(running_memory=0, running=0), "huge")
+
+    def test_small_jobs_overtake_a_large_one_a_bounded_number_of_times(self):
+        scheduler = FairScheduler(memory_budget=10 * MB, max_overtakes=2)
+        scheduler.add("big", "alice", 8 * MB)
+        for i in range(4):
+            scheduler.add(f"s{i}", f"user{i}", MB)
+        running = 5 * MB
+        self.assertEqual(scheduler.pop_next(running, 1), "s0")
+        self.assertEqual(scheduler.pop_next(running, 1), "s1")
+        self.assertIsNone(scheduler.pop_next(running, 1))  # big was overtaken twice: the queue now waits for it
+        self.assertEqual(scheduler.pop_next(0, 0), "big")
+        self.assertEqual(_drain(scheduler, running, 1), ["s2", "s3"])
+
+    def test_removed_jobs_leave_the_queue(self):
+        scheduler = FairScheduler()
+        scheduler.add("a0", "alice", MB)
+        scheduler.add("a1", "alice", MB)
+        self.assertTrue(scheduler.remove("a0"))
+        self.assertFalse(scheduler.remove("a0"))
+        self.assertEqual(scheduler.order(), ["a1"])
+        self.assertIsNone(scheduler.position("a0"))
+
+    def test_memory_estimate(self):
+        self.assertEqual(estimate_job_memory(1000), 1000 * JOB_BYTES_PER_ROW)
+        self.assertEqual(estimate_job_memory(None), JOB_DEFAULT_ROWS * JOB_BYTES_PER_ROW)
+
+
+class JobQueueSchedulingTest(unittest.TestCase):
+    def test_queue_starts_jobs_in_fair_order(self):
+        queue = JobQueue(workers=1, scheduler=FairScheduler(memory_budget=100 * MB))
+        release, started, order = threading.Event(), threading.Event(), []
+
+        def blocker(report, should_cancel):
+            started.set()
+            release.wait(10)
+
+        def job(name):
+            return lambda report, should_cancel: order.append(name)
+
+        queue.submit(blocker, owner="alice", rows=10)
+        started.wait(10)
+        ids = [queue.submit(job(n), owner=o, rows=10) for n, o in (("a1", "alice"), ("a2", "alice"), ("b1", "bob"))]
+        self.assertEqual([queue.status(i)["position"] for i in ids], [1, 3, 2])
+        release.set()
+        deadline = time.time() + 10
+        while any(queue.status(i)["status"] in ACTIVE for i in ids) and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(order, ["a1", "b1", "a2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+import helpers as h
+from Dashboard import sql_pushdown
+from Dashboard.aggregation_planner import execute_plan, plan_aggregations
+from Dashboard.sql_pushdown import PushdownUnsupported, run_pushdown, time_bucket
+from Pipeline.pipeline_executor import run_pipeline
+
+
+class SqlPushdownTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.df = h.transactions(3000, seed=71)
+        cls.conn = h.sqlite_table(cls.df)
+        cls.template = h.sample_template()
+        cls.mapping = h.mapping_for(cls.df, cls.template)
+        cls.keys = list(plan_aggregations(cls.template, cls.mapping))
+        cls.numeric = cls.df.select_dtypes("number").columns.tolist()
+
+    def assert_same_aggregates(self, got, keys):
+        expected = execute_plan(self.df, keys)
+        for key in keys:
+            want = expected[key]
+            if isinstance(want, pd.Series):
+                h.assert_values_close(self, {str(k): v for k, v in got[key].items()},
+                                      {str(k): v for k, v in want.items()}, msg=str(key))
+            else:
+                self.assertAlmostEqual(got[key], want, places=6, msg=str(key))
+
+    def test_pushdown_matches_in_memory_plan(self):
+        pushed = run_pushdown(self.conn, "transactions", self.keys, self.numeric)
+        self.assertEqual((pushed["pushed_down"], pushed["fallback"]), (len(self.keys), []))
+        self.assertEqual(pushed["row_count"], len(self.df))
+        self.assertEqual(pushed["insights"], h.baseline_insights(self.df))
+        self.assert_same_aggregates(pushed["aggregates"], self.keys)
+
+    def test_unsupported_granularity_falls_back_to_pandas(self):
+        hourly = ("sum", "amount", ("transaction_date",), "h")
+        pushed = run_pushdown(self.conn, "transactions", self.keys + [hourly])
+        self.assertEqual(pushed["fallback"], [hourly])
+        self.assert_same_aggregates(pushed["aggregates"], self.keys + [hourly])
+
+    def test_rejected_query_falls_back_to_pandas(self):
+        from sqlalchemy.exc import OperationalError
+        rejected = self.keys[0]
+        compile_aggregate = sql_pushdown.compile_aggregate
+
+        def failing(tbl, key, dialect):
+            if key == rejected:
+                raise OperationalError("SELECT", {}, Exception("rejected"))
+            return compile_aggregate(tbl, key, dialect)
+
+        with mock.patch.object(sql_pushdown, "compile_aggregate", failing):
+            pushed = run_pushdown(self.conn, "transactions", self.keys)
+        self.assertEqual(pushed["fallback"], [rejected])
+        self.assert_same_aggregates(pushed["aggregates"], self.keys)
+
+    def test_typed_date_dialects_refuse_text_columns(self):
+        import sqlalchemy as sa
+        tbl = sa.Table("t", sa.MetaData(), sa.Column("d", sa.String), sa.Column("ts", sa.DateTime))
+        with self.assertRaises(PushdownUnsupported):
+            time_bucket(tbl.c.d, "M", "postgresql")
+        time_bucket(tbl.c.ts, "M", "postgresql")
+        time_bucket(tbl.c.d, "M", "sqlite")
+        with self.assertRaises(PushdownUnsupported):
+            time_bucket(tbl.c.d, "M", "oracle")
+
+    def test_pushdown_run_matches_baseline(self):
+        result = run_pipeline(h.db_source(self.conn), self.template, use_cache=False, incremental=False,
+                              approximate=False)
+        self.assertIsNone(result["error"])
+        self.assertIsNotNone(result["pushdown"])
+        h.assert_matches_baseline(self, result, self.df, self.template)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+import helpers as h
+from Benchmarks.synthetic_data import generate_transactions, iter_chunks, parse_size, write_transactions
+
+
+class SyntheticDataTest(unittest.TestCase):
+    def test_same_seed_same_data(self):
+        pd.testing.assert_frame_equal(generate_transactions(2000, seed=3), generate_transactions(2000, seed=3))
+        self.assertFalse(generate_transactions(2000, seed=3).equals(generate_transactions(2000, seed=4)))
+
+    def test_chunks_continue_the_ids(self):
+        chunks = list(iter_chunks(2500, seed=3, chunk_rows=1000))
+        self.assertEqual([len(c) for c in chunks], [1000, 1000, 500])
+        ids = pd.concat(chunks)["transaction_id"]
+        self.assertEqual(ids.tolist(), list(range(1, 2501)))
+
+    def test_customer_population_follows_the_total_not_the_chunk(self):
+        customers = pd.concat(iter_chunks(20_000, seed=3, chunk_rows=1000))["customer_id"]
+        self.assertGreater(customers.max(), 1_000 + 100)
+        self.assertLess(customers.max(), 1_000 + 20_000 // 50)
+
+    def test_written_file_is_byte_identical_and_fits_the_template(self):
+        tmp = tempfile.mkdtemp()
+        paths = [write_transactions(os.path.join(tmp, f"{i}.csv"), 2500, seed=3, chunk_rows=1000) for i in range(2)]
+        with open(paths[0], "rb") as a, open(paths[1], "rb") as b:
+            self.assertEqual(a.read(), b.read())
+        df = pd.read_csv(paths[0], parse_dates=["transaction_date"])
+        self.assertEqual(len(df), 2500)
+        template = h.sample_template()
+        mapping = h.mapping_for(df, template)
+        for comp in template["layout"]:
+            for field in ("value_field", "group_field", "date_field", "x_field", "y_field"):
+                if field in comp:
+                    self.assertIn(mapping.get(comp[field], comp[field]), df.columns, (comp["id"], field))
+
+    def test_parse_size(self):
+        self.assertEqual([parse_size(s) for s in ("10k", "2.5m", "100M", "5000", "1_000")],
+                         [10_000, 2_500_000, 100_000_000, 5000, 1000])
+
+
+if __name__ == "__main__":
+    unittest.main()
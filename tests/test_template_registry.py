@@ -0,0 +1,66 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import helpers as h
+from Dashboard.template_registry import EMPTY_TEMPLATE, TemplateError, TemplateRegistry, compile_template
+
+
+class TemplateRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "dashboard.json")
+        shutil.copy(h.TEMPLATE_PATH, self.path)
+        with open(h.TEMPLATE_PATH, encoding="utf-8") as f:
+            self.raw = json.load(f)
+
+    def _write(self, template, mtime):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(template, f)
+        os.utime(self.path, (mtime, mtime))
+
+    def test_compiled_lists_match_the_layout(self):
+        compiled = TemplateRegistry().get(self.path)
+        layout = self.raw["layout"]
+        self.assertEqual(compiled["layout"], layout)
+        self.assertEqual(compiled["kpis"], [c for c in layout if c["type"] == "kpi"])
+        self.assertEqual(compiled["charts"], [c for c in layout if c["type"] != "kpi"])
+        self.assertEqual(compiled["hash"], compile_template(self.raw)["hash"])
+
+    def test_reparsed_only_when_the_file_changes(self):
+        registry = TemplateRegistry()
+        self._write(self.raw, 1_000_000)
+        first = registry.get(self.path)
+        self.assertIs(registry.get(self.path), first)
+        changed = dict(self.raw, title="Changed")
+        self._write(changed, 1_000_100)
+        second = registry.get(self.path)
+        self.assertEqual(second["title"], "Changed")
+        self.assertNotEqual(second["hash"], first["hash"])
+
+    def test_invalid_templates_raise(self):
+        broken = dict(self.raw, layout=self.raw["layout"] + [{"id": "b", "type": "bar", "value_field": "amount"}])
+        self._write(broken, 1_000_000)
+        with self.assertRaisesRegex(TemplateError, "bar requires 'group_field'"):
+            TemplateRegistry().get(self.path)
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("{not json")
+        with self.assertRaises(TemplateError):
+            TemplateRegistry().get(self.path)
+        with self.assertRaisesRegex(TemplateError, "duplicate id"):
+            compile_template({"layout": [self.raw["layout"][0], self.raw["layout"][0]]})
+
+    def test_missing_file_is_the_empty_template(self):
+        compiled = TemplateRegistry().get(os.path.join(self.tmp, "missing.json"))
+        self.assertEqual((compiled["title"], compiled["layout"]), (EMPTY_TEMPLATE["title"], []))
+
+    def test_directory_load(self):
+        shutil.copy(h.TEMPLATE_PATH, os.path.join(self.tmp, "second.json"))
+        templates = TemplateRegistry().load_directory(self.tmp)
+        self.assertEqual(sorted(templates), ["dashboard", "second"])
+
+
+if __name__ == "__main__":
+    unittest.main()
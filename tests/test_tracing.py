@@ -0,0 +1,70 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import helpers as h
+from Pipeline import tracing
+from Pipeline.pipeline_executor import STAGES, run_pipeline
+from Pipeline.tracing import span, to_otlp, trace_run
+
+
+class TracingTest(unittest.TestCase):
+    def test_run_records_nested_spans_without_changing_results(self):
+        df, template = h.transactions(2000, seed=151), h.sample_template()
+        path = os.path.join(tempfile.mkdtemp(), "trace.jsonl")
+        with mock.patch.object(tracing, "TRACE_FILE", path):
+            result = run_pipeline(h.csv_upload(df), template, chart_workers=3, use_cache=False, incremental=False)
+        h.assert_matches_baseline(self, result, df, template)
+
+        spans = result["trace"]
+        by_id = {s["span_id"]: s for s in spans}
+        root = next(s for s in spans if s["parent_id"] is None)
+        self.assertEqual(root["stage"], "dashboard_run")
+        self.assertEqual({s["trace_id"] for s in spans}, {root["trace_id"]})
+        stages = [s for s in spans if s["parent_id"] == root["span_id"]]
+        self.assertEqual([s["stage"] for s in stages], [name for name, _, _ in STAGES])
+        charts = [s for s in spans if s["stage"].startswith("chart.")]
+        self.assertEqual(sorted(s["component_id"] for s in charts), sorted(c["id"] for c in h.components(template, "chart")))
+        self.assertTrue(all(by_id[s["parent_id"]]["stage"] == "charts" for s in charts))
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), len(spans))
+
+    def test_span_records_its_own_memory_delta(self):
+        if tracing._current_rss_mb() is None:
+            self.skipTest("current RSS is not readable on this platform")
+        with mock.patch.object(tracing, "TRACE_FILE", ""):
+            with trace_run("run") as spans:
+                with span("allocate"):
+                    block = b"x" * (64 * 1024 * 1024)
+                with span("idle"):
+                    pass
+        del block
+        by_stage = {s["stage"]: s for s in spans}
+        self.assertGreater(by_stage["allocate"]["rss_delta_mb"], 48)
+        self.assertLess(abs(by_stage["idle"]["rss_delta_mb"]), 16)
+        self.assertGreaterEqual(by_stage["idle"]["process_peak_rss_mb"], by_stage["allocate"]["rss_delta_mb"])
+
+    def test_failed_span_is_marked_and_exported_as_otlp(self):
+        with mock.patch.object(tracing, "TRACE_FILE", ""):
+            with trace_run("run", template="t") as spans:
+                with self.assertRaises(ValueError):
+                    with span("load"):
+                        raise ValueError("boom")
+        failed = next(s for s in spans if s["stage"] == "load")
+        self.assertEqual((failed["status"], failed["error"]), ("error", "ValueError: boom"))
+        otlp = json.loads(json.dumps(to_otlp(spans, {"template": "t"})))
+        exported = otlp["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        self.assertEqual(len(exported), 2)
+        self.assertEqual(next(s for s in exported if s["name"] == "load")["status"],
+                         {"code": 2, "message": "ValueError: boom"})
+
+    def test_span_outside_a_trace_is_a_no_op(self):
+        with span("orphan", rows=3) as record:
+            pass
+        self.assertEqual(record, {"stage": "orphan", "component_id": None, "rows": 3})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import helpers as h
+from Data_loader.source_loader import sample_file_info
+from Pipeline import pipeline_executor, warmup
+from Pipeline.job_queue import ACTIVE, get_job_queue
+from Pipeline.pipeline_executor import submit_run
+
+
+class WarmupTest(unittest.TestCase):
+    def test_warmup_fills_the_caches_and_forgets_its_job(self):
+        root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(root, "Data"))
+        os.makedirs(os.path.join(root, "Dashboard"))
+        df = h.transactions(2000, seed=141)
+        df.to_csv(os.path.join(root, "Data", "bank_transactions.csv"), index=False)
+        shutil.copy(h.TEMPLATE_PATH, os.path.join(root, "Dashboard", "sample_dashboard.json"))
+        template = h.sample_template()
+
+        queue = get_job_queue()
+        submitted = []
+
+        def record(*args, **kwargs):
+            submitted.append((kwargs.get("owner"), submit_run(*args, **kwargs)))
+            return submitted[-1][1]
+
+        with mock.patch.object(warmup, "WARMUP_POLL_INTERVAL", 0.01), \
+                mock.patch.object(pipeline_executor, "submit_run", record):
+            warmup._submit_warmup(root)
+        self.assertEqual([owner for owner, _ in submitted], ["warmup"])
+        self.assertIsNone(queue.status(submitted[0][1]))
+
+        session_job = submit_run(sample_file_info(root), template, owner="session")
+        deadline = time.time() + 60
+        while queue.status(session_job)["status"] in ACTIVE and time.time() < deadline:
+            time.sleep(0.02)
+        result = queue.status(session_job)["result"]
+        self.assertTrue(result["cache_hit"])
+        h.assert_matches_baseline(self, result, df, template)
+
+    def test_disabled_warmup_does_nothing(self):
+        with mock.patch.object(warmup, "WARMUP_ENABLED", False), \
+                mock.patch.object(warmup, "_submit_warmup", side_effect=AssertionError("started")):
+            self.assertFalse(warmup.start_warmup(h.ROOT))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import io
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import helpers as h
+from Data_loader import xlsx_ingest
+from Data_loader.xlsx_ingest import read_xlsx
+
+
+class ReadXlsxTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        df = h.transactions(1500, seed=105)
+        df["transaction_date"] = df["transaction_date"].astype("datetime64[ns]")
+        df["posted"] = df["transaction_date"].dt.strftime("%Y-%m-%d")  # dates stored as text
+        df["flagged"] = df["fraud_flag"] == 1
+        df.loc[::9, "merchant"] = None
+        df.loc[::13, "amount"] = np.nan
+        df["mixed"] = [i if i % 2 else f"x{i}" for i in range(len(df))]
+        buf = io.BytesIO()
+        with pd.ExcelWriter(buf, engine="openpyxl") as writer:
+            df.to_excel(writer, sheet_name="transactions", index=False)
+            df.head(50).to_excel(writer, sheet_name="head", index=False)
+        cls.data = buf.getvalue()
+
+    def _baseline(self, **kwargs):
+        return pd.read_excel(io.BytesIO(self.data), engine="openpyxl", **kwargs)
+
+    def test_matches_read_excel(self):
+        got = read_xlsx(self.data)
+        self.assertIsNotNone(got)
+        pd.testing.assert_frame_equal(got, self._baseline())
+
+    def test_every_sheet_rows_and_columns(self):
+        pool = mock.Mock(wraps=xlsx_ingest.ProcessPoolExecutor)
+        with mock.patch.object(xlsx_ingest, "XLSX_WORKERS", 2), mock.patch.object(xlsx_ingest, "ProcessPoolExecutor", pool):
+            sheets = read_xlsx(self.data, sheet_name=None)
+        # workers are spawned: forking the threaded app process can deadlock
+        self.assertEqual(pool.call_args.kwargs["mp_context"].get_start_method(), "spawn")
+        baseline = self._baseline(sheet_name=None)
+        self.assertEqual(list(sheets), list(baseline))
+        for name in baseline:
+            pd.testing.assert_frame_equal(sheets[name], baseline[name])
+        pd.testing.assert_frame_equal(read_xlsx(self.data, nrows=100), self._baseline(nrows=100))
+        columns = ["merchant", "amount"]
+        pd.testing.assert_frame_equal(read_xlsx(self.data, columns=columns), self._baseline(usecols=columns))
+
+    def test_text_dates_are_parsed_on_request(self):
+        got = read_xlsx(self.data, is_date_column=lambda name: name == "posted")
+        baseline = self._baseline(parse_dates=["posted"])
+        pd.testing.assert_frame_equal(got, baseline)
+
+    def test_openpyxl_engine_opts_out(self):
+        with mock.patch.object(xlsx_ingest, "XLSX_ENGINE", "openpyxl"):
+            self.assertIsNone(read_xlsx(self.data))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,8 @@
-import os
-import pandas as pd
 import streamlit as st
-from Data_loader.data_loader import read_sql_table
+from Data_loader.source_loader import sample_file_info
+# Loading lives in Data_loader/source_loader.py (no Streamlit); re-exported because
+# ui/output_ui-working.py imports load_dataframe from here
+from Data_loader.source_loader import load_dataframe  # noqa: F401
 
 def render_input_ui(current_dir):
     st.markdown("### <span style='color:darkblue;font-weight:bold;'>Input Parameters</span>", unsafe_allow_html=True)
@@ -18,9 +19,7 @@ def render_input_ui(current_dir):
 
     # Step 2: Show relevant input right after selection
     if data_source == "Sample Data (provided)":
-        file_info["type"] = "sample"
-        file_info["path_csv"] = os.path.join(current_dir, "Data", "bank_transactions.csv")
-        file_info["path_xlsx"] = os.path.join(current_dir, "Data", "bank_transactions.xlsx")
+        file_info = sample_file_info(current_dir)
 
     elif data_source == "Upload CSV/XLSX":
         file_info["type"] = "upload"
@@ -45,30 +44,3 @@ def render_input_ui(current_dir):
     # Step 4: Run Agent button
     run_agent = st.button("🚀 Run Agent", key="run_agent_btn")
     return file_info, run_agent
-
-def load_dataframe(file_info):
-    """Load the actual DataFrame only when needed."""
-    df = None
-    if file_info["type"] == "sample":
-        if os.path.exists(file_info["path_csv"]):
-            df = pd.read_csv(file_info["path_csv"], parse_dates=True)
-        elif os.path.exists(file_info["path_xlsx"]):
-            df = pd.read_excel(file_info["path_xlsx"], parse_dates=True)
-
-    elif file_info["type"] == "upload" and file_info["uploaded"]:
-        uploaded = file_info["uploaded"]
-        if uploaded.name.lower().endswith(".csv"):
-            headers = pd.read_csv(uploaded, nrows=0).columns.tolist()
-            date_cols = [c for c in headers if "date" in c.lower()]
-            uploaded.seek(0)
-            df = pd.read_csv(uploaded, parse_dates=date_cols)
-        else:
-            headers = pd.read_excel(uploaded, nrows=0).columns.tolist()
-            date_cols = [c for c in headers if "date" in c.lower()]
-            uploaded.seek(0)
-            df = pd.read_excel(uploaded, parse_dates=date_cols)
-
-    elif file_info["type"] == "db" and file_info["conn"] and file_info["table"]:
-        df = read_sql_table(file_info["conn"], file_info["table"])
-
-    return df
@@ -1,11 +1,7 @@
 import streamlit as st
 import os
-import time
-import json
-from ui.input_ui import load_dataframe
-from Schema_mapper.schema_mapper import infer_field_roles, map_template_fields
-from Dashboard.dashboard_generator import generate_kpi, generate_line, generate_bar, generate_pie, generate_scatter, generate_histogram, generate_heatmap
-from Insight.insight_engine import basic_kpi_insights
+from Pipeline.job_queue import get_job_queue, ACTIVE, CANCELLED, FAILED
+from Dashboard.template_registry import get_template, TemplateError
 
 def render_topbar():
     user = st.session_state.get("user", {})
@@ -23,7 +19,25 @@ def render_topbar():
         unsafe_allow_html=True
     )
 
-def render_results(df=None, kpi_results=None, chart_results=None, insight_results=None):
+def _render_performance(trace_spans):
+    """Collapsible timings of the last run (one row per traced stage / component)."""
+    with st.expander("⏱️ Performance", expanded=False):
+        rows = [
+            {
+                "stage": s["stage"],
+                "component": s.get("component_id") or "",
+                "rows": s.get("rows"),
+                "duration_ms": s.get("duration_ms"),
+                "rss_delta_mb": s.get("rss_delta_mb"),
+                "process_peak_rss_mb": s.get("process_peak_rss_mb"),
+                "status": s.get("status"),
+            }
+            for s in trace_spans
+        ]
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+
+
+def render_results(df=None, kpi_results=None, chart_results=None, insight_results=None, trace_spans=None):
     # --- Heading with Logout button aligned right ---
     col1, col2 = st.columns([8, 1])
     with col1:
@@ -35,6 +49,7 @@ def render_results(df=None, kpi_results=None, chart_results=None, insight_result
         if st.button("Logout", key="logout", use_container_width=True):
             st.session_state.logged_in = False
             st.session_state.user = {}
+            _release_dataset()
             st.rerun()
 
     # --- Original results rendering ---
@@ -50,6 +65,21 @@ def render_results(df=None, kpi_results=None, chart_results=None, insight_result
                 for i, k in enumerate(kpi_results):
                     with cols[i]:
                         st.metric(k.get("title", "KPI"), k.get("value", "N/A"))
+                        if k.get("ci") is not None:
+                            st.caption(f"± {k['ci']:,} ({k['confidence']:.0%} confidence interval)")
+
+            estimates = st.session_state.get("estimates")
+            if estimates:
+                st.caption(
+                    f"Approximate dashboard: KPIs and charts are estimated from {estimates['sample_rows']:,} of "
+                    f"{estimates['population_rows']:,} rows ({estimates['method']} sample)."
+                )
+                # a file sampled to fit the ingest budget cannot be refined; an exact run would not fit either
+                if estimates["method"] != "ingest" and st.button(
+                    "🎯 Refine to exact results", key="refine_exact", disabled=job_in_progress()
+                ):
+                    _refine_exact()
+                    st.rerun()
 
             if chart_results:
                 # Arrange charts in rows of 3
@@ -66,96 +96,176 @@ def render_results(df=None, kpi_results=None, chart_results=None, insight_result
 
         # --- Data Preview tab ---
         with tab_data:
-            st.dataframe(df.head(50), use_container_width=True)
+            preview = df
+            if st.session_state.get("dataset_source", {}).get("out_of_core"):
+                st.caption(f"Showing a sample of {len(df):,} rows; the dashboard was computed over the whole file.")
+            if st.session_state.get("dataset_source", {}).get("projected"):
+                if st.session_state.get("dataset_full") is None:
+                    st.caption(f"Showing the {len(df.columns)} columns this dashboard uses.")
+                    if st.button("Load all columns", key="load_all_columns"):
+                        with st.spinner("Loading all columns ..."):
+                            st.session_state["dataset_full"] = _load_full_dataset()
+                if st.session_state.get("dataset_full") is not None:
+                    preview = st.session_state["dataset_full"].df
+            st.dataframe(preview.head(50), use_container_width=True)
+
+        if trace_spans:
+            _render_performance(trace_spans)
 
     else:
         # Show initial message in status box
         st.session_state["results_status_placeholder"].info("Please provide input data and click 'Run Agent'.")
 
 
-# --- New function to handle dynamic processing with spinner ---
+# --- Run the staged pipeline as a background job and poll its progress across reruns ---
+JOB_POLL_INTERVAL = float(os.environ.get("DASHBOARD_JOB_POLL_INTERVAL", "0.5"))
+
+
+def _progress_message(event):
+    msg = f"{event['label']}"
+    if event.get("total"):
+        msg += f" {event['done']}/{event['total']}"
+    if event.get("detail"):
+        msg += f" ({event['detail']})"
+    return f"{msg} — {event['elapsed_ms']:.0f} ms, {event['rows']:,} rows"
+
+
+def _queued_message(job):
+    msg = "⏳ Run queued"
+    if job.get("position"):
+        msg += f" — position {job['position']} of {job['queued']}"
+    size = f"{job['rows']:,} rows, " if job.get("rows") is not None else ""
+    return msg + f" ({size}~{job['memory_estimate'] / (1024 * 1024):,.0f} MB estimated) ..."
+
+
+def _release_dataset():
+    for name in ("dataset", "dataset_full"):
+        dataset = st.session_state.pop(name, None)
+        if dataset is not None:
+            dataset.release()
+    st.session_state.pop("dataset_source", None)
+
+
+def _load_full_dataset():
+    """Handle to every column of the last run's source (the run itself only loaded the projected columns)."""
+    from Cache.dataset_store import get_dataset_store
+    from Data_loader.source_loader import load_dataframe
+    source = st.session_state["dataset_source"]
+
+    def load():
+        from Schema_mapper.schema_mapper import infer_field_roles
+        from Data_loader.dtype_compaction import compact_dataframe
+        df = load_dataframe(source["file_info"])
+        return None if df is None else compact_dataframe(df, infer_field_roles(df))[0]
+
+    return get_dataset_store().get_or_load(source["fingerprint"], load)
+
+
+def _submit_run(file_info, template, approximate=None):
+    from Pipeline.pipeline_executor import submit_run  # pandas / plotly load on the first run, not at login
+    previous = st.session_state.get("pipeline_state")
+    owner = st.session_state.get("user", {}).get("email")
+    return submit_run(file_info, template, previous=previous, owner=owner, approximate=approximate)
+
+
+def _refine_exact():
+    """Queue the exact run of the approximate dashboard on screen; it replaces the estimates when it finishes."""
+    st.session_state["job_id"] = _submit_run(st.session_state["job_file_info"], st.session_state["job_template"],
+                                             approximate=False)
+
+
+def job_in_progress():
+    """True while this session's background run is queued or running (main.py keeps polling)."""
+    job_id = st.session_state.get("job_id")
+    if not job_id:
+        return False
+    job = get_job_queue().status(job_id)
+    return job is not None and job["status"] in ACTIVE
+
+
 def run_processing(file_info, current_dir):
     status_box = st.session_state["results_status_placeholder"]
-    status_box.empty()  # Clear previous status
-
-    df, roles, mapping, kpi_results, chart_results, insight_results = None, None, None, [], [], []
-
-    # --- Define dynamic steps ---
-    steps = [
-        ("📂 Loading data", lambda: load_dataframe(file_info)),
-        ("🔍 Inferring field roles", lambda: infer_field_roles(df)),
-        ("🗺️ Mapping template fields", lambda: map_template_fields(
-            json.load(open(os.path.join(current_dir, "Dashboard", "sample_dashboard.json"))) if os.path.exists(os.path.join(current_dir, "Dashboard", "sample_dashboard.json")) else {"title": "Generated Dashboard","layout": []},
-            roles
-        )),
-        ("📊 Generating KPIs", lambda: [generate_kpi(df, c, mapping) for c in json.load(open(os.path.join(current_dir, "Dashboard", "sample_dashboard.json"))) if c.get("type")=="kpi"]),
-        ("📈 Generating Charts", lambda: []),  # handled separately below
-        ("💡 Generating Insights", lambda: basic_kpi_insights(df))
-    ]
-
-    # Step 1: Load Data
-    with status_box.container():
-        with st.spinner(steps[0][0]+"..."):
-            df = steps[0][1]()
-            time.sleep(1)
-
-    if df is None:
-        status_box.error("❌ Failed to load data file.")
+    queue = get_job_queue()
+
+    # New "Run Agent" click: replace any run still in flight for this session
+    if st.session_state.get("run_agent", False):
+        st.session_state["run_agent"] = False
+        try:
+            template = get_template(os.path.join(current_dir, "Dashboard", "sample_dashboard.json"))
+        except TemplateError as e:
+            status_box.error(f"❌ {e}")
+            return
+        old_id = st.session_state.get("job_id")
+        # a replaced run that already finished is not cancelled but forgotten, so its result is not kept until TTL
+        if old_id and not queue.cancel(old_id):
+            queue.forget(old_id)
+        from Data_loader.source_loader import with_fingerprint
+        file_info = with_fingerprint(file_info)  # hashed once here, reused by the job and the stored handle
+        st.session_state["job_id"] = _submit_run(file_info, template)
+        st.session_state["job_file_info"] = file_info
+        st.session_state["job_template"] = template
+
+    job_id = st.session_state.get("job_id")
+    if not job_id:
         return
+    job = queue.status(job_id)
+    if job is None:
+        st.session_state.pop("job_id", None)
+        status_box.warning("The previous run expired. Please click 'Run Agent' again.")
+        return
+
+    if job["status"] in ACTIVE:
+        if job["progress"] is None:
+            status_box.info(_queued_message(job))
+        else:
+            status_box.info(_progress_message(job["progress"]) + " ...")
+        if st.button("✖ Cancel run", key="cancel_job"):
+            queue.cancel(job_id)
+            st.rerun()
+        return
+
+    # Finished: pick up the result once
+    st.session_state.pop("job_id", None)
+    queue.forget(job_id)
+    if job["status"] == CANCELLED:
+        status_box.warning("Run cancelled.")
+        return
+    if job["status"] == FAILED:
+        status_box.error(f"❌ {job['error']}")
+        return
+
+    result = job["result"]
+    if result["error"]:
+        status_box.error(f"❌ {result['error']}")
+        return
+
+    source = " from cache" if result["cache_hit"] else ""
+    sampled = (result.get("ingest") or {}).get("sample_fraction", 1.0)
+    note = f", a {sampled:.0%} sample that fits the ingest budget" if sampled < 1.0 else ""
+    if result["estimates"]:
+        note += ", approximate"
+    status_box.success(f"✅ Dashboard ready{source} in {result['total_ms']:.0f} ms ({result['rows']:,} rows{note})")
 
-    # Step 2: Infer Field Roles
-    with status_box.container():
-        with st.spinner(steps[1][0]+"..."):
-            roles = steps[1][1]()
-            time.sleep(1)
-
-    # Step 3: Map Template Fields
-    template_file = os.path.join(current_dir, "Dashboard", "sample_dashboard.json")
-    template = json.load(open(template_file)) if os.path.exists(template_file) else {"title": "Generated Dashboard", "layout": []}
-    with status_box.container():
-        with st.spinner(steps[2][0]+"..."):
-            mapping = map_template_fields(template, roles)
-            time.sleep(1)
-
-    # Step 4: Generate KPIs
-    kpis = [c for c in template.get("layout", []) if c.get("type")=="kpi"]
-    with status_box.container():
-        for i, comp in enumerate(kpis):
-            with st.spinner(f"📊 Generating KPI {i+1}/{len(kpis)}..."):
-                kpi_results.append(generate_kpi(df, comp, mapping))
-                time.sleep(0.5)
-
-    # Step 5: Generate Charts dynamically
-    chart_results = []
-    chart_func_map = {
-      "line": generate_line,
-      "bar": generate_bar,
-      "pie": generate_pie,
-      "scatter": generate_scatter,
-      "histogram": generate_histogram,
-      "heatmap": generate_heatmap,
-    }
-
-    charts = [c for c in template.get("layout", []) if c.get("type") in chart_func_map]
-
-    for i, comp in enumerate(charts):
-        chart_type = comp.get("type")
-        func = chart_func_map.get(chart_type)
-        if func:
-            with status_box:
-                with st.spinner(f"📈 Generating {chart_type} chart {i+1}/{len(charts)}..."):
-                    fig = func(df, comp, mapping)
-                    chart_results.append((chart_type, fig))
-                    time.sleep(1.0)
-
-    # Step 6: Generate Insights
-    with status_box.container():
-        with st.spinner(steps[5][0]+"..."):
-            insight_results = basic_kpi_insights(df)
-            time.sleep(0.5)
-
-    # Store results in session
-    st.session_state["df"] = df
-    st.session_state["kpi_results"] = kpi_results
-    st.session_state["chart_results"] = chart_results
-    st.session_state["insight_results"] = insight_results
+    # Store results in session; the DataFrame itself stays in the shared store, the session only holds a handle
+    from Pipeline.pipeline_executor import acquire_result_frame
+    _release_dataset()
+    run_file_info = st.session_state.get("job_file_info", file_info)
+    dataset = acquire_result_frame(run_file_info, result)
+    if dataset is not None:
+        from Data_loader.source_loader import source_fingerprint
+        st.session_state["dataset"] = dataset
+        st.session_state["dataset_source"] = {
+            "file_info": run_file_info,
+            "fingerprint": source_fingerprint(run_file_info),  # carried by job_file_info, not re-hashed
+            # an out-of-core run keeps only a sample in memory; loading every column would load the whole file
+            "projected": result["projected"],
+            "out_of_core": result["out_of_core"],
+        }
+    st.session_state["kpi_results"] = result["kpi_results"]
+    st.session_state["chart_results"] = result["chart_results"]
+    st.session_state["insight_results"] = result["insight_results"]
+    st.session_state["estimates"] = result["estimates"]
+    st.session_state["pipeline_timings"] = result["timings"]
+    st.session_state["trace_spans"] = result["trace"]
+    if result["state"] is not None:
+        st.session_state["pipeline_state"] = result["state"]